@@ -1,18 +1,34 @@
 from .security import (
     verify_password,
     get_password_hash,
+    password_needs_rehash,
     create_access_token,
+    create_refresh_token,
+    create_stream_ticket,
+    hash_refresh_token,
     verify_token,
+    sessao_ativa,
     validate_cpf
 )
-from .dependencies import get_current_user, get_current_active_user
+from .dependencies import get_current_user, get_current_reader, get_stream_ticket, get_stream_reader, get_current_active_user
+from .revocation import revocation_list, revoke_token
 
 __all__ = [
     "verify_password",
     "get_password_hash",
+    "password_needs_rehash",
     "create_access_token",
+    "create_refresh_token",
+    "create_stream_ticket",
+    "hash_refresh_token",
     "verify_token",
+    "sessao_ativa",
     "validate_cpf",
     "get_current_user",
+    "get_current_reader",
+    "get_stream_ticket",
+    "get_stream_reader",
     "get_current_active_user",
+    "revocation_list",
+    "revoke_token",
 ]
\ No newline at end of file
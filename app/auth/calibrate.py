@@ -0,0 +1,56 @@
+"""
+Calibra o custo do bcrypt para o hardware atual.
+
+Uso:
+    python -m app.auth.calibrate --alvo-ms 250
+
+O resultado deve ser configurado na variável de ambiente BCRYPT_ROUNDS.
+"""
+import argparse
+import time
+
+from passlib.hash import bcrypt
+
+ROUNDS_MINIMO = 10
+ROUNDS_MAXIMO = 16
+
+
+def medir_verificacao(rounds: int, repeticoes: int = 3) -> float:
+    """Retorna o tempo médio (em ms) para verificar uma senha com o custo informado"""
+    senha = "senha-de-calibracao"
+    hash_senha = bcrypt.using(rounds=rounds).hash(senha)
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        bcrypt.verify(senha, hash_senha)
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def calibrar(alvo_ms: float, minimo: int = ROUNDS_MINIMO, maximo: int = ROUNDS_MAXIMO) -> int:
+    """Escolhe o maior custo cuja verificação não ultrapassa o tempo alvo"""
+    escolhido = minimo
+    for rounds in range(minimo, maximo + 1):
+        tempo = medir_verificacao(rounds)
+        print(f"  rounds={rounds:2d}  verificação={tempo:8.1f} ms")
+        if tempo > alvo_ms:
+            break
+        escolhido = rounds
+        # Cada round dobra o custo: evitar medir valores claramente acima do alvo
+        if tempo * 2 > alvo_ms * 1.5:
+            break
+    return escolhido
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibra BCRYPT_ROUNDS para o hardware atual")
+    parser.add_argument("--alvo-ms", type=float, default=250.0, help="Tempo alvo de verificação em ms")
+    parser.add_argument("--minimo", type=int, default=ROUNDS_MINIMO, help="Custo mínimo aceitável")
+    parser.add_argument("--maximo", type=int, default=ROUNDS_MAXIMO, help="Custo máximo avaliado")
+    args = parser.parse_args()
+
+    print(f"🔧 Calibrando bcrypt para ~{args.alvo_ms:.0f} ms por verificação...")
+    rounds = calibrar(args.alvo_ms, args.minimo, args.maximo)
+    print(f"✅ Recomendado: BCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,19 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Cliente
-from .security import verify_token
+from .security import verify_token, sessao_ativa
 
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Cliente:
-    """Obter usuário atual através do token JWT"""
-    token = credentials.credentials
-    payload = verify_token(token)
-    
+def _load_user(credentials: HTTPAuthorizationCredentials, db: Session) -> Cliente:
+    """Validar o token e carregar o cliente correspondente"""
+    return _cliente_do_payload(verify_token(credentials.credentials), db)
+
+def _cliente_do_payload(payload: dict, db: Session) -> Cliente:
+    """Carregar o cliente dono de um token já validado"""
     cpf = payload.get("sub")
     if cpf is None:
         raise HTTPException(
@@ -37,6 +36,45 @@ def get_current_user(
     
     return user
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Cliente:
+    """Obter usuário atual através do token JWT"""
+    return _load_user(credentials, db)
+
+def get_current_reader(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_read_db)
+) -> Cliente:
+    """Obter usuário atual para rotas somente leitura (usa a réplica)"""
+    return _load_user(credentials, db)
+
+def get_stream_ticket(
+    conta_numero: str,
+    ticket: Optional[str] = Query(None, description="Ticket de stream (EventSource não envia cabeçalhos)")
+) -> dict:
+    """Validar o ticket de stream da conta e a sessão que o originou"""
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authenticated"
+        )
+    payload = verify_token(ticket, escopo="stream")
+    if payload.get("conta") != conta_numero or not sessao_ativa(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Ticket inválido"
+        )
+    return payload
+
+def get_stream_reader(
+    ticket: dict = Depends(get_stream_ticket),
+    db: Session = Depends(get_read_db)
+) -> Cliente:
+    """Obter usuário atual para streams a partir do ticket na query"""
+    return _cliente_do_payload(ticket, db)
+
 def get_current_active_user(current_user: Cliente = Depends(get_current_user)) -> Cliente:
     """Garantir que o usuário está ativo"""
     if not current_user.ativo:
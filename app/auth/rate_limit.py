@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Protocol, Tuple
+
+from fastapi import HTTPException, Request, status
+
+
+class BucketBackend(Protocol):
+    """Armazenamento dos baldes; pode ser substituído por um backend compartilhado"""
+
+    def consume(self, chave: str, capacidade: float, taxa: float, custo: float = 1.0) -> Tuple[bool, float]:
+        """Consome `custo` fichas e retorna (permitido, segundos até haver fichas)"""
+        ...
+
+
+class InMemoryBucketBackend:
+    """Baldes de fichas mantidos no próprio processo"""
+
+    def __init__(self, max_chaves: int = 100_000, relogio: Callable[[], float] = time.monotonic):
+        self.max_chaves = max_chaves
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        # chave -> (fichas, instante da última atualização)
+        self._baldes: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def consume(self, chave: str, capacidade: float, taxa: float, custo: float = 1.0) -> Tuple[bool, float]:
+        agora = self._relogio()
+        with self._lock:
+            fichas, atualizado_em = self._baldes.pop(chave, (capacidade, agora))
+            fichas = min(capacidade, fichas + (agora - atualizado_em) * taxa)
+
+            permitido = fichas >= custo
+            if permitido:
+                fichas -= custo
+            espera = 0.0 if permitido else (custo - fichas) / taxa
+
+            self._baldes[chave] = (fichas, agora)
+            # Descartar os baldes usados há mais tempo para limitar a memória
+            while len(self._baldes) > self.max_chaves:
+                self._baldes.popitem(last=False)
+        return permitido, espera
+
+    def clear(self) -> None:
+        with self._lock:
+            self._baldes.clear()
+
+
+class RateLimiter:
+    """Limitador por chave (IP, CPF...) baseado em balde de fichas"""
+
+    def __init__(self, nome: str, capacidade: int, por_minuto: float, backend: Optional[BucketBackend] = None):
+        self.nome = nome
+        self.capacidade = capacidade
+        self.taxa = por_minuto / 60.0
+        self.backend = backend or InMemoryBucketBackend()
+        self.permitidas = 0
+        self.rejeitadas = 0
+
+    def check(self, chave: str) -> None:
+        """Lança HTTP 429 se a chave excedeu o limite"""
+        permitido, espera = self.backend.consume(f"{self.nome}:{chave}", self.capacidade, self.taxa)
+        if permitido:
+            self.permitidas += 1
+            return
+
+        self.rejeitadas += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas tentativas. Tente novamente mais tarde.",
+            headers={"Retry-After": str(max(1, int(espera + 0.999)))},
+        )
+
+    def metrics(self) -> Dict[str, int]:
+        return {"permitidas": self.permitidas, "rejeitadas": self.rejeitadas}
+
+    def clear(self) -> None:
+        """Zera os baldes e contadores (útil em testes)"""
+        if hasattr(self.backend, "clear"):
+            self.backend.clear()
+        self.permitidas = 0
+        self.rejeitadas = 0
+
+
+rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(nome: str, capacidade: int, por_minuto: float) -> RateLimiter:
+    """Obtém (ou cria) o limitador registrado com o nome informado"""
+    if nome not in rate_limiters:
+        rate_limiters[nome] = RateLimiter(nome, capacidade, por_minuto)
+    return rate_limiters[nome]
+
+
+def client_ip(request: Request) -> str:
+    """IP de origem da requisição"""
+    return request.client.host if request.client else "desconhecido"
+
+
+def rate_limit_by_ip(nome: str, capacidade: int, por_minuto: float):
+    """Dependency que limita a rota por IP de origem"""
+    limiter = get_rate_limiter(nome, capacidade, por_minuto)
+
+    def dependency(request: Request):
+        limiter.check(client_ip(request))
+
+    return dependency
+
+
+def rate_limit_metrics() -> Dict[str, Dict[str, int]]:
+    """Contadores de todas as rotas limitadas"""
+    return {nome: limiter.metrics() for nome, limiter in rate_limiters.items()}
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import math
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import RefreshToken, TokenRevogado
+
+
+class BloomFilter:
+    """Filtro de Bloom simples para testes rápidos de pertinência"""
+
+    def __init__(self, capacidade: int, taxa_falsos_positivos: float = 0.001):
+        capacidade = max(capacidade, 1)
+        # Tamanho ótimo do vetor de bits e número de funções de hash
+        self.tamanho = max(8, int(-capacidade * math.log(taxa_falsos_positivos) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.tamanho / capacidade * math.log(2)))
+        self._bits = bytearray((self.tamanho + 7) // 8)
+
+    def _posicoes(self, item: str):
+        # Double hashing: h1 + i*h2 a partir de um único digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.tamanho
+
+    def add(self, item: str) -> None:
+        for pos in self._posicoes(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._posicoes(item))
+
+
+class TokenRevocationList:
+    """
+    Lista de tokens revogados mantida em memória.
+
+    A consulta não acessa o banco: o filtro de Bloom descarta quase todos os
+    tokens válidos e apenas os candidatos são confirmados no dicionário.
+    A tabela `tokens_revogados` é a fonte da verdade e é sincronizada
+    periodicamente para propagar revogações feitas por outros processos.
+    """
+
+    def __init__(self, capacidade: int = 100_000, taxa_falsos_positivos: float = 0.001):
+        self.capacidade = capacidade
+        self.taxa_falsos_positivos = taxa_falsos_positivos
+        self._lock = threading.Lock()
+        self._revogados: Dict[str, datetime] = {}
+        self._bloom = BloomFilter(capacidade, taxa_falsos_positivos)
+        self.ultima_sincronizacao: Optional[datetime] = None
+
+    def revoke(self, jti: str, expira_em: datetime) -> None:
+        """Marcar um token como revogado apenas em memória"""
+        with self._lock:
+            self._revogados[jti] = expira_em
+            if len(self._revogados) > self.capacidade:
+                self._reconstruir(self._revogados)
+            else:
+                self._bloom.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Verificar se o token foi revogado"""
+        if jti not in self._bloom:
+            return False
+        return jti in self._revogados
+
+    def _reconstruir(self, revogados: Dict[str, datetime]) -> None:
+        capacidade = max(self.capacidade, 2 * len(revogados))
+        bloom = BloomFilter(capacidade, self.taxa_falsos_positivos)
+        for jti in revogados:
+            bloom.add(jti)
+        self.capacidade = capacidade
+        self._revogados = revogados
+        self._bloom = bloom
+
+    def sync(self, db: Session) -> int:
+        """Recarregar as revogações a partir do banco, descartando as expiradas"""
+        agora = datetime.utcnow()
+        db.query(TokenRevogado).filter(TokenRevogado.expira_em < agora).delete(
+            synchronize_session=False
+        )
+        db.commit()
+
+        revogados = dict(
+            db.query(TokenRevogado.jti, TokenRevogado.expira_em).all()
+        )
+        with self._lock:
+            # Preservar revogações locais ainda não visíveis na consulta
+            for jti, expira_em in self._revogados.items():
+                if expira_em >= agora:
+                    revogados.setdefault(jti, expira_em)
+            self._reconstruir(revogados)
+            self.ultima_sincronizacao = agora
+        return len(revogados)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reconstruir({})
+
+
+revocation_list = TokenRevocationList()
+
+
+def revoke_token(db: Session, payload: dict) -> None:
+    """Revogar o token descrito pelo payload JWT (persistindo no banco)"""
+    jti = payload.get("jti")
+    if not jti:
+        return
+
+    expira_em = datetime.utcfromtimestamp(payload["exp"])
+    if not db.query(TokenRevogado).filter(TokenRevogado.jti == jti).first():
+        db.add(TokenRevogado(jti=jti, expira_em=expira_em))
+        db.commit()
+    revocation_list.revoke(jti, expira_em)
+
+
+def remover_refresh_tokens_expirados(db: Session) -> int:
+    """
+    Apagar refresh tokens expirados. Tokens usados ou revogados ainda no
+    prazo ficam: são eles que detectam o reuso de um token rotacionado.
+    """
+    removidos = db.query(RefreshToken).filter(
+        RefreshToken.expira_em < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return removidos
+
+
+def sync_revocations(session_factory: Callable[[], Session]) -> int:
+    """Sincronizar a lista de revogação (e limpar refresh tokens expirados) usando uma sessão própria"""
+    db = session_factory()
+    try:
+        remover_refresh_tokens_expirados(db)
+        return revocation_list.sync(db)
+    finally:
+        db.close()
+
+
+async def sync_revocations_periodically(session_factory: Callable[[], Session], intervalo: float):
+    """Tarefa de fundo que mantém a lista de revogação atualizada"""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            await asyncio.to_thread(sync_revocations, session_factory)
+        except Exception as e:
+            print(f"❌ Erro ao sincronizar tokens revogados: {e}")
@@ -1,16 +1,27 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
+import hmac
+import secrets
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from app.core.config import settings
+from .revocation import revocation_list
 
 # Configurações de segurança
 SECRET_KEY = "banco_dio_secret_key_2024"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Contexto para hash de senhas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Contexto para hash de senhas (custo configurável via BCRYPT_ROUNDS)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar se a senha está correta"""
@@ -20,6 +31,10 @@ def get_password_hash(password: str) -> str:
     """Gerar hash da senha"""
     return pwd_context.hash(password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Verificar se o hash foi gerado com um custo diferente do configurado"""
+    return pwd_context.needs_update(hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Criar token JWT"""
     to_encode = data.copy()
@@ -28,21 +43,67 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     
-    to_encode.update({"exp": expire})
+    # O jti identifica o token para permitir revogação no logout
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> dict:
-    """Verificar e decodificar token JWT"""
+def create_refresh_token() -> str:
+    """Gerar um refresh token opaco e aleatório"""
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    """Calcular o HMAC do refresh token (rápido, ao contrário do bcrypt)"""
+    return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+def create_stream_ticket(sessao: dict, conta_numero: str) -> str:
+    """
+    Criar o ticket de curta duração que abre o stream SSE de uma conta.
+    O EventSource não envia cabeçalhos: o ticket vai na URL no lugar do
+    token de acesso e só serve para o stream dessa conta. Ele carrega o jti
+    e a expiração do token de acesso (a sessão), revalidados durante o stream.
+    """
+    expire = datetime.utcnow() + timedelta(seconds=settings.stream_ticket_seconds)
+    to_encode = {
+        "sub": sessao["sub"],
+        "escopo": "stream",
+        "conta": conta_numero,
+        "sessao": sessao.get("jti"),
+        "sessao_exp": sessao["exp"],
+        "exp": expire,
+        "jti": uuid.uuid4().hex,
+    }
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def sessao_ativa(ticket: dict) -> bool:
+    """Verificar se o token de acesso que originou o ticket segue válido e não revogado"""
+    if time.time() >= ticket["sessao_exp"]:
+        return False
+    sessao = ticket.get("sessao")
+    return not (sessao and revocation_list.is_revoked(sessao))
+
+def verify_token(token: str, escopo: Optional[str] = None) -> dict:
+    """
+    Verificar e decodificar token JWT. Tokens de acesso não têm escopo;
+    tickets de stream (escopo "stream") só valem onde esse escopo é exigido.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         cpf: str = payload.get("sub")
-        if cpf is None:
+        if cpf is None or payload.get("escopo") != escopo:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token inválido",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        
+        jti = payload.get("jti")
+        if jti and revocation_list.is_revoked(jti):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token revogado",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
         return payload
     except JWTError:
         raise HTTPException(
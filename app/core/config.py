@@ -11,14 +11,74 @@ class Settings(BaseSettings):
     secret_key: str = "sua-chave-secreta-super-segura-aqui-mude-em-producao"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    revocation_sync_interval_seconds: int = 30
+    shard_outbox_interval_seconds: int = 15
+    
+    # Tentativas de uma operação em conflito de versão da conta (concorrência otimista)
+    optimistic_retries: int = 3
+    
+    # Liquidação assíncrona de PIX (trabalhadores por processo)
+    pix_workers: int = 2
+    pix_batch_size: int = 100
+    pix_poll_interval_seconds: float = 1.0
+    pix_max_attempts: int = 5  # falhas seguidas antes de o item ir para a fila morta
+    
+    # Relay de eventos de saldo para o broker em memória
+    events_relay_enabled: bool = True
+    events_relay_interval_seconds: float = 0.5
+    events_retention_hours: int = 24
+    
+    # Streams SSE (/stream/contas/{numero})
+    stream_heartbeat_seconds: float = 15.0
+    stream_queue_size: int = 100
+    stream_ticket_seconds: int = 60  # validade do ticket usado para abrir o stream
+    
+    # Token exigido em GET /metrics (Authorization: Bearer <token>); vazio = rota desativada
+    metrics_token: Optional[str] = None
+    
+    # Cache dos extratos já montados (LRU limitado pelo tamanho do JSON)
+    extrato_cache_max_bytes: int = 32 * 1024 * 1024
     
     # App
     app_name: str = "Sistema Bancário DIO"
     debug: bool = True
     
+    # Servidor (python -m app.server)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0  # 0 = um worker por núcleo
+    server_keepalive: int = 5  # segundos
+    server_backlog: int = 2048
+    server_loop: str = "auto"  # auto, uvloop ou asyncio
+    server_http: str = "auto"  # auto, httptools ou h11
+    server_graceful_timeout: int = 30  # segundos para concluir requisições no SIGTERM
+    server_access_log: bool = False
+    server_reload: bool = False
+    log_level: str = "info"
+    
+    # Build do React servido pela própria API (ex.: frontend/build); vazio = só API
+    frontend_build_dir: Optional[str] = None
+    
+    # Compressão de respostas (brotli se instalado, senão gzip)
+    compression_minimum_size: int = 1024  # bytes; respostas menores vão sem compressão
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    
+    # Arquivamento de transações antigas em Parquet (python -m app.services.arquivo)
+    archive_dir: str = "./arquivo"
+    archive_hot_days: int = 365
+    
     # Security
     bcrypt_rounds: int = 12
     
+    # Rate limiting (balde de fichas: capacidade de rajada e reposição por minuto)
+    login_rate_limit_ip_capacidade: int = 20
+    login_rate_limit_ip_por_minuto: float = 10
+    login_rate_limit_cpf_capacidade: int = 5
+    login_rate_limit_cpf_por_minuto: float = 2
+    refresh_rate_limit_ip_capacidade: int = 30
+    refresh_rate_limit_ip_por_minuto: float = 30
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,3 +1,23 @@
-from .config import engine, SessionLocal, get_db, create_tables
+from .config import (
+    engine,
+    SessionLocal,
+    get_db,
+    get_read_db,
+    get_shard_db,
+    get_shard_read_db,
+    read_router,
+    shard_router,
+    create_tables
+)
 
-__all__ = ["engine", "SessionLocal", "get_db", "create_tables"]
\ No newline at end of file
+__all__ = [
+    "engine",
+    "SessionLocal",
+    "get_db",
+    "get_read_db",
+    "get_shard_db",
+    "get_shard_read_db",
+    "read_router",
+    "shard_router",
+    "create_tables",
+]
\ No newline at end of file
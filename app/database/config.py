@@ -1,7 +1,20 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from typing import Optional
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
 from app.models.base import Base
+from .routing import ReadRouter, registrar_escrita, ultima_escrita
+from .sharding import ShardRouter
+
+# Configuração do Alembic (usada para descobrir a revisão mais recente)
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "alembic.ini")
+
+# Trava consultiva que serializa as migrações entre workers e instâncias
+MIGRATION_LOCK = "banco_dio_migracoes"
+MIGRATION_LOCK_TIMEOUT = 300  # segundos
 
 # URL de conexão com o banco
 DATABASE_URL = os.getenv(
@@ -20,14 +33,158 @@ engine = create_engine(
 # Configuração da sessão
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def create_tables():
-    """Criar todas as tabelas no banco de dados"""
-    Base.metadata.create_all(bind=engine)
+# Réplicas de leitura (URLs separadas por vírgula); vazio = tudo no primário
+REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+
+replica_engines = [
+    create_engine(url, pool_pre_ping=True, pool_recycle=300)
+    for url in REPLICA_URLS
+]
+
+ReplicaSessionsLocal = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    for replica_engine in replica_engines
+]
+
+# Após gravar, o cliente lê do primário por alguns segundos (read-your-writes)
+read_router = ReadRouter(
+    SessionLocal,
+    ReplicaSessionsLocal,
+    sticky_seconds=float(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "5")),
+)
+
+# Shards adicionais para contas e transações (o shard 0 é o primário)
+SHARD_URLS = [
+    url.strip() for url in os.getenv("DATABASE_SHARD_URLS", "").split(",") if url.strip()
+]
+
+shard_engines = [engine] + [
+    create_engine(url, pool_pre_ping=True, pool_recycle=300)
+    for url in SHARD_URLS
+]
+
+shard_router = ShardRouter([SessionLocal] + [
+    sessionmaker(autocommit=False, autoflush=False, bind=shard_engine)
+    for shard_engine in shard_engines[1:]
+])
+
+@event.listens_for(SessionLocal, "after_commit")
+def _registrar_escrita(session: Session):
+    """Torna o autor de um commit no primário 'grudado' no primário (cookie da resposta)"""
+    registrar_escrita(read_router.agora())
+
+def alembic_head() -> Optional[str]:
+    """Revisão mais recente entre as migrações do projeto"""
+    # Import tardio: o Alembic só é necessário durante o startup
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+
+def schema_is_current(bind: Engine = None) -> bool:
+    """Verifica (com uma única consulta) se o banco já está na revisão mais recente"""
+    from alembic.runtime.migration import MigrationContext
+
+    with (bind or engine).connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+    return current is not None and current == alembic_head()
+
+@contextmanager
+def _trava_de_migracao(connection: Connection):
+    """
+    Só um processo por vez migra o banco (GET_LOCK no MySQL, advisory lock
+    no PostgreSQL). No SQLite, usado apenas em desenvolvimento, não há trava.
+    """
+    dialeto = connection.dialect.name
+    if dialeto == "mysql":
+        obtida = connection.execute(
+            text("SELECT GET_LOCK(:nome, :espera)"),
+            {"nome": MIGRATION_LOCK, "espera": MIGRATION_LOCK_TIMEOUT}
+        ).scalar()
+        if obtida != 1:
+            raise RuntimeError("Tempo esgotado aguardando a migração feita por outro processo")
+    elif dialeto == "postgresql":
+        connection.execute(text("SELECT pg_advisory_lock(hashtext(:nome))"), {"nome": MIGRATION_LOCK})
+    try:
+        yield
+    finally:
+        if dialeto == "mysql":
+            connection.execute(text("SELECT RELEASE_LOCK(:nome)"), {"nome": MIGRATION_LOCK})
+        elif dialeto == "postgresql":
+            connection.execute(text("SELECT pg_advisory_unlock(hashtext(:nome))"), {"nome": MIGRATION_LOCK})
+
+def _migrar(connection: Connection, atual: Optional[str]) -> None:
+    """Leva o banco da revisão `atual` até a head"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.attributes["connection"] = connection
+    # Não reconfigurar o logging da aplicação (uvicorn) a partir do alembic.ini
+    config.attributes["configure_logger"] = False
+
+    if atual is None and inspect(connection).get_table_names():
+        raise RuntimeError(
+            "O banco tem tabelas mas não tem alembic_version: marque a revisão "
+            "correspondente com `alembic stamp <revisão>` e reinicie"
+        )
+    if atual is None and connection.dialect.name != "mysql":
+        # Banco vazio: create_all gera o mesmo schema das migrações (alembic check)
+        # e é bem mais rápido. No MySQL as migrações também particionam `transacoes`.
+        Base.metadata.create_all(bind=connection)
+        command.stamp(config, "head")
+        return
+    command.upgrade(config, "head")
+
+def create_tables(bind: Engine = None) -> bool:
+    """
+    Leva o banco (e os shards adicionais) à revisão mais recente das
+    migrações, sob uma trava no banco para que workers iniciando juntos não
+    migrem ao mesmo tempo. Retorna False quando o schema já estava
+    atualizado e nada foi feito.
+    """
+    binds = [bind] if bind is not None else shard_engines
+    head = alembic_head()
+    migrou = False
+    for shard_engine in binds:
+        if schema_is_current(shard_engine):
+            continue
+        with shard_engine.connect() as connection:
+            with _trava_de_migracao(connection):
+                from alembic.runtime.migration import MigrationContext
+
+                # Outro processo pode ter migrado enquanto esperávamos a trava
+                atual = MigrationContext.configure(connection).get_current_revision()
+                if atual != head:
+                    _migrar(connection, atual)
+                    migrou = True
+                connection.commit()
+    return migrou
 
 def get_db():
-    """Dependency para obter sessão do banco de dados"""
+    """Dependency para obter sessão do banco de dados (primário)"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_shard_db(conta_numero: str, db: Session = Depends(get_db)):
+    """Dependency com a sessão do shard da conta informada no path"""
+    with shard_router.session_scope(conta_numero, padrao=db) as shard_db:
+        yield shard_db
+
+def get_read_db(request: Request):
+    """Dependency para rotas somente leitura (réplica, quando configurada)"""
+    db = read_router.session_for(ultima_escrita(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_shard_read_db(conta_numero: str, db: Session = Depends(get_read_db)):
+    """Dependency somente leitura com a sessão do shard da conta"""
+    with shard_router.session_scope(conta_numero, padrao=db) as shard_db:
+        yield shard_db
\ No newline at end of file
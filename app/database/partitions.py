@@ -0,0 +1,186 @@
+"""
+Manutenção das partições mensais da tabela `transacoes` (MySQL).
+
+A tabela é particionada por `RANGE COLUMNS(created_at)`, uma partição por
+mês (`pAAAAMM`) mais a partição `pmax` que recebe o que estiver além da
+última fronteira. Consultas com filtro em `created_at` (como o extrato)
+leem apenas as partições do período.
+
+Uso:
+    python -m app.database.partitions --meses-futuros 3 --reter-meses 24
+
+O comando cria as partições dos próximos meses (dividindo a `pmax`, que
+deve estar vazia) e move os meses anteriores à retenção para tabelas
+avulsas `transacoes_arquivo_AAAAMM` via EXCHANGE PARTITION, sem copiar
+linhas. Em bancos que não são MySQL o comando não faz nada.
+"""
+import argparse
+import re
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+TABELA = "transacoes"
+PARTICAO_MAXIMA = "pmax"
+PREFIXO_ARQUIVO = "transacoes_arquivo_"
+
+_NOME_PARTICAO = re.compile(r"^p(\d{4})(\d{2})$")
+
+
+def somar_meses(ano: int, mes: int, meses: int) -> Tuple[int, int]:
+    """(ano, mes) deslocado de `meses` meses"""
+    total = ano * 12 + (mes - 1) + meses
+    return total // 12, total % 12 + 1
+
+
+def nome_particao(ano: int, mes: int) -> str:
+    return f"p{ano:04d}{mes:02d}"
+
+
+def mes_da_particao(nome: str) -> Optional[Tuple[int, int]]:
+    """(ano, mes) de uma partição mensal; None para `pmax` e afins"""
+    encontrado = _NOME_PARTICAO.match(nome)
+    if not encontrado:
+        return None
+    return int(encontrado.group(1)), int(encontrado.group(2))
+
+
+def definicao_particao(ano: int, mes: int) -> str:
+    """Partição do mês: tudo antes do primeiro dia do mês seguinte"""
+    proximo_ano, proximo_mes = somar_meses(ano, mes, 1)
+    return (
+        f"PARTITION {nome_particao(ano, mes)} "
+        f"VALUES LESS THAN ('{proximo_ano:04d}-{proximo_mes:02d}-01')"
+    )
+
+
+def meses_entre(inicio: Tuple[int, int], fim: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """Meses de `inicio` a `fim`, inclusive"""
+    meses = []
+    atual = inicio
+    while atual <= fim:
+        meses.append(atual)
+        atual = somar_meses(*atual, 1)
+    return meses
+
+
+def sql_particionar(inicio: Tuple[int, int], fim: Tuple[int, int]) -> str:
+    """ALTER TABLE que particiona `transacoes` de `inicio` a `fim` (+ pmax)"""
+    particoes = [definicao_particao(*mes) for mes in meses_entre(inicio, fim)]
+    particoes.append(f"PARTITION {PARTICAO_MAXIMA} VALUES LESS THAN (MAXVALUE)")
+    return (
+        f"ALTER TABLE {TABELA} PARTITION BY RANGE COLUMNS(created_at) (\n    "
+        + ",\n    ".join(particoes)
+        + "\n)"
+    )
+
+
+def planejar_futuras(existentes: List[str], hoje: date, meses_futuros: int) -> List[Tuple[int, int]]:
+    """Meses que ainda precisam de partição até `hoje` + `meses_futuros`"""
+    mensais = [mes for mes in map(mes_da_particao, existentes) if mes]
+    alvo = somar_meses(hoje.year, hoje.month, meses_futuros)
+    if not mensais:
+        return meses_entre((hoje.year, hoje.month), alvo)
+    ultima = max(mensais)
+    if ultima >= alvo:
+        return []
+    return meses_entre(somar_meses(*ultima, 1), alvo)
+
+
+def planejar_arquivamento(existentes: List[str], hoje: date, reter_meses: int) -> List[str]:
+    """Partições inteiramente anteriores à janela de retenção"""
+    limite = somar_meses(hoje.year, hoje.month, -reter_meses)
+    return sorted(
+        nome for nome in existentes
+        if mes_da_particao(nome) and mes_da_particao(nome) < limite
+    )
+
+
+def sql_criar_futuras(meses: List[Tuple[int, int]]) -> str:
+    """Divide a `pmax` nas partições dos meses informados"""
+    particoes = [definicao_particao(*mes) for mes in meses]
+    particoes.append(f"PARTITION {PARTICAO_MAXIMA} VALUES LESS THAN (MAXVALUE)")
+    return (
+        f"ALTER TABLE {TABELA} REORGANIZE PARTITION {PARTICAO_MAXIMA} INTO (\n    "
+        + ",\n    ".join(particoes)
+        + "\n)"
+    )
+
+
+def sql_arquivar(nome: str) -> List[str]:
+    """Move a partição para uma tabela avulsa e a remove de `transacoes`"""
+    arquivo = PREFIXO_ARQUIVO + nome[1:]
+    return [
+        f"CREATE TABLE {arquivo} LIKE {TABELA}",
+        f"ALTER TABLE {arquivo} REMOVE PARTITIONING",
+        f"ALTER TABLE {TABELA} EXCHANGE PARTITION {nome} WITH TABLE {arquivo}",
+        f"ALTER TABLE {TABELA} DROP PARTITION {nome}",
+    ]
+
+
+def particoes_existentes(conn: Connection) -> List[str]:
+    """Partições atuais de `transacoes` (lista vazia se não particionada)"""
+    linhas = conn.execute(text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabela "
+        "AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"tabela": TABELA})
+    return [linha[0] for linha in linhas]
+
+
+def manter_particoes(
+    conn: Connection,
+    hoje: Optional[date] = None,
+    meses_futuros: int = 3,
+    reter_meses: Optional[int] = None,
+) -> dict:
+    """
+    Cria as partições futuras e, se `reter_meses` for informado, arquiva
+    as mais antigas. Retorna o que foi feito.
+    """
+    resultado = {"criadas": [], "arquivadas": []}
+    if conn.dialect.name != "mysql":
+        return resultado
+
+    # As fronteiras comparam com created_at, gravado em UTC
+    hoje = hoje or datetime.utcnow().date()
+    existentes = particoes_existentes(conn)
+    if not existentes:
+        raise RuntimeError("A tabela transacoes não está particionada; rode as migrações")
+
+    futuras = planejar_futuras(existentes, hoje, meses_futuros)
+    if futuras:
+        conn.execute(text(sql_criar_futuras(futuras)))
+        resultado["criadas"] = [nome_particao(*mes) for mes in futuras]
+
+    if reter_meses is not None:
+        for nome in planejar_arquivamento(existentes, hoje, reter_meses):
+            for comando in sql_arquivar(nome):
+                conn.execute(text(comando))
+            resultado["arquivadas"].append(nome)
+
+    return resultado
+
+
+def main():
+    from .config import shard_engines
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meses-futuros", type=int, default=3, help="Meses à frente com partição pronta")
+    parser.add_argument("--reter-meses", type=int, default=None, help="Arquivar partições mais antigas que isto")
+    args = parser.parse_args()
+
+    for indice, shard_engine in enumerate(shard_engines):
+        if shard_engine.dialect.name != "mysql":
+            print(f"⚠️ Shard {indice}: particionamento disponível apenas no MySQL")
+            continue
+        with shard_engine.begin() as conn:
+            resultado = manter_particoes(conn, meses_futuros=args.meses_futuros, reter_meses=args.reter_meses)
+        print(f"✅ Shard {indice}: criadas {resultado['criadas'] or '-'}, arquivadas {resultado['arquivadas'] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
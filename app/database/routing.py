@@ -0,0 +1,73 @@
+import contextvars
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+# Cookie com o instante (epoch) da última escrita do cliente no primário
+COOKIE_ULTIMA_ESCRITA = "ultima_escrita"
+
+# Instante da escrita feita durante a requisição atual (ver ReadYourWritesMiddleware).
+# A lista é criada pelo middleware e compartilhada pelos contextos copiados da requisição.
+escrita_da_requisicao: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "escrita_da_requisicao", default=None
+)
+
+
+class ReadRouter:
+    """
+    Escolhe a sessão usada pelas rotas somente leitura.
+
+    As leituras são distribuídas entre as réplicas em rodízio. Depois que um
+    cliente grava no primário, a resposta leva o cookie `ultima_escrita` com
+    o instante da escrita; enquanto ele tiver menos de `sticky_seconds`, as
+    leituras desse cliente vão ao primário, garantindo que ele veja a própria
+    escrita mesmo com atraso de replicação. O estado fica com o cliente, e
+    não na memória do processo, então vale para qualquer worker.
+    """
+
+    def __init__(
+        self,
+        primary_factory: Callable[[], Session],
+        replica_factories: Optional[List[Callable[[], Session]]] = None,
+        sticky_seconds: float = 5.0,
+        relogio: Callable[[], float] = time.time,
+    ):
+        self.primary_factory = primary_factory
+        self.replica_factories = replica_factories or []
+        self.sticky_seconds = sticky_seconds
+        self._relogio = relogio
+        self._rodizio = itertools.cycle(self.replica_factories) if self.replica_factories else None
+        self._lock = threading.Lock()
+
+    def agora(self) -> float:
+        return self._relogio()
+
+    def is_sticky(self, ultima_escrita: Optional[float]) -> bool:
+        return ultima_escrita is not None and self._relogio() - ultima_escrita < self.sticky_seconds
+
+    def session_for(self, ultima_escrita: Optional[float]) -> Session:
+        """Sessão para uma leitura do cliente cuja última escrita foi em `ultima_escrita`"""
+        if self._rodizio is None or self.is_sticky(ultima_escrita):
+            return self.primary_factory()
+        with self._lock:
+            factory = next(self._rodizio)
+        return factory()
+
+
+def registrar_escrita(momento: float) -> None:
+    """Marca a requisição atual como autora de uma escrita no primário"""
+    escrita = escrita_da_requisicao.get()
+    if escrita is not None:
+        escrita[:] = [momento]
+
+
+def ultima_escrita(request: Request) -> Optional[float]:
+    """Instante da última escrita do cliente, lido do cookie (None se ausente ou inválido)"""
+    try:
+        return float(request.cookies[COOKIE_ULTIMA_ESCRITA])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,111 @@
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import Cliente
+
+
+class ShardRouter:
+    """
+    Distribui as contas (e suas transações) entre N bancos.
+
+    O shard é escolhido pelo número da conta, que é globalmente único.
+    O shard 0 é sempre o banco primário (DATABASE_URL); os demais vêm de
+    DATABASE_SHARD_URLS. Com um único shard tudo continua no primário.
+    A tabela `clientes` é replicada em todos os shards (mesmo id) para que
+    as chaves estrangeiras e os nomes dos clientes estejam disponíveis
+    localmente.
+    """
+
+    def __init__(self, session_factories: List[Callable[[], Session]]):
+        if not session_factories:
+            raise ValueError("É necessário ao menos um shard")
+        self.session_factories = session_factories
+
+    @property
+    def count(self) -> int:
+        return len(self.session_factories)
+
+    def shard_for(self, conta_numero: str) -> int:
+        """Shard responsável pela conta (hash estável do número)"""
+        if self.count == 1:
+            return 0
+        return zlib.crc32(conta_numero.encode()) % self.count
+
+    def same_shard(self, numero_a: str, numero_b: str) -> bool:
+        return self.shard_for(numero_a) == self.shard_for(numero_b)
+
+    @contextmanager
+    def shard_session(
+        self, shard: int, padrao: Session, abertas: Optional[Dict[int, Session]] = None
+    ) -> Iterator[Session]:
+        """
+        Sessão do shard pelo índice. O shard 0 usa `padrao` (a sessão do
+        primário); os shards em `abertas` (índice -> sessão já aberta pela
+        requisição) são reutilizados; para os demais abre e fecha uma nova.
+        """
+        if shard == 0:
+            yield padrao
+            return
+        if abertas and shard in abertas:
+            yield abertas[shard]
+            return
+        db = self.session_factories[shard]()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @contextmanager
+    def session_scope(
+        self, conta_numero: str, padrao: Session, abertas: Optional[Dict[int, Session]] = None
+    ) -> Iterator[Session]:
+        """Sessão do shard da conta (veja `shard_session`)"""
+        with self.shard_session(self.shard_for(conta_numero), padrao, abertas) as db:
+            yield db
+
+    @contextmanager
+    def all_sessions(
+        self, padrao: Session, abertas: Optional[Dict[int, Session]] = None
+    ) -> Iterator[List[Session]]:
+        """Sessões de todos os shards, na ordem dos índices (consultas espalhadas)"""
+        sessoes, novas = [padrao], []
+        for indice, factory in enumerate(self.session_factories[1:], start=1):
+            if abertas and indice in abertas:
+                sessoes.append(abertas[indice])
+            else:
+                novas.append(factory())
+                sessoes.append(novas[-1])
+        try:
+            yield sessoes
+        finally:
+            for db in novas:
+                db.close()
+
+
+def replicar_cliente(router: ShardRouter, db: Session, cliente: Cliente) -> None:
+    """Copia (ou atualiza) o cliente do primário nos demais shards"""
+    with router.all_sessions(padrao=db) as sessoes:
+        for shard_db in sessoes[1:]:
+            shard_db.merge(Cliente(
+                id=cliente.id,
+                cpf=cliente.cpf,
+                nome=cliente.nome,
+                data_nascimento=cliente.data_nascimento,
+                endereco=cliente.endereco,
+                senha_hash=cliente.senha_hash,
+                ativo=cliente.ativo,
+            ))
+            shard_db.commit()
+
+
+def remover_cliente_replicado(router: ShardRouter, db: Session, cpf: str) -> None:
+    """Remove as cópias do cliente nos demais shards"""
+    with router.all_sessions(padrao=db) as sessoes:
+        for shard_db in sessoes[1:]:
+            copia = shard_db.query(Cliente).filter(Cliente.cpf == cpf).first()
+            if copia:
+                shard_db.delete(copia)
+                shard_db.commit()
@@ -1,25 +1,81 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from typing import Optional
+import asyncio
+import hmac
 
-from .database import create_tables
-from .routes import auth, conta, transacao, pix
-from .middleware import SecurityHeadersMiddleware
+from .core import settings
+from .database import SessionLocal, create_tables, read_router, shard_router
+from .auth.revocation import sync_revocations, sync_revocations_periodically
+from .auth.rate_limit import rate_limit_metrics
+from .services import processar_transferencias_periodicamente
+from .services.liquidacao import trabalhador_pix
+from .services.eventos import RelayEventos, broker, relay_eventos
+from .services.cache_extrato import cache_extrato
+from .routes import auth, conta, transacao, pix, stream
+from .middleware import SecurityHeadersMiddleware, CompressionMiddleware, ReadYourWritesMiddleware
+from .static import SPANavigationMiddleware, criar_frontend
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia o ciclo de vida da aplicação"""
     # Startup
     try:
-        create_tables()
-        print("✅ Tabelas do banco de dados criadas/verificadas")
+        if create_tables():
+            print("✅ Migrações do banco de dados aplicadas")
+        else:
+            print("✅ Schema do banco de dados já está na versão mais recente")
     except Exception as e:
         print(f"❌ Erro ao criar tabelas: {e}")
         raise
     
+    # Carregar tokens revogados e manter a lista sincronizada
+    sync_revocations(SessionLocal)
+    revocation_task = asyncio.create_task(
+        sync_revocations_periodically(SessionLocal, settings.revocation_sync_interval_seconds)
+    )
+    
+    # Concluir transferências entre shards que ficaram pela metade
+    outbox_task = None
+    if shard_router.count > 1:
+        outbox_task = asyncio.create_task(
+            processar_transferencias_periodicamente(shard_router, settings.shard_outbox_interval_seconds)
+        )
+    
+    # Trabalhadores que liquidam a fila de PIX
+    pix_tasks = [
+        asyncio.create_task(
+            trabalhador_pix(shard_router, settings.pix_batch_size, settings.pix_poll_interval_seconds)
+        )
+        for _ in range(settings.pix_workers)
+    ]
+    
+    # Publicar os eventos de saldo para os assinantes deste processo
+    relay_task = None
+    if settings.events_relay_enabled:
+        relay_task = asyncio.create_task(
+            relay_eventos(
+                RelayEventos(shard_router),
+                broker,
+                settings.events_relay_interval_seconds,
+                settings.events_retention_hours,
+            )
+        )
+    
     yield
     
     # Shutdown
+    if relay_task:
+        relay_task.cancel()
+    revocation_task.cancel()
+    if outbox_task:
+        outbox_task.cancel()
+    for task in pix_tasks:
+        task.cancel()
     print("🔄 Aplicação finalizada")
 
 # Criar instância do FastAPI
@@ -32,9 +88,17 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Build do frontend servido pela API (produção, um único container)
+frontend = criar_frontend(settings.frontend_build_dir)
+if frontend:
+    app.add_middleware(SPANavigationMiddleware, spa=frontend)
+
 # Configurar middlewares de segurança
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Cookie de última escrita: leituras logo após gravar vão ao primário, em qualquer worker
+app.add_middleware(ReadYourWritesMiddleware, router=read_router)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -44,11 +108,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Comprimir respostas grandes (extrato, detalhes da conta); streams SSE passam direto
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+
+@app.exception_handler(StaleDataError)
+async def conflito_de_versao(request: Request, exc: StaleDataError):
+    """Conta alterada por outra operação e tentativas esgotadas"""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "A conta foi alterada por outra operação; tente novamente"}
+    )
+
 # Incluir routers
 app.include_router(auth.router)
 app.include_router(conta.router)
 app.include_router(transacao.router)
 app.include_router(pix.router)
+app.include_router(stream.router)
 
 @app.get("/")
 async def root():
@@ -69,12 +150,37 @@ async def health_check():
         "service": "Sistema Bancário DIO"
     }
 
+def exigir_token_de_metricas(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+):
+    """
+    Os contadores expõem detalhes internos (limites, broker, cache): a rota só
+    existe com METRICS_TOKEN configurado e exige esse token no cabeçalho.
+    """
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.metrics_token.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+@app.get("/metrics", dependencies=[Depends(exigir_token_de_metricas)], include_in_schema=False)
+async def metrics():
+    """Contadores internos da aplicação"""
+    return {
+        "rate_limit": rate_limit_metrics(),
+        "eventos": broker.metrics(),
+        "cache_extrato": cache_extrato.metrics()
+    }
+
+# Por último: as rotas da API têm precedência sobre os arquivos do build
+if frontend:
+    app.mount("/", frontend, name="frontend")
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    from .server import run
+    run()
\ No newline at end of file
@@ -1,3 +1,5 @@
 from .security import SecurityHeadersMiddleware
+from .compression import CompressionMiddleware
+from .read_your_writes import ReadYourWritesMiddleware
 
-__all__ = ["SecurityHeadersMiddleware"]
\ No newline at end of file
+__all__ = ["SecurityHeadersMiddleware", "CompressionMiddleware", "ReadYourWritesMiddleware"]
\ No newline at end of file
@@ -0,0 +1,190 @@
+import zlib
+from typing import List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pacote opcional
+    brotli = None
+
+# Tipos que compensam comprimir; imagens, PDFs e afins já são comprimidos.
+# text/event-stream fica de fora: cada evento precisa sair na hora.
+TIPOS_COMPRIMIVEIS = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+)
+
+
+def codificacoes_aceitas(accept_encoding: str, disponiveis: Sequence[str]) -> List[str]:
+    """Codificações de `disponiveis` aceitas pelo cliente, na ordem de preferência do servidor"""
+    aceitas = {}
+    for parte in accept_encoding.split(","):
+        nome, _, parametros = parte.strip().partition(";")
+        qualidade = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                qualidade = float(parametros[2:])
+            except ValueError:
+                qualidade = 0.0
+        if nome:
+            aceitas[nome.strip().lower()] = qualidade
+    return [
+        codificacao for codificacao in disponiveis
+        if aceitas.get(codificacao, aceitas.get("*", 0.0)) > 0
+    ]
+
+
+class _Compressor:
+    """Compressão incremental: cada pedaço sai completo (flush) para não atrasar streams"""
+
+    def __init__(self, codificacao: str, nivel_gzip: int, qualidade_brotli: int):
+        self.codificacao = codificacao
+        if codificacao == "br":
+            self._br = brotli.Compressor(quality=qualidade_brotli)
+        else:
+            self._gzip = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, dados: bytes) -> bytes:
+        if self.codificacao == "br":
+            return self._br.process(dados) + self._br.flush()
+        return self._gzip.compress(dados) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finalizar(self) -> bytes:
+        if self.codificacao == "br":
+            return self._br.finish()
+        return self._gzip.flush()
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas com brotli (se o pacote estiver instalado) ou gzip.
+
+    Middleware ASGI puro: respostas em streaming são comprimidas pedaço a
+    pedaço, sem acumular o corpo. Só comprime tipos da lista e respostas
+    com pelo menos `minimum_size` bytes; respostas que já têm
+    Content-Encoding (arquivos pré-comprimidos) passam direto.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        tipos: Sequence[str] = TIPOS_COMPRIMIVEIS,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.tipos = tuple(tipos)
+        self.disponiveis = ("br", "gzip") if brotli else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        aceitas = codificacoes_aceitas(Headers(scope=scope).get("accept-encoding", ""), self.disponiveis)
+        if not aceitas:
+            await self.app(scope, receive, send)
+            return
+
+        resposta = _RespostaComprimida(self, aceitas[0], send)
+        await self.app(scope, receive, resposta.enviar)
+
+
+class _RespostaComprimida:
+    def __init__(self, middleware: CompressionMiddleware, codificacao: str, send: Send):
+        self.middleware = middleware
+        self.codificacao = codificacao
+        self.send = send
+        self.inicio: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.acumulado = b""
+        self.direto = False
+
+    def _comprimivel(self, headers: Headers) -> bool:
+        if self.inicio["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        tipo = headers.get("content-type", "").split(";")[0].strip().lower()
+        return tipo in self.middleware.tipos
+
+    async def enviar(self, message: Message):
+        tipo = message["type"]
+        if tipo == "http.response.start":
+            # Aguardar o primeiro pedaço do corpo para decidir
+            self.inicio = message
+            return
+        if tipo != "http.response.body":
+            if self.inicio is not None and self.compressor is None and not self.direto:
+                # Ex.: http.response.zerocopy (sendfile): o corpo não passa por
+                # aqui, então a resposta segue sem compressão
+                self.direto = True
+                await self.send(self.inicio)
+                if self.acumulado:
+                    await self.send({"type": "http.response.body", "body": self.acumulado, "more_body": True})
+                    self.acumulado = b""
+            await self.send(message)
+            return
+
+        if self.direto:
+            await self.send(message)
+            return
+
+        corpo = message.get("body", b"")
+        mais = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.inicio["headers"])
+            if not self._comprimivel(headers):
+                self.direto = True
+                await self.send(self.inicio)
+                await self.send(message)
+                return
+
+            # O corpo pode chegar em pedaços (ex.: atrás de BaseHTTPMiddleware):
+            # acumular até saber se passa do tamanho mínimo
+            self.acumulado += corpo
+            if len(self.acumulado) < self.middleware.minimum_size:
+                if mais:
+                    return
+                self.direto = True
+                await self.send(self.inicio)
+                await self.send({"type": "http.response.body", "body": self.acumulado, "more_body": False})
+                return
+            corpo, self.acumulado = self.acumulado, b""
+
+            self.compressor = _Compressor(
+                self.codificacao, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            headers["Content-Encoding"] = self.codificacao
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # Outra representação do mesmo conteúdo: ETag fraco
+                headers["ETag"] = "W/" + etag
+            if mais:
+                del headers["Content-Length"]
+            else:
+                corpo = self.compressor.comprimir(corpo) + self.compressor.finalizar()
+                headers["Content-Length"] = str(len(corpo))
+                await self.send(self.inicio)
+                await self.send({"type": "http.response.body", "body": corpo, "more_body": False})
+                return
+            await self.send(self.inicio)
+
+        dados = self.compressor.comprimir(corpo)
+        if not mais:
+            dados += self.compressor.finalizar()
+        await self.send({"type": "http.response.body", "body": dados, "more_body": mais})
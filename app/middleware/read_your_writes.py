@@ -0,0 +1,40 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.database.routing import COOKIE_ULTIMA_ESCRITA, ReadRouter, escrita_da_requisicao
+
+
+class ReadYourWritesMiddleware:
+    """
+    Devolve ao cliente o cookie `ultima_escrita` quando a requisição gravou
+    no primário. As leituras seguintes, em qualquer worker, usam o cookie
+    para decidir entre o primário e uma réplica (ver ReadRouter). Sem
+    réplicas configuradas o middleware não faz nada.
+    """
+
+    def __init__(self, app: ASGIApp, router: ReadRouter):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.router.replica_factories:
+            await self.app(scope, receive, send)
+            return
+
+        escrita = []
+        token = escrita_da_requisicao.set(escrita)
+
+        async def enviar(message: Message):
+            if message["type"] == "http.response.start" and escrita:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{COOKIE_ULTIMA_ESCRITA}={escrita[0]:.3f}; Max-Age={int(self.router.sticky_seconds) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            escrita_da_requisicao.reset(token)
@@ -1,19 +1,44 @@
 from .base import Base, BaseModel
+from .dinheiro import Dinheiro, para_centavos, de_centavos
 from .cliente import Cliente
-from .conta import Conta, ContaCorrente
-from .transacao import Transacao, Saque, Deposito
-from .pix import ChavePix, TransacaoPix, TipoChavePix
+from .conta import Conta, ContaCorrente, SubSaldo
+from .transacao import Transacao, Saque, Deposito, NATUREZA_DEBITO, NATUREZA_CREDITO, natureza_pelo_saldo
+from .pix import ChavePix, TransacaoPix, TipoChavePix, FilaPix
+from .token import TokenRevogado, RefreshToken
+from .transferencia import TransferenciaPendente, TransferenciaRecebida
+from .evento import Evento
+from .resumo import ResumoDiario
+from .razao import Lancamento, Partida, CONTA_CAIXA, CONTA_TRANSITO, CONTA_ABERTURA
 
 __all__ = [
     "Base",
     "BaseModel",
+    "Dinheiro",
+    "para_centavos",
+    "de_centavos",
     "Cliente",
     "Conta",
     "ContaCorrente",
+    "SubSaldo",
     "Transacao",
     "Saque",
     "Deposito",
+    "NATUREZA_DEBITO",
+    "NATUREZA_CREDITO",
+    "natureza_pelo_saldo",
     "ChavePix",
     "TransacaoPix",
     "TipoChavePix",
+    "FilaPix",
+    "TokenRevogado",
+    "RefreshToken",
+    "TransferenciaPendente",
+    "TransferenciaRecebida",
+    "Evento",
+    "ResumoDiario",
+    "Lancamento",
+    "Partida",
+    "CONTA_CAIXA",
+    "CONTA_TRANSITO",
+    "CONTA_ABERTURA",
 ]
\ No newline at end of file
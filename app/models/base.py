@@ -1,12 +1,14 @@
-from sqlalchemy import Column, Integer, DateTime, func
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
 class BaseModel(Base):
-    """Modelo base com campos comuns"""
+    """Modelo base com campos comuns (datas sem fuso, sempre em UTC)"""
     __abstract__ = True
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
\ No newline at end of file
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Integer, Numeric, ForeignKey, Boolean
+from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .base import BaseModel
+from .dinheiro import Dinheiro
 
 class Conta(BaseModel):
     """Modelo para Conta Bancária"""
@@ -8,9 +9,15 @@ class Conta(BaseModel):
     
     numero = Column(String(20), unique=True, index=True, nullable=False)
     agencia = Column(String(10), nullable=False, default="0001")
-    saldo = Column(Numeric(15, 2), nullable=False, default=0.00)
+    saldo = Column(Dinheiro(), nullable=False, default=0.00)
     tipo_conta = Column(String(20), nullable=False, default="corrente")
     ativa = Column(Boolean, default=True, nullable=False)
+    # Contas muito movimentadas recebem créditos em N sub-saldos (ver SubSaldo);
+    # 1 = saldo apenas nesta linha
+    faixas_saldo = Column(Integer, nullable=False, default=1)
+    # Controle de concorrência otimista: todo UPDATE incrementa e confere a versão
+    # (StaleDataError se outra transação alterou a conta antes); base dos ETags
+    versao = Column(Integer, nullable=False, default=0)
     
     # Chave estrangeira
     cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
@@ -18,6 +25,11 @@ class Conta(BaseModel):
     # Relacionamentos
     cliente = relationship("Cliente", back_populates="contas")
     transacoes = relationship("Transacao", back_populates="conta", cascade="all, delete-orphan")
+    sub_saldos = relationship("SubSaldo", back_populates="conta", cascade="all, delete-orphan")
+    
+    __mapper_args__ = {
+        "version_id_col": versao,
+    }
     
     def __repr__(self):
         return f"<Conta(numero={self.numero}, saldo={self.saldo})>"
@@ -27,7 +39,7 @@ class ContaCorrente(Conta):
     __tablename__ = "contas_corrente"
     
     id = Column(Integer, ForeignKey("contas.id"), primary_key=True)
-    limite = Column(Numeric(10, 2), nullable=False, default=500.00)
+    limite = Column(Dinheiro(), nullable=False, default=500.00)
     limite_saques = Column(Integer, nullable=False, default=3)
     saques_realizados = Column(Integer, nullable=False, default=0)
     
@@ -36,4 +48,29 @@ class ContaCorrente(Conta):
     }
     
     def __repr__(self):
-        return f"<ContaCorrente(numero={self.numero}, limite={self.limite})>"
\ No newline at end of file
+        return f"<ContaCorrente(numero={self.numero}, limite={self.limite})>"
+
+class SubSaldo(BaseModel):
+    """
+    Parcela do saldo de uma conta com faixas. Créditos concorrentes caem em
+    faixas diferentes e não disputam a mesma linha; o saldo da conta é
+    `Conta.saldo` mais a soma das faixas.
+    """
+    __tablename__ = "sub_saldos"
+    __table_args__ = (
+        UniqueConstraint("conta_id", "faixa", name="uq_sub_saldos_conta_faixa"),
+    )
+    
+    faixa = Column(Integer, nullable=False)
+    saldo = Column(Dinheiro(), nullable=False, default=0.00)
+    # Incrementada a cada crédito na faixa (ver Conta.versao)
+    versao = Column(Integer, nullable=False, default=0)
+    
+    # Chave estrangeira
+    conta_id = Column(Integer, ForeignKey("contas.id"), nullable=False)
+    
+    # Relacionamentos
+    conta = relationship("Conta", back_populates="sub_saldos")
+    
+    def __repr__(self):
+        return f"<SubSaldo(conta_id={self.conta_id}, faixa={self.faixa}, saldo={self.saldo})>"
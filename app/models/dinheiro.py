@@ -0,0 +1,51 @@
+"""
+Valores monetários em centavos inteiros.
+
+No banco o valor é um BIGINT de centavos: comparações, somas e índices
+trabalham com inteiros nativos e não há arredondamento de ponto flutuante
+em nenhum dialeto. No Python o valor continua um `Decimal` exato com duas
+casas, então o código de negócio não muda.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from numbers import Number
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+CENTAVO = Decimal("0.01")
+
+
+def para_centavos(valor) -> int:
+    """Reais (Decimal, int, float ou str) para centavos, arredondando meio centavo para cima"""
+    if not isinstance(valor, Decimal):
+        # Float pelo repr, para 0.1 virar 10 centavos e não 10.000000000000000555...
+        valor = Decimal(str(valor) if isinstance(valor, float) else valor)
+    return int(valor.scaleb(2).to_integral_value(ROUND_HALF_UP))
+
+
+def de_centavos(centavos: int) -> Decimal:
+    """Centavos para reais, sempre com duas casas (1234 -> Decimal('12.34'))"""
+    return Decimal(int(centavos)).scaleb(-2)
+
+
+class Dinheiro(TypeDecorator):
+    """Coluna monetária: BIGINT de centavos no banco, Decimal em reais no Python"""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return para_centavos(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return de_centavos(value)
+
+    def coerce_compared_value(self, op, value):
+        # Em `coluna + Decimal("5.00")` o literal também é convertido para centavos
+        if isinstance(value, (Number, str)):
+            return self
+        return super().coerce_compared_value(op, value)
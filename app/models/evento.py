@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer
+from sqlalchemy.orm import relationship
+from .base import BaseModel
+from .dinheiro import Dinheiro
+
+class Evento(BaseModel):
+    """
+    Outbox de eventos de saldo. Gravado na mesma transação da movimentação
+    e publicado depois pelo relay (app.services.eventos).
+    """
+    __tablename__ = "eventos"
+    
+    tipo = Column(String(40), nullable=False, default="saldo_alterado")
+    conta_numero = Column(String(20), index=True, nullable=False)
+    delta = Column(Dinheiro(), nullable=False)  # variação do saldo
+    saldo = Column(Dinheiro(), nullable=False)  # saldo após a movimentação
+    # Sem FK: transacoes é particionada e arquivada
+    transacao_id = Column(Integer, nullable=True)
+    
+    # Relacionamentos
+    transacao = relationship(
+        "Transacao",
+        primaryjoin="foreign(Evento.transacao_id) == Transacao.id",
+        enable_typechecks=False,
+    )
+    
+    def __repr__(self):
+        return f"<Evento(tipo={self.tipo}, conta_numero={self.conta_numero}, delta={self.delta})>"
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, DateTime, Enum
+from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, DateTime, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 from .base import BaseModel
+from .dinheiro import Dinheiro
 
 class TipoChavePix(enum.Enum):
     """Tipos de chave PIX"""
@@ -36,18 +37,49 @@ class TransacaoPix(BaseModel):
     
     chave_origem = Column(String(77), nullable=False)
     chave_destino = Column(String(77), nullable=False)
-    valor = Column(String(20), nullable=False)  # Valor em centavos como string
+    valor = Column(Dinheiro(), nullable=False)
     descricao = Column(String(200), nullable=True)
     status = Column(String(20), nullable=False, default="processando")
     data_transacao = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Chaves estrangeiras
-    conta_origem_id = Column(Integer, ForeignKey("contas.id"), nullable=False)
+    # Nula na cópia gravada no shard de destino de um PIX recebido de outro shard
+    conta_origem_id = Column(Integer, ForeignKey("contas.id"), nullable=True)
     conta_destino_id = Column(Integer, ForeignKey("contas.id"), nullable=True)  # Pode ser nulo se for conta externa
     
     # Relacionamentos
     conta_origem = relationship("Conta", foreign_keys=[conta_origem_id])
     conta_destino = relationship("Conta", foreign_keys=[conta_destino_id])
     
+    # Histórico de PIX enviados e recebidos por conta, do mais recente (paginação por chave)
+    __table_args__ = (
+        Index("ix_transacoes_pix_conta_origem_id_data_transacao", "conta_origem_id", "data_transacao"),
+        Index("ix_transacoes_pix_conta_destino_id_data_transacao", "conta_destino_id", "data_transacao"),
+    )
+    
+    def __repr__(self):
+        return f"<TransacaoPix(chave_destino={self.chave_destino}, valor={self.valor})>"
+
+class FilaPix(BaseModel):
+    """
+    Fila durável de PIX aceitos e ainda não liquidados. A linha é gravada
+    junto com a TransacaoPix ("processando") e removida na liquidação;
+    itens que falham repetidamente ficam com status "falhou" (fila morta).
+    """
+    __tablename__ = "fila_pix"
+    
+    transacao_pix_id = Column(Integer, ForeignKey("transacoes_pix.id"), unique=True, index=True, nullable=False)
+    conta_destino_numero = Column(String(20), nullable=False)
+    valor = Column(Dinheiro(), nullable=False)
+    descricao_origem = Column(Text, nullable=False)
+    descricao_destino = Column(Text, nullable=False)
+    status = Column(String(20), index=True, nullable=False, default="pendente")  # 'pendente', 'reservado', 'falhou'
+    lote = Column(String(32), index=True, nullable=True)
+    reservado_em = Column(DateTime, nullable=True)
+    tentativas = Column(Integer, nullable=False, default=0)
+    
+    # Relacionamentos
+    transacao_pix = relationship("TransacaoPix")
+    
     def __repr__(self):
-        return f"<TransacaoPix(chave_destino={self.chave_destino}, valor={self.valor})>"
\ No newline at end of file
+        return f"<FilaPix(transacao_pix_id={self.transacao_pix_id}, status={self.status})>"
@@ -0,0 +1,62 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, CheckConstraint
+from sqlalchemy.orm import relationship
+from .base import BaseModel
+from .dinheiro import Dinheiro
+
+# Contas internas do banco usadas como contrapartida das partidas
+CONTA_CAIXA = "caixa"  # dinheiro que entra/sai por depósitos e saques
+CONTA_TRANSITO = "transito"  # transferências entre shards ainda não creditadas
+CONTA_ABERTURA = "abertura"  # saldos anteriores ao razão
+
+class Lancamento(BaseModel):
+    """Lançamento do livro razão: conjunto de partidas que soma zero"""
+    __tablename__ = "lancamentos"
+    
+    # Compartilhado pelos lançamentos de uma mesma transferência (inclusive
+    # os dois lados de uma transferência entre shards)
+    transferencia_id = Column(String(32), index=True, nullable=False)
+    tipo = Column(String(20), nullable=False)
+    descricao = Column(Text, nullable=True)
+    
+    # Relacionamentos
+    partidas = relationship("Partida", back_populates="lancamento", cascade="all, delete-orphan")
+    
+    def __repr__(self):
+        return f"<Lancamento(transferencia_id={self.transferencia_id}, tipo={self.tipo})>"
+
+class Partida(BaseModel):
+    """
+    Partida de um lançamento. O valor é positivo para créditos e negativo
+    para débitos; o saldo de uma conta é a soma das suas partidas.
+    Registros só são inseridos, nunca alterados.
+    """
+    __tablename__ = "partidas"
+    __table_args__ = (
+        CheckConstraint(
+            "(conta_id IS NULL) <> (conta_sistema IS NULL)",
+            name="ck_partidas_uma_conta"
+        ),
+    )
+    
+    valor = Column(Dinheiro(), nullable=False)
+    conta_sistema = Column(String(20), nullable=True)  # CONTA_CAIXA, CONTA_TRANSITO...
+    
+    # Chaves estrangeiras
+    lancamento_id = Column(Integer, ForeignKey("lancamentos.id"), index=True, nullable=False)
+    conta_id = Column(Integer, ForeignKey("contas.id"), index=True, nullable=True)
+    # Sem FK: transacoes é particionada e arquivada, o vínculo é só informativo
+    transacao_id = Column(Integer, nullable=True)
+    
+    # Relacionamentos
+    lancamento = relationship("Lancamento", back_populates="partidas")
+    conta = relationship("Conta")
+    # Transacao não é carregada polimorficamente, daí enable_typechecks
+    # para aceitar Saque/Deposito
+    transacao = relationship(
+        "Transacao",
+        primaryjoin="foreign(Partida.transacao_id) == Transacao.id",
+        enable_typechecks=False,
+    )
+    
+    def __repr__(self):
+        return f"<Partida(conta_id={self.conta_id}, conta_sistema={self.conta_sistema}, valor={self.valor})>"
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Date, UniqueConstraint
+from .base import BaseModel
+from .dinheiro import Dinheiro
+
+class ResumoDiario(BaseModel):
+    """
+    Totais de uma conta em um dia, por tipo de transação, mantidos a cada
+    movimentação (ver app.services.resumos). Os totais de um extrato somam
+    no máximo ~31 dessas linhas em vez de percorrer as transações.
+    
+    Créditos em contas com faixas de saldo caem na linha da mesma faixa,
+    para não voltarem a disputar uma única linha; as demais movimentações
+    usam a faixa 0.
+    """
+    __tablename__ = "resumos_diarios"
+    __table_args__ = (
+        UniqueConstraint("conta_id", "dia", "tipo", "faixa", name="uq_resumos_diarios_conta_dia_tipo_faixa"),
+    )
+    
+    dia = Column(Date, nullable=False)
+    tipo = Column(String(20), nullable=False)
+    faixa = Column(Integer, nullable=False, default=0)
+    debitos = Column(Dinheiro(), nullable=False, default=0.00)
+    creditos = Column(Dinheiro(), nullable=False, default=0.00)
+    quantidade_debitos = Column(Integer, nullable=False, default=0)
+    quantidade_creditos = Column(Integer, nullable=False, default=0)
+    
+    # Chave estrangeira
+    conta_id = Column(Integer, ForeignKey("contas.id"), nullable=False)
+    
+    def __repr__(self):
+        return f"<ResumoDiario(conta_id={self.conta_id}, dia={self.dia}, tipo={self.tipo})>"
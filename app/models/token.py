@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, ForeignKey
+from .base import BaseModel
+
+class TokenRevogado(BaseModel):
+    """Modelo para tokens JWT revogados (logout)"""
+    __tablename__ = "tokens_revogados"
+    
+    jti = Column(String(36), unique=True, index=True, nullable=False)
+    expira_em = Column(DateTime, index=True, nullable=False)  # Após essa data o registro pode ser removido
+    
+    def __repr__(self):
+        return f"<TokenRevogado(jti={self.jti}, expira_em={self.expira_em})>"
+
+class RefreshToken(BaseModel):
+    """Modelo para refresh tokens (armazenados apenas como hash)"""
+    __tablename__ = "refresh_tokens"
+    
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)  # HMAC-SHA256 em hexadecimal
+    familia = Column(String(32), index=True, nullable=False)  # Tokens gerados a partir do mesmo login
+    expira_em = Column(DateTime, nullable=False)
+    usado = Column(Boolean, default=False, nullable=False)
+    revogado = Column(Boolean, default=False, nullable=False)
+    
+    # Chave estrangeira
+    cliente_id = Column(Integer, ForeignKey("clientes.id", ondelete="CASCADE"), nullable=False)
+    
+    def __repr__(self):
+        return f"<RefreshToken(familia={self.familia}, usado={self.usado}, revogado={self.revogado})>"
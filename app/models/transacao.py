@@ -1,16 +1,30 @@
-from sqlalchemy import Column, String, Integer, Numeric, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
+from .dinheiro import Dinheiro
+
+# Sentido da movimentação na conta (valor é sempre positivo)
+NATUREZA_DEBITO = "debito"
+NATUREZA_CREDITO = "credito"
+
+def natureza_pelo_saldo(saldo_anterior, saldo_posterior) -> str:
+    return NATUREZA_DEBITO if saldo_posterior < saldo_anterior else NATUREZA_CREDITO
+
+def _natureza_padrao(context):
+    # Linhas inseridas sem passar por debitar/creditar (ex.: testes, scripts)
+    parametros = context.get_current_parameters()
+    return natureza_pelo_saldo(parametros["saldo_anterior"], parametros["saldo_posterior"])
 
 class Transacao(BaseModel):
     """Modelo para Transações Bancárias"""
     __tablename__ = "transacoes"
     
     tipo = Column(String(20), nullable=False)  # 'saque', 'deposito', 'transferencia'
-    valor = Column(Numeric(15, 2), nullable=False)
+    valor = Column(Dinheiro(), nullable=False)
     descricao = Column(Text, nullable=True)
-    saldo_anterior = Column(Numeric(15, 2), nullable=False)
-    saldo_posterior = Column(Numeric(15, 2), nullable=False)
+    saldo_anterior = Column(Dinheiro(), nullable=False)
+    saldo_posterior = Column(Dinheiro(), nullable=False)
+    natureza = Column(String(7), nullable=False, default=_natureza_padrao)  # 'debito' ou 'credito'
     
     # Chave estrangeira
     conta_id = Column(Integer, ForeignKey("contas.id"), nullable=False)
@@ -18,6 +32,14 @@ class Transacao(BaseModel):
     # Relacionamentos
     conta = relationship("Conta", back_populates="transacoes")
     
+    # No MySQL a tabela é particionada por mês em created_at (migração 0003);
+    # o índice atende ao extrato dentro das partições do período
+    __table_args__ = (
+        Index("ix_transacoes_conta_id_created_at", "conta_id", "created_at"),
+        # Totais por sentido (débitos/créditos) sem ler as linhas
+        Index("ix_transacoes_conta_id_natureza_created_at", "conta_id", "natureza", "created_at"),
+    )
+    
     def __repr__(self):
         return f"<Transacao(tipo={self.tipo}, valor={self.valor}, conta_id={self.conta_id})>"
 
@@ -26,7 +48,7 @@ class Saque(Transacao):
     __tablename__ = "saques"
     
     id = Column(Integer, ForeignKey("transacoes.id"), primary_key=True)
-    taxa = Column(Numeric(5, 2), nullable=False, default=0.00)
+    taxa = Column(Dinheiro(), nullable=False, default=0.00)
     
     __mapper_args__ = {
         'polymorphic_identity': 'saque',
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text
+from .base import BaseModel
+from .dinheiro import Dinheiro
+
+class TransferenciaPendente(BaseModel):
+    """Outbox de transferências entre shards (gravada no shard de origem)"""
+    __tablename__ = "transferencias_pendentes"
+    
+    transferencia_id = Column(String(32), unique=True, index=True, nullable=False)
+    tipo = Column(String(20), nullable=False)  # 'transferencia' ou 'pix'
+    conta_origem_numero = Column(String(20), nullable=False)
+    conta_destino_numero = Column(String(20), nullable=False)
+    valor = Column(Dinheiro(), nullable=False)
+    descricao_destino = Column(Text, nullable=True)
+    status = Column(String(20), index=True, nullable=False, default="pendente")  # 'pendente', 'concluida', 'falhou'
+    tentativas = Column(Integer, nullable=False, default=0)
+    transacao_pix_id = Column(Integer, nullable=True)  # PIX de origem, atualizado na conclusão
+    
+    def __repr__(self):
+        return f"<TransferenciaPendente(id={self.transferencia_id}, status={self.status})>"
+
+class TransferenciaRecebida(BaseModel):
+    """Registro de idempotência dos créditos aplicados no shard de destino"""
+    __tablename__ = "transferencias_recebidas"
+    
+    transferencia_id = Column(String(32), unique=True, index=True, nullable=False)
+    conta_destino_numero = Column(String(20), nullable=False)
+    
+    def __repr__(self):
+        return f"<TransferenciaRecebida(id={self.transferencia_id})>"
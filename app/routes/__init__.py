@@ -1,3 +1,3 @@
-from . import auth, conta, transacao, pix
+from . import auth, conta, transacao, pix, stream
 
-__all__ = ["auth", "conta", "transacao", "pix"]
\ No newline at end of file
+__all__ = ["auth", "conta", "transacao", "pix", "stream"]
\ No newline at end of file
@@ -1,27 +1,101 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Optional
+import uuid
 
-from ..database import get_db
-from ..models import Cliente
-from ..schemas import LoginRequest, LoginResponse, RegisterRequest, RegisterResponse
+from ..core import settings
+from ..database import SessionLocal, get_db, shard_router
+from ..database.sharding import replicar_cliente, remover_cliente_replicado
+from ..models import Cliente, RefreshToken
+from ..schemas import LoginRequest, LoginResponse, RefreshRequest, RegisterRequest, RegisterResponse
 from ..auth import (
     verify_password,
     get_password_hash,
+    password_needs_rehash,
     create_access_token,
+    create_refresh_token,
+    hash_refresh_token,
     validate_cpf,
-    get_current_user
+    verify_token,
+    revoke_token,
+    get_current_reader
 )
+from ..auth.rate_limit import get_rate_limiter, rate_limit_by_ip
 
 router = APIRouter(prefix="/auth", tags=["Autenticação"])
 
+optional_security = HTTPBearer(auto_error=False)
+
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = 7
+
+def emitir_tokens(db: Session, cliente: Cliente, familia: Optional[str] = None) -> LoginResponse:
+    """Emite um token de acesso e um novo refresh token para o cliente"""
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": cliente.cpf}, expires_delta=access_token_expires
+    )
+    
+    # O refresh token é guardado apenas como HMAC; o valor puro vai só para o cliente
+    refresh_token = create_refresh_token()
+    db.add(RefreshToken(
+        token_hash=hash_refresh_token(refresh_token),
+        familia=familia or uuid.uuid4().hex,
+        expira_em=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        cliente_id=cliente.id
+    ))
+    db.commit()
+    
+    return LoginResponse(
+        access_token=access_token,
+        token_type="bearer",
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        refresh_token=refresh_token,
+        refresh_expires_in=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    )
 
-@router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+def atualizar_hash_senha(cliente_id: int, senha: str):
+    """Regera o hash da senha com o custo atual (executado fora da requisição)"""
+    db = SessionLocal()
+    try:
+        cliente = db.query(Cliente).filter(Cliente.id == cliente_id).first()
+        if cliente and password_needs_rehash(cliente.senha_hash):
+            cliente.senha_hash = get_password_hash(senha)
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao atualizar hash da senha: {e}")
+    finally:
+        db.close()
+
+login_cpf_limiter = get_rate_limiter(
+    "login_cpf",
+    settings.login_rate_limit_cpf_capacidade,
+    settings.login_rate_limit_cpf_por_minuto
+)
+
+@router.post(
+    "/login",
+    response_model=LoginResponse,
+    dependencies=[Depends(rate_limit_by_ip(
+        "login_ip",
+        settings.login_rate_limit_ip_capacidade,
+        settings.login_rate_limit_ip_por_minuto
+    ))]
+)
+async def login(
+    login_data: LoginRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
     """
     Autentica um cliente usando CPF e senha.
     """
+    # Limitar tentativas por CPF antes de qualquer consulta ou bcrypt
+    login_cpf_limiter.check(login_data.cpf)
+    
     # Buscar cliente pelo CPF
     cliente = db.query(Cliente).filter(Cliente.cpf == login_data.cpf).first()
     
@@ -47,18 +121,79 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             detail="Conta desativada. Entre em contato com o banco.",
         )
     
-    # Criar token de acesso
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": cliente.cpf}, expires_delta=access_token_expires
-    )
+    # Hash gerado com custo antigo: atualizar depois de responder
+    if password_needs_rehash(cliente.senha_hash):
+        background_tasks.add_task(atualizar_hash_senha, cliente.id, login_data.senha)
     
-    return LoginResponse(
-        access_token=access_token,
-        token_type="bearer",
-        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    # Criar token de acesso e refresh token
+    return emitir_tokens(db, cliente)
+
+def revogar_familia(db: Session, familia: str):
+    """Reuso de um token já rotacionado indica vazamento: revogar toda a família"""
+    db.query(RefreshToken).filter(
+        RefreshToken.familia == familia
+    ).update({RefreshToken.revogado: True}, synchronize_session=False)
+    db.commit()
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token reutilizado. Faça login novamente.",
+        headers={"WWW-Authenticate": "Bearer"},
     )
 
+@router.post(
+    "/refresh",
+    response_model=LoginResponse,
+    dependencies=[Depends(rate_limit_by_ip(
+        "refresh_ip",
+        settings.refresh_rate_limit_ip_capacidade,
+        settings.refresh_rate_limit_ip_por_minuto
+    ))]
+)
+async def refresh(refresh_data: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Emite um novo token de acesso a partir de um refresh token.
+    O refresh token é rotacionado: cada um só pode ser usado uma vez.
+    """
+    token = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_refresh_token(refresh_data.refresh_token)
+    ).first()
+    
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if token.usado or token.revogado:
+        revogar_familia(db, token.familia)
+    
+    if token.expira_em < datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token expirado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    cliente = db.query(Cliente).filter(Cliente.id == token.cliente_id).first()
+    if not cliente or not cliente.ativo:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Conta desativada. Entre em contato com o banco.",
+        )
+    
+    # Rotação atômica: de duas requisições com o mesmo token, só uma marca o uso
+    marcados = db.query(RefreshToken).filter(
+        RefreshToken.id == token.id,
+        RefreshToken.usado == False,
+        RefreshToken.revogado == False
+    ).update({RefreshToken.usado: True}, synchronize_session=False)
+    if marcados != 1:
+        db.rollback()
+        revogar_familia(db, token.familia)
+    
+    return emitir_tokens(db, cliente, familia=token.familia)
+
 @router.post("/register", response_model=RegisterResponse)
 async def register(register_data: RegisterRequest, db: Session = Depends(get_db)):
     """
@@ -90,6 +225,9 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
         db.commit()
         db.refresh(new_cliente)
         
+        # Contas podem ficar em outros shards: replicar o cliente
+        replicar_cliente(shard_router, db, new_cliente)
+        
         return RegisterResponse(
             message="Cliente cadastrado com sucesso",
             cliente_id=new_cliente.id,
@@ -116,6 +254,7 @@ async def delete_cliente(cpf: str, db: Session = Depends(get_db)):
         )
     
     try:
+        remover_cliente_replicado(shard_router, db, cpf)
         db.delete(cliente)
         db.commit()
         return {"message": f"Cliente com CPF {cpf} deletado com sucesso"}
@@ -127,7 +266,7 @@ async def delete_cliente(cpf: str, db: Session = Depends(get_db)):
         )
 
 @router.get("/me")
-async def get_current_user_info(current_user: Cliente = Depends(get_current_user)):
+async def get_current_user_info(current_user: Cliente = Depends(get_current_reader)):
     """
     Retorna informações do usuário atual autenticado.
     """
@@ -141,8 +280,27 @@ async def get_current_user_info(current_user: Cliente = Depends(get_current_user
     }
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    refresh_data: Optional[RefreshRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+):
     """
-    Endpoint para logout (token será invalidado no frontend).
+    Endpoint para logout. Se um token for enviado ele é revogado no servidor,
+    assim como a família do refresh token informado no corpo.
     """
+    if credentials:
+        payload = verify_token(credentials.credentials)
+        revoke_token(db, payload)
+    
+    if refresh_data:
+        token = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == hash_refresh_token(refresh_data.refresh_token)
+        ).first()
+        if token:
+            db.query(RefreshToken).filter(
+                RefreshToken.familia == token.familia
+            ).update({RefreshToken.revogado: True}, synchronize_session=False)
+            db.commit()
+    
     return {"message": "Logout realizado com sucesso"}
\ No newline at end of file
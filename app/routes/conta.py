@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 import uuid
 
-from ..database import get_db
+from ..database import get_db, get_read_db, get_shard_db, get_shard_read_db, shard_router
 from ..models import Cliente, Conta, ContaCorrente
 from ..schemas import (
     ContaCreate,
@@ -12,7 +12,15 @@ from ..schemas import (
     ContaWithTransacoes,
     SaldoResponse
 )
-from ..auth.dependencies import get_current_user, get_current_active_user
+from ..auth.dependencies import get_current_user, get_current_reader, get_current_active_user
+from ..services import (
+    saldo_total,
+    versoes_contas,
+    gerar_etag,
+    etag_corresponde,
+    nao_modificado,
+    cabecalhos_cache
+)
 
 router = APIRouter(prefix="/contas", tags=["Contas"])
 
@@ -55,11 +63,13 @@ async def criar_conta(
                 ativa=True
             )
         
-        db.add(new_conta)
-        db.commit()
-        db.refresh(new_conta)
-        
-        return new_conta
+        # Gravar no shard responsável pelo número da conta
+        with shard_router.session_scope(numero_conta, padrao=db) as shard_db:
+            shard_db.add(new_conta)
+            shard_db.commit()
+            shard_db.refresh(new_conta)
+            
+            return ContaResponse.model_validate(new_conta)
         
     except Exception as e:
         db.rollback()
@@ -77,16 +87,35 @@ async def test_auth(
 
 @router.get("/", response_model=List[ContaResponse])
 async def listar_contas(
-    current_user: Cliente = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Cliente = Depends(get_current_reader),
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todas as contas do cliente autenticado.
+    Responde 304 se nenhuma conta mudou desde o ETag enviado em If-None-Match.
     """
-    contas = db.query(Conta).filter(
-        Conta.cliente_id == current_user.id,
-        Conta.ativa == True
-    ).all()
+    # Contas podem estar em qualquer shard: consultar todos
+    with shard_router.all_sessions(padrao=db) as sessoes:
+        versoes = sorted(
+            versao
+            for shard_db in sessoes
+            for versao in versoes_contas(shard_db, current_user.id)
+        )
+        etag = gerar_etag("contas", current_user.id, versoes)
+        if etag_corresponde(request.headers.get("If-None-Match"), etag):
+            return nao_modificado(etag)
+        response.headers.update(cabecalhos_cache(etag))
+        
+        contas = [
+            ContaResponse.model_validate(conta).model_copy(update={"saldo": saldo_total(conta)})
+            for shard_db in sessoes
+            for conta in shard_db.query(Conta).filter(
+                Conta.cliente_id == current_user.id,
+                Conta.ativa == True
+            ).all()
+        ]
     
     return contas
 
@@ -94,7 +123,7 @@ async def listar_contas(
 async def obter_conta(
     conta_numero: str,
     current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_shard_db)
 ):
     """
     Obtém detalhes de uma conta específica com suas transações.
@@ -111,17 +140,32 @@ async def obter_conta(
             detail="Conta não encontrada"
         )
     
-    return conta
+    return ContaWithTransacoes.model_validate(conta).model_copy(update={"saldo": saldo_total(conta)})
 
 @router.get("/{conta_numero}/saldo", response_model=SaldoResponse)
 async def consultar_saldo(
     conta_numero: str,
-    current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Cliente = Depends(get_current_reader),
+    db: Session = Depends(get_shard_read_db)
 ):
     """
     Consulta o saldo de uma conta específica.
+    Responde 304 se o saldo não mudou desde o ETag enviado em If-None-Match.
     """
+    versoes = versoes_contas(db, current_user.id, conta_numero)
+    if not versoes:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conta não encontrada"
+        )
+    
+    etag = gerar_etag("saldo", versoes[0])
+    if etag_corresponde(request.headers.get("If-None-Match"), etag):
+        return nao_modificado(etag)
+    response.headers.update(cabecalhos_cache(etag))
+    
     conta = db.query(Conta).filter(
         Conta.numero == conta_numero,
         Conta.cliente_id == current_user.id,
@@ -134,17 +178,18 @@ async def consultar_saldo(
             detail="Conta não encontrada"
         )
     
-    # Calcular saldo disponível
-    saldo_disponivel = conta.saldo
+    # Calcular saldo disponível (somando as faixas, se houver)
+    saldo_atual = saldo_total(conta)
+    saldo_disponivel = saldo_atual
     limite = None
     
     if isinstance(conta, ContaCorrente):
         limite = conta.limite
-        saldo_disponivel = conta.saldo + conta.limite
+        saldo_disponivel = saldo_atual + conta.limite
     
     return SaldoResponse(
         conta_numero=conta.numero,
-        saldo_atual=conta.saldo,
+        saldo_atual=saldo_atual,
         saldo_disponivel=saldo_disponivel,
         limite=limite
     )
@@ -153,7 +198,7 @@ async def consultar_saldo(
 async def toggle_conta_status(
     conta_numero: str,
     current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_shard_db)
 ):
     """
     Alterna o status da conta (ativa/inativa).
@@ -170,7 +215,7 @@ async def toggle_conta_status(
         )
     
     # Se está tentando desativar, verificar se há saldo
-    if conta.ativa and conta.saldo != 0:
+    if conta.ativa and saldo_total(conta) != 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Não é possível desativar conta com saldo diferente de zero"
@@ -194,7 +239,7 @@ async def toggle_conta_status(
 async def desativar_conta(
     conta_numero: str,
     current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_shard_db)
 ):
     """
     Desativa uma conta (não remove do banco, apenas marca como inativa).
@@ -212,7 +257,7 @@ async def desativar_conta(
         )
     
     # Verificar se há saldo na conta
-    if conta.saldo != 0:
+    if saldo_total(conta) != 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Não é possível desativar conta com saldo diferente de zero"
@@ -1,13 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from datetime import datetime
 from decimal import Decimal
-from typing import List
+from typing import Dict, List, NamedTuple, Optional
 import uuid
 import re
 
-from ..database import get_db
-from ..models import Cliente, Conta, ChavePix, TransacaoPix, Transacao
+from ..database import get_db, get_read_db, get_shard_db, get_shard_read_db, shard_router
+from ..models import Cliente, Conta, ChavePix, TransacaoPix, FilaPix, NATUREZA_CREDITO, NATUREZA_DEBITO
 from ..models.pix import TipoChavePix
 from ..schemas import (
     ChavePixCreate,
@@ -16,12 +16,62 @@ from ..schemas import (
     PixTransferenciaRequest,
     PixValidationResponse,
     PixTransferenciaResponse,
-    ChavePixDeleteRequest
+    PixTransferenciaListResponse,
+    PixHistoricoItem,
+    PixHistoricoResponse,
+    ChavePixDeleteRequest,
+    Valor
 )
-from ..auth import get_current_active_user
+from ..auth import get_current_active_user, get_current_reader
+from ..services import (
+    saldo_total,
+    tocar_conta,
+    versoes_contas,
+    gerar_etag,
+    etag_corresponde,
+    nao_modificado,
+    cabecalhos_cache,
+    decodificar_cursor,
+    antes_de,
+    intercalar,
+    fatiar_pagina
+)
+from ..services.liquidacao import fila_pix_evento
 
 router = APIRouter(prefix="/pix", tags=["PIX"])
 
+
+class DestinoPix(NamedTuple):
+    """Dados da conta dona de uma chave PIX (que pode estar em outro shard)"""
+    conta_id: int
+    conta_numero: str
+    beneficiario_nome: str
+    beneficiario_cpf: str
+
+
+def localizar_chave_destino(
+    db: Session, chave: str, abertas: Optional[Dict[int, Session]] = None
+) -> Optional[DestinoPix]:
+    """
+    Procura a chave PIX ativa em todos os shards. `db` é a sessão do
+    primário (shard 0); `abertas` reaproveita sessões já abertas por índice.
+    """
+    with shard_router.all_sessions(padrao=db, abertas=abertas) as sessoes:
+        for shard_db in sessoes:
+            chave_pix = shard_db.query(ChavePix).filter(
+                ChavePix.chave == chave,
+                ChavePix.ativa == True
+            ).first()
+            if chave_pix:
+                conta = chave_pix.conta
+                return DestinoPix(
+                    conta_id=conta.id,
+                    conta_numero=conta.numero,
+                    beneficiario_nome=conta.cliente.nome,
+                    beneficiario_cpf=conta.cliente.cpf,
+                )
+    return None
+
 @router.post("/chaves", response_model=ChavePixResponse)
 async def criar_chave_pix(
     chave_data: ChavePixCreate,
@@ -31,80 +81,88 @@ async def criar_chave_pix(
     """
     Cria uma nova chave PIX para a conta especificada.
     """
-    # Buscar conta
-    conta = db.query(Conta).filter(
-        Conta.numero == chave_data.conta_numero,
-        Conta.cliente_id == current_user.id,
-        Conta.ativa == True
-    ).first()
-    
-    if not conta:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conta não encontrada"
-        )
-    
-    # Verificar se a chave já existe
-    chave_existente = db.query(ChavePix).filter(
-        ChavePix.chave == chave_data.chave,
-        ChavePix.ativa == True
-    ).first()
-    
-    if chave_existente:
+    # Verificar se a chave já existe (em qualquer shard)
+    if localizar_chave_destino(db, chave_data.chave):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Chave PIX já está em uso"
         )
     
-    # Verificar limite de chaves por conta (máximo 5)
-    chaves_conta = db.query(ChavePix).filter(
-        ChavePix.conta_id == conta.id,
-        ChavePix.ativa == True
-    ).count()
-    
-    if chaves_conta >= 5:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Limite máximo de 5 chaves PIX por conta atingido"
+    with shard_router.session_scope(chave_data.conta_numero, padrao=db) as shard_db:
+        # Buscar conta
+        conta = shard_db.query(Conta).filter(
+            Conta.numero == chave_data.conta_numero,
+            Conta.cliente_id == current_user.id,
+            Conta.ativa == True
+        ).first()
+        
+        if not conta:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conta não encontrada"
+            )
+        
+        # Verificar limite de chaves por conta (máximo 5)
+        chaves_conta = shard_db.query(ChavePix).filter(
+            ChavePix.conta_id == conta.id,
+            ChavePix.ativa == True
+        ).count()
+        
+        if chaves_conta >= 5:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Limite máximo de 5 chaves PIX por conta atingido"
+            )
+        
+        # Gerar chave aleatória se necessário
+        chave_final = chave_data.chave
+        if chave_data.tipo == 'aleatoria':
+            chave_final = str(uuid.uuid4()).replace('-', '')
+        
+        # Criar chave PIX
+        nova_chave = ChavePix(
+            chave=chave_final,
+            tipo=TipoChavePix(chave_data.tipo),
+            conta_id=conta.id
+        )
+        
+        shard_db.add(nova_chave)
+        tocar_conta(conta)
+        shard_db.commit()
+        shard_db.refresh(nova_chave)
+        
+        # Preparar resposta
+        response = ChavePixResponse(
+            id=nova_chave.id,
+            chave=nova_chave.chave,
+            tipo=nova_chave.tipo.value,
+            ativa=nova_chave.ativa,
+            data_criacao=nova_chave.data_criacao,
+            conta_numero=conta.numero
         )
-    
-    # Gerar chave aleatória se necessário
-    chave_final = chave_data.chave
-    if chave_data.tipo == 'aleatoria':
-        chave_final = str(uuid.uuid4()).replace('-', '')
-    
-    # Criar chave PIX
-    nova_chave = ChavePix(
-        chave=chave_final,
-        tipo=TipoChavePix(chave_data.tipo),
-        conta_id=conta.id
-    )
-    
-    db.add(nova_chave)
-    db.commit()
-    db.refresh(nova_chave)
-    
-    # Preparar resposta
-    response = ChavePixResponse(
-        id=nova_chave.id,
-        chave=nova_chave.chave,
-        tipo=nova_chave.tipo.value,
-        ativa=nova_chave.ativa,
-        data_criacao=nova_chave.data_criacao,
-        conta_numero=conta.numero
-    )
     
     return response
 
 @router.get("/chaves/{conta_numero}", response_model=ChavePixListResponse)
 async def listar_chaves_pix(
     conta_numero: str,
-    current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Cliente = Depends(get_current_reader),
+    db: Session = Depends(get_shard_read_db)
 ):
     """
     Lista todas as chaves PIX ativas de uma conta.
+    Responde 304 se a conta não mudou desde o ETag enviado em If-None-Match.
     """
+    versoes = versoes_contas(db, current_user.id, conta_numero)
+    if versoes:
+        # Créditos em faixas não alteram as chaves: basta a versão da conta
+        etag = gerar_etag("chaves", versoes[0][:2])
+        if etag_corresponde(request.headers.get("If-None-Match"), etag):
+            return nao_modificado(etag)
+        response.headers.update(cabecalhos_cache(etag))
+    
     # Buscar conta
     conta = db.query(Conta).filter(
         Conta.numero == conta_numero,
@@ -150,31 +208,34 @@ async def remover_chave_pix(
     """
     Remove uma chave PIX (desativa).
     """
-    # Buscar chave PIX
-    chave = db.query(ChavePix).join(Conta).filter(
-        ChavePix.chave == chave_data.chave,
-        ChavePix.ativa == True,
-        Conta.cliente_id == current_user.id
-    ).first()
-    
-    if not chave:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Chave PIX não encontrada"
-        )
-    
-    # Desativar chave
-    chave.ativa = False
-    db.commit()
-    
-    return {"message": "Chave PIX removida com sucesso"}
+    # Buscar chave PIX (a conta pode estar em qualquer shard)
+    with shard_router.all_sessions(padrao=db) as sessoes:
+        for shard_db in sessoes:
+            chave = shard_db.query(ChavePix).join(Conta).filter(
+                ChavePix.chave == chave_data.chave,
+                ChavePix.ativa == True,
+                Conta.cliente_id == current_user.id
+            ).first()
+            
+            if chave:
+                # Desativar chave
+                chave.ativa = False
+                tocar_conta(chave.conta)
+                shard_db.commit()
+                return {"message": "Chave PIX removida com sucesso"}
+    
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Chave PIX não encontrada"
+    )
 
 @router.post("/transferencia/{conta_numero}/validar", response_model=PixValidationResponse)
 async def validar_transferencia_pix(
     conta_numero: str,
     transferencia_data: PixTransferenciaRequest,
     current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_shard_db),
+    primario: Session = Depends(get_db)
 ):
     """
     Valida uma transferência PIX antes de executar.
@@ -193,22 +254,18 @@ async def validar_transferencia_pix(
         )
     
     # Buscar chave PIX de destino
-    chave_destino = db.query(ChavePix).filter(
-        ChavePix.chave == transferencia_data.chave_destino,
-        ChavePix.ativa == True
-    ).first()
+    destino = localizar_chave_destino(
+        primario, transferencia_data.chave_destino, abertas={shard_router.shard_for(conta_numero): db}
+    )
     
-    if not chave_destino:
+    if not destino:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chave PIX de destino não encontrada"
         )
     
-    # Buscar conta de destino
-    conta_destino = chave_destino.conta
-    
     # Verificar se não é transferência para a mesma conta
-    if conta_origem.id == conta_destino.id:
+    if conta_origem.numero == destino.conta_numero:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Não é possível transferir para a mesma conta"
@@ -219,34 +276,37 @@ async def validar_transferencia_pix(
     taxa = Decimal('0.00')  # PIX não tem taxa
     valor_total = valor + taxa
     
-    if conta_origem.saldo < valor_total:
+    if saldo_total(conta_origem) < valor_total:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Saldo insuficiente"
         )
     
-    # Buscar dados do beneficiário
-    beneficiario = conta_destino.cliente
-    
     return PixValidationResponse(
         chave_destino=transferencia_data.chave_destino,
-        beneficiario_nome=beneficiario.nome,
-        beneficiario_cpf=beneficiario.cpf,
+        beneficiario_nome=destino.beneficiario_nome,
+        beneficiario_cpf=destino.beneficiario_cpf,
         valor=valor,
         taxa=taxa,
         valor_total=valor_total,
-        saldo_disponivel=conta_origem.saldo
+        saldo_disponivel=saldo_total(conta_origem)
     )
 
-@router.post("/transferencia/{conta_numero}", response_model=PixTransferenciaResponse)
+@router.post(
+    "/transferencia/{conta_numero}",
+    response_model=PixTransferenciaResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
 async def realizar_transferencia_pix(
     conta_numero: str,
     transferencia_data: PixTransferenciaRequest,
     current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_shard_db),
+    primario: Session = Depends(get_db)
 ):
     """
-    Realiza uma transferência PIX.
+    Aceita uma transferência PIX. A liquidação é feita em segundo plano;
+    acompanhe o status em GET /pix/transferencia/{id}.
     """
     # Buscar conta de origem
     conta_origem = db.query(Conta).filter(
@@ -262,22 +322,18 @@ async def realizar_transferencia_pix(
         )
     
     # Buscar chave PIX de destino
-    chave_destino = db.query(ChavePix).filter(
-        ChavePix.chave == transferencia_data.chave_destino,
-        ChavePix.ativa == True
-    ).first()
+    destino = localizar_chave_destino(
+        primario, transferencia_data.chave_destino, abertas={shard_router.shard_for(conta_numero): db}
+    )
     
-    if not chave_destino:
+    if not destino:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chave PIX de destino não encontrada"
         )
     
-    # Buscar conta de destino
-    conta_destino = chave_destino.conta
-    
     # Verificar se não é transferência para a mesma conta
-    if conta_origem.id == conta_destino.id:
+    if conta_origem.numero == destino.conta_numero:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Não é possível transferir para a mesma conta"
@@ -285,7 +341,7 @@ async def realizar_transferencia_pix(
     
     # Verificar saldo
     valor = transferencia_data.valor
-    if conta_origem.saldo < valor:
+    if saldo_total(conta_origem) < valor:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Saldo insuficiente"
@@ -304,61 +360,38 @@ async def realizar_transferencia_pix(
         )
     
     try:
-        # Buscar informações dos clientes para incluir nomes nas descrições
+        # Descrições com os nomes dos clientes para o extrato
         cliente_origem = db.query(Cliente).filter(Cliente.id == conta_origem.cliente_id).first()
-        cliente_destino = db.query(Cliente).filter(Cliente.id == conta_destino.cliente_id).first()
-        
-        # Processar transferência PIX
-        saldo_anterior_origem = conta_origem.saldo
-        saldo_anterior_destino = conta_destino.saldo
-        
-        conta_origem.saldo -= valor
-        conta_destino.saldo += valor
-        
-        # Criar registro da transação PIX
-        transacao_pix = TransacaoPix(
-            chave_origem=chave_origem.chave,
-            chave_destino=transferencia_data.chave_destino,
-            valor=str(int(valor * 100)),  # Converter para centavos
-            descricao=transferencia_data.descricao,
-            status="concluida",
-            conta_origem_id=conta_origem.id,
-            conta_destino_id=conta_destino.id
-        )
         
-        # Criar transação de débito PIX (origem) para aparecer no extrato
-        descricao_origem = f"PIX para {cliente_destino.nome} - Chave: {transferencia_data.chave_destino[:20]}..."
+        descricao_origem = f"PIX para {destino.beneficiario_nome} - Chave: {transferencia_data.chave_destino[:20]}..."
         if transferencia_data.descricao:
             descricao_origem += f": {transferencia_data.descricao}"
-            
-        transacao_origem = Transacao(
-            tipo="pix",
-            valor=valor,
-            descricao=descricao_origem,
-            saldo_anterior=saldo_anterior_origem,
-            saldo_posterior=conta_origem.saldo,
-            conta_id=conta_origem.id
-        )
         
-        # Criar transação de crédito PIX (destino) para aparecer no extrato
         descricao_destino = f"PIX recebido de {cliente_origem.nome} - Chave: {chave_origem.chave[:20]}..."
         if transferencia_data.descricao:
             descricao_destino += f": {transferencia_data.descricao}"
-            
-        transacao_destino = Transacao(
-            tipo="pix",
+        
+        # Registrar o PIX como "processando" e enfileirar a liquidação
+        transacao_pix = TransacaoPix(
+            chave_origem=chave_origem.chave,
+            chave_destino=transferencia_data.chave_destino,
             valor=valor,
-            descricao=descricao_destino,
-            saldo_anterior=saldo_anterior_destino,
-            saldo_posterior=conta_destino.saldo,
-            conta_id=conta_destino.id
+            descricao=transferencia_data.descricao,
+            status="processando",
+            conta_origem_id=conta_origem.id
         )
-        
         db.add(transacao_pix)
-        db.add(transacao_origem)
-        db.add(transacao_destino)
+        db.add(FilaPix(
+            transacao_pix=transacao_pix,
+            conta_destino_numero=destino.conta_numero,
+            valor=valor,
+            descricao_origem=descricao_origem,
+            descricao_destino=descricao_destino,
+            status="pendente"
+        ))
         db.commit()
         db.refresh(transacao_pix)
+        fila_pix_evento.set()
         
         return PixTransferenciaResponse(
             id=transacao_pix.id,
@@ -375,4 +408,190 @@ async def realizar_transferencia_pix(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro interno do servidor ao processar transferência PIX"
-        )
\ No newline at end of file
+        )
+
+@router.get("/transferencia/{transacao_id}", response_model=PixTransferenciaResponse)
+async def consultar_transferencia_pix(
+    transacao_id: int,
+    conta_numero: Optional[str] = None,
+    current_user: Cliente = Depends(get_current_reader),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Consulta o status de uma transferência PIX ("processando", "concluida"
+    ou "rejeitada"). Informe `conta_numero` (conta de origem) para consultar
+    direto o shard da conta.
+    """
+    def buscar(shard_db: Session) -> Optional[PixTransferenciaResponse]:
+        transacao_pix = shard_db.query(TransacaoPix).join(
+            Conta, TransacaoPix.conta_origem_id == Conta.id
+        ).filter(
+            TransacaoPix.id == transacao_id,
+            Conta.cliente_id == current_user.id
+        ).first()
+        if not transacao_pix:
+            return None
+        return PixTransferenciaResponse(
+            id=transacao_pix.id,
+            chave_origem=transacao_pix.chave_origem,
+            chave_destino=transacao_pix.chave_destino,
+            valor=transacao_pix.valor,
+            descricao=transacao_pix.descricao,
+            status=transacao_pix.status,
+            data_transacao=transacao_pix.data_transacao
+        )
+    
+    if conta_numero:
+        with shard_router.session_scope(conta_numero, padrao=db) as shard_db:
+            resposta = buscar(shard_db)
+    else:
+        with shard_router.all_sessions(padrao=db) as sessoes:
+            resposta = next(filter(None, (buscar(shard_db) for shard_db in sessoes)), None)
+    
+    if not resposta:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transferência PIX não encontrada"
+        )
+    
+    return resposta
+
+def _posicao_do_cursor(cursor: Optional[str]):
+    try:
+        return decodificar_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+def _posicao_pix(transacao_pix: TransacaoPix):
+    return transacao_pix.data_transacao, transacao_pix.id
+
+
+def _com_natureza(natureza: str, query):
+    for transacao_pix in query:
+        yield natureza, transacao_pix
+
+
+def _posicao_historico(item):
+    _, transacao_pix = item
+    return _posicao_pix(transacao_pix)
+
+
+def _pix_da_conta(db: Session, coluna_conta, conta_id: int, posicao):
+    """PIX da conta em `coluna_conta` (origem ou destino) a partir do cursor, pelo índice (coluna, data)"""
+    query = db.query(TransacaoPix).filter(coluna_conta == conta_id)
+    if posicao:
+        query = query.filter(antes_de(TransacaoPix.data_transacao, TransacaoPix.id, posicao))
+    return query
+
+
+def _ordenar_pagina(query, limite: int):
+    # Um item a mais indica se há próxima página
+    return query.order_by(
+        TransacaoPix.data_transacao.desc(),
+        TransacaoPix.id.desc()
+    ).limit(limite + 1)
+
+
+@router.get("/transferencias", response_model=PixTransferenciaListResponse)
+async def listar_transferencias_pix(
+    conta_numero: str,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    valor_min: Optional[Valor] = None,
+    valor_max: Optional[Valor] = None,
+    limite: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: Cliente = Depends(get_current_reader),
+    db: Session = Depends(get_shard_read_db)
+):
+    """
+    Lista os PIX enviados pela conta, do mais recente para o mais antigo,
+    com filtros de data e valor. Para a próxima página, repita a consulta
+    com `cursor` igual ao `proximo_cursor` recebido.
+    """
+    posicao = _posicao_do_cursor(cursor)
+    
+    conta = db.query(Conta).filter(
+        Conta.numero == conta_numero,
+        Conta.cliente_id == current_user.id,
+        Conta.ativa == True
+    ).first()
+    
+    if not conta:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conta não encontrada"
+        )
+    
+    query = _pix_da_conta(db, TransacaoPix.conta_origem_id, conta.id, posicao)
+    if data_inicio:
+        query = query.filter(TransacaoPix.data_transacao >= data_inicio)
+    if data_fim:
+        query = query.filter(TransacaoPix.data_transacao <= data_fim)
+    if valor_min is not None:
+        query = query.filter(TransacaoPix.valor >= valor_min)
+    if valor_max is not None:
+        query = query.filter(TransacaoPix.valor <= valor_max)
+    
+    transferencias, proximo_cursor = fatiar_pagina(
+        _ordenar_pagina(query, limite).all(), limite, _posicao_pix
+    )
+    
+    return PixTransferenciaListResponse(
+        transferencias=[PixTransferenciaResponse.model_validate(t) for t in transferencias],
+        proximo_cursor=proximo_cursor
+    )
+
+@router.get("/historico/{conta_numero}", response_model=PixHistoricoResponse)
+async def historico_pix(
+    conta_numero: str,
+    limite: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: Cliente = Depends(get_current_reader),
+    db: Session = Depends(get_shard_read_db)
+):
+    """
+    PIX enviados e recebidos pela conta, do mais recente para o mais
+    antigo, com paginação por cursor (`proximo_cursor`).
+    
+    Enviados e recebidos são duas consultas, cada uma pelo seu índice e
+    limitada a uma página; as duas são intercaladas por data. O custo de
+    uma página não depende de quantos PIX a conta já recebeu. PIX vindos
+    de outro shard têm uma cópia no shard da conta (gravada com o crédito).
+    """
+    posicao = _posicao_do_cursor(cursor)
+    
+    conta = db.query(Conta).filter(
+        Conta.numero == conta_numero,
+        Conta.cliente_id == current_user.id,
+        Conta.ativa == True
+    ).first()
+    
+    if not conta:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conta não encontrada"
+        )
+    
+    fluxos = [
+        _com_natureza(natureza, _ordenar_pagina(_pix_da_conta(db, coluna, conta.id, posicao), limite))
+        for natureza, coluna in (
+            (NATUREZA_DEBITO, TransacaoPix.conta_origem_id),
+            (NATUREZA_CREDITO, TransacaoPix.conta_destino_id),
+        )
+    ]
+    itens, proximo_cursor = fatiar_pagina(
+        intercalar(fluxos, _posicao_historico, limite + 1), limite, _posicao_historico
+    )
+    
+    return PixHistoricoResponse(
+        transferencias=[
+            PixHistoricoItem(natureza=natureza, **PixTransferenciaResponse.model_validate(t).model_dump())
+            for natureza, t in itens
+        ],
+        proximo_cursor=proximo_cursor
+    )
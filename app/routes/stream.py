@@ -0,0 +1,135 @@
+import asyncio
+import json
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from ..core import settings
+from ..database import get_shard_read_db
+from ..models import Cliente, Conta
+from ..auth.dependencies import get_current_reader, get_stream_reader, get_stream_ticket, security
+from ..auth.security import create_stream_ticket, sessao_ativa, verify_token
+from ..services import saldo_total
+from ..services.eventos import broker, topico_conta
+
+router = APIRouter(prefix="/stream", tags=["Stream"])
+
+# Intervalo sugerido ao navegador para reconectar (ms)
+RECONEXAO_MS = 3000
+
+
+def formatar_sse(evento: str, dados: dict, evento_id: Optional[int] = None) -> str:
+    """Um evento no formato text/event-stream"""
+    linhas = []
+    if evento_id is not None:
+        linhas.append(f"id: {evento_id}")
+    linhas.append(f"event: {evento}")
+    linhas.append(f"data: {json.dumps(dados, separators=(',', ':'))}")
+    return "\n".join(linhas) + "\n\n"
+
+
+async def eventos_sse(
+    topico: str,
+    inicial: dict,
+    heartbeat: float,
+    maxsize: int = 100,
+    ativo: Callable[[], bool] = lambda: True,
+) -> AsyncIterator[str]:
+    """
+    Corpo do stream: o saldo atual, depois cada movimentação da conta.
+    Sem movimentação, envia um comentário a cada `heartbeat` segundos para
+    manter a conexão aberta em proxies. A cada heartbeat e antes de cada
+    evento `ativo()` é consultado: se a sessão expirou ou foi revogada, o
+    stream envia `encerrado` e fecha. A assinatura é cancelada quando o
+    cliente desconecta (o Starlette cancela o gerador).
+    """
+    assinatura = broker.assinar(topico, maxsize=maxsize)
+    try:
+        yield f"retry: {RECONEXAO_MS}\n\n"
+        yield formatar_sse("saldo", inicial)
+        while True:
+            try:
+                mensagem = await asyncio.wait_for(assinatura.proxima(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                mensagem = None
+            if not ativo():
+                yield formatar_sse("encerrado", {"motivo": "sessao_expirada"})
+                return
+            if mensagem is None:
+                yield ": ping\n\n"
+                continue
+            yield formatar_sse("transacao", mensagem, mensagem["id"])
+    finally:
+        assinatura.cancelar()
+
+
+def _conta_do_cliente(db: Session, conta_numero: str, cliente: Cliente) -> Conta:
+    conta = db.query(Conta).filter(
+        Conta.numero == conta_numero,
+        Conta.cliente_id == cliente.id,
+        Conta.ativa == True
+    ).first()
+
+    if not conta:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conta não encontrada"
+        )
+    return conta
+
+
+@router.post("/contas/{conta_numero}/ticket")
+async def criar_ticket_stream(
+    conta_numero: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: Cliente = Depends(get_current_reader),
+    db: Session = Depends(get_shard_read_db)
+):
+    """
+    Emite o ticket de curta duração para abrir o stream da conta. O token
+    de acesso fica no cabeçalho; só o ticket vai na URL do EventSource.
+    """
+    _conta_do_cliente(db, conta_numero, current_user)
+    sessao = verify_token(credentials.credentials)
+    return {
+        "ticket": create_stream_ticket(sessao, conta_numero),
+        "expires_in": settings.stream_ticket_seconds,
+    }
+
+
+@router.get("/contas/{conta_numero}")
+async def stream_conta(
+    conta_numero: str,
+    ticket: dict = Depends(get_stream_ticket),
+    current_user: Cliente = Depends(get_stream_reader),
+    db: Session = Depends(get_shard_read_db)
+):
+    """
+    Stream (Server-Sent Events) com as movimentações e o saldo de uma conta.
+    Aberto com o ticket de `POST /stream/contas/{numero}/ticket` em `ticket`;
+    fecha quando o token de acesso que gerou o ticket expira ou é revogado.
+    """
+    conta = _conta_do_cliente(db, conta_numero, current_user)
+
+    inicial = {"conta_numero": conta.numero, "saldo": str(saldo_total(conta))}
+
+    # O stream fica aberto por muito tempo: devolver a conexão ao pool já
+    db.close()
+
+    return StreamingResponse(
+        eventos_sse(
+            topico_conta(conta.numero),
+            inicial,
+            settings.stream_heartbeat_seconds,
+            settings.stream_queue_size,
+            ativo=lambda: sessao_ativa(ticket),
+        ),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
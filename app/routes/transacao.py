@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import List
 
-from ..database import get_db
+from ..database import get_db, get_shard_db, get_shard_read_db, shard_router
 from ..models import Cliente, Conta, ContaCorrente, Transacao, Saque, Deposito
 from ..schemas import (
     SaqueRequest,
@@ -15,80 +16,99 @@ from ..schemas import (
     ExtratoRequest,
     ExtratoResponse
 )
-from ..auth import get_current_active_user
+from ..auth import get_current_active_user, get_current_reader
+from ..services import (
+    saldo_total,
+    com_retentativa,
+    abrir_lancamento,
+    debitar,
+    creditar,
+    iniciar_transferencia_remota,
+    concluir_transferencia_remota,
+    ler_arquivadas,
+    ler_corte,
+    versoes_contas,
+    cache_extrato,
+    janela_padrao,
+    totais_periodo,
+)
 
 router = APIRouter(prefix="/transacoes", tags=["Transações"])
 
+# Saque, depósito e transferência usam com_retentativa, que dorme entre as
+# tentativas: são rotas síncronas, executadas pelo FastAPI no threadpool,
+# para que a espera (e o acesso ao banco) não bloqueie o event loop.
+
 @router.post("/{conta_numero}/saque", response_model=TransacaoResponse)
-async def realizar_saque(
+def realizar_saque(
     conta_numero: str,
     saque_data: SaqueRequest,
     current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_shard_db)
 ):
     """
     Realiza um saque na conta especificada.
     """
-    # Buscar conta
-    conta = db.query(Conta).filter(
-        Conta.numero == conta_numero,
-        Conta.cliente_id == current_user.id,
-        Conta.ativa == True
-    ).first()
-    
-    if not conta:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conta não encontrada"
-        )
-    
-    # Verificar se é conta corrente para validações específicas
-    if isinstance(conta, ContaCorrente):
-        # Verificar limite de saques diários
-        if conta.saques_realizados >= conta.limite_saques:
+    def executar():
+        # Buscar conta
+        conta = db.query(Conta).filter(
+            Conta.numero == conta_numero,
+            Conta.cliente_id == current_user.id,
+            Conta.ativa == True
+        ).first()
+        
+        if not conta:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Limite de {conta.limite_saques} saques diários excedido"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conta não encontrada"
             )
         
-        # Verificar saldo + limite
-        saldo_disponivel = conta.saldo + conta.limite
-    else:
-        # Conta poupança - apenas saldo
-        saldo_disponivel = conta.saldo
-    
-    if saque_data.valor > saldo_disponivel:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Saldo insuficiente"
-        )
-    
-    try:
-        # Registrar transação
-        saldo_anterior = conta.saldo
-        conta.saldo -= saque_data.valor
+        # Verificar se é conta corrente para validações específicas
+        if isinstance(conta, ContaCorrente):
+            # Verificar limite de saques diários
+            if conta.saques_realizados >= conta.limite_saques:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Limite de {conta.limite_saques} saques diários excedido"
+                )
+            
+            # Verificar saldo + limite
+            saldo_disponivel = saldo_total(conta) + conta.limite
+        else:
+            # Conta poupança - apenas saldo
+            saldo_disponivel = saldo_total(conta)
+        
+        if saque_data.valor > saldo_disponivel:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Saldo insuficiente"
+            )
         
         # Atualizar contador de saques se for conta corrente
         if isinstance(conta, ContaCorrente):
             conta.saques_realizados += 1
         
-        # Criar registro de saque
-        saque = Saque(
-            tipo="saque",
-            valor=saque_data.valor,
-            descricao=saque_data.descricao or "Saque em conta",
-            saldo_anterior=saldo_anterior,
-            saldo_posterior=conta.saldo,
-            conta_id=conta.id,
+        # Registrar saque
+        saque = debitar(
+            db,
+            conta,
+            saque_data.valor,
+            "saque",
+            saque_data.descricao or "Saque em conta",
+            modelo=Saque,
             taxa=Decimal('2.50')  # Taxa fixa de saque
         )
         
-        db.add(saque)
         db.commit()
         db.refresh(saque)
         
         return saque
-        
+    
+    try:
+        # Em conflito de versão a conta é relida e as validações refeitas
+        return com_retentativa(db, executar)
+    except (HTTPException, StaleDataError):
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -97,50 +117,49 @@ async def realizar_saque(
         )
 
 @router.post("/{conta_numero}/deposito", response_model=TransacaoResponse)
-async def realizar_deposito(
+def realizar_deposito(
     conta_numero: str,
     deposito_data: DepositoRequest,
     current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_shard_db)
 ):
     """
     Realiza um depósito na conta especificada.
     """
-    # Buscar conta
-    conta = db.query(Conta).filter(
-        Conta.numero == conta_numero,
-        Conta.cliente_id == current_user.id,
-        Conta.ativa == True
-    ).first()
-    
-    if not conta:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conta não encontrada"
-        )
-    
-    try:
-        # Registrar transação
-        saldo_anterior = conta.saldo
-        conta.saldo += deposito_data.valor
+    def executar():
+        # Buscar conta
+        conta = db.query(Conta).filter(
+            Conta.numero == conta_numero,
+            Conta.cliente_id == current_user.id,
+            Conta.ativa == True
+        ).first()
+        
+        if not conta:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conta não encontrada"
+            )
         
-        # Criar registro de depósito
-        deposito = Deposito(
-            tipo="deposito",
-            valor=deposito_data.valor,
-            descricao=deposito_data.descricao or "Depósito em conta",
-            saldo_anterior=saldo_anterior,
-            saldo_posterior=conta.saldo,
-            conta_id=conta.id,
+        # Registrar depósito
+        deposito = creditar(
+            db,
+            conta,
+            deposito_data.valor,
+            "deposito",
+            deposito_data.descricao or "Depósito em conta",
+            modelo=Deposito,
             origem=deposito_data.origem
         )
         
-        db.add(deposito)
         db.commit()
         db.refresh(deposito)
         
         return deposito
-        
+    
+    try:
+        return com_retentativa(db, executar)
+    except (HTTPException, StaleDataError):
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -153,7 +172,8 @@ async def validar_transferencia(
     conta_numero: str,
     transferencia_data: TransferenciaRequest,
     current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_shard_db),
+    primario: Session = Depends(get_db)
 ):
     """
     Valida uma transferência e retorna informações do beneficiário.
@@ -171,20 +191,27 @@ async def validar_transferencia(
             detail="Conta de origem não encontrada"
         )
     
-    # Buscar conta destino
-    conta_destino = db.query(Conta).filter(
-        Conta.numero == transferencia_data.conta_destino,
-        Conta.ativa == True
-    ).first()
-    
-    if not conta_destino:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conta de destino não encontrada"
-        )
+    # Buscar conta destino (no shard responsável por ela; `db` é a sessão do shard da origem)
+    abertas = {shard_router.shard_for(conta_numero): db}
+    with shard_router.session_scope(transferencia_data.conta_destino, padrao=primario, abertas=abertas) as db_destino:
+        conta_destino = db_destino.query(Conta).filter(
+            Conta.numero == transferencia_data.conta_destino,
+            Conta.ativa == True
+        ).first()
+        
+        if not conta_destino:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conta de destino não encontrada"
+            )
+        
+        # Buscar informações do beneficiário
+        beneficiario = db_destino.query(Cliente).filter(
+            Cliente.id == conta_destino.cliente_id
+        ).first()
     
     # Verificar se não é a mesma conta
-    if conta_origem.id == conta_destino.id:
+    if conta_origem.numero == conta_destino.numero:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Não é possível transferir para a mesma conta"
@@ -192,9 +219,9 @@ async def validar_transferencia(
     
     # Calcular saldo disponível
     if isinstance(conta_origem, ContaCorrente):
-        saldo_disponivel = conta_origem.saldo + conta_origem.limite
+        saldo_disponivel = saldo_total(conta_origem) + conta_origem.limite
     else:
-        saldo_disponivel = conta_origem.saldo
+        saldo_disponivel = saldo_total(conta_origem)
     
     # Verificar se há saldo suficiente
     if transferencia_data.valor > saldo_disponivel:
@@ -203,11 +230,6 @@ async def validar_transferencia(
             detail="Saldo insuficiente para realizar a transferência"
         )
     
-    # Buscar informações do beneficiário
-    beneficiario = db.query(Cliente).filter(
-        Cliente.id == conta_destino.cliente_id
-    ).first()
-    
     # Calcular taxa (por enquanto zero)
     taxa = Decimal('0.00')
     valor_total = transferencia_data.valor + taxa
@@ -223,106 +245,114 @@ async def validar_transferencia(
     )
 
 @router.post("/{conta_numero}/transferencia", response_model=TransacaoResponse)
-async def realizar_transferencia(
+def realizar_transferencia(
     conta_numero: str,
     transferencia_data: TransferenciaRequest,
     current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_shard_db),
+    primario: Session = Depends(get_db)
 ):
     """
     Realiza uma transferência entre contas.
+    Entre shards diferentes a transferência usa o outbox do shard de origem.
     """
-    # Buscar conta origem
-    conta_origem = db.query(Conta).filter(
-        Conta.numero == conta_numero,
-        Conta.cliente_id == current_user.id,
-        Conta.ativa == True
-    ).first()
-    
-    if not conta_origem:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conta de origem não encontrada"
-        )
-    
-    # Buscar conta destino
-    conta_destino = db.query(Conta).filter(
-        Conta.numero == transferencia_data.conta_destino,
-        Conta.ativa == True
-    ).first()
-    
-    if not conta_destino:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conta de destino não encontrada"
-        )
-    
-    # Verificar se não é a mesma conta
-    if conta_origem.id == conta_destino.id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Não é possível transferir para a mesma conta"
-        )
-    
-    # Verificar saldo
-    if isinstance(conta_origem, ContaCorrente):
-        saldo_disponivel = conta_origem.saldo + conta_origem.limite
-    else:
-        saldo_disponivel = conta_origem.saldo
-    
-    if transferencia_data.valor > saldo_disponivel:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Saldo insuficiente"
-        )
-    
-    try:
-        # Buscar informações dos clientes para incluir nomes nas descrições
-        cliente_origem = db.query(Cliente).filter(Cliente.id == conta_origem.cliente_id).first()
-        cliente_destino = db.query(Cliente).filter(Cliente.id == conta_destino.cliente_id).first()
-        
-        # Processar transferência
-        saldo_anterior_origem = conta_origem.saldo
-        saldo_anterior_destino = conta_destino.saldo
+    def executar():
+        # Buscar conta origem
+        conta_origem = db.query(Conta).filter(
+            Conta.numero == conta_numero,
+            Conta.cliente_id == current_user.id,
+            Conta.ativa == True
+        ).first()
         
-        conta_origem.saldo -= transferencia_data.valor
-        conta_destino.saldo += transferencia_data.valor
+        if not conta_origem:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conta de origem não encontrada"
+            )
         
-        # Criar transação de débito (origem)
-        descricao_origem = f"Transferência para {cliente_destino.nome} - Conta {conta_destino.numero}"
-        if transferencia_data.descricao:
-            descricao_origem += f": {transferencia_data.descricao}"
+        abertas = {shard_router.shard_for(conta_numero): db}
+        with shard_router.session_scope(transferencia_data.conta_destino, padrao=primario, abertas=abertas) as db_destino:
+            # Buscar conta destino
+            conta_destino = db_destino.query(Conta).filter(
+                Conta.numero == transferencia_data.conta_destino,
+                Conta.ativa == True
+            ).first()
             
-        transacao_origem = Transacao(
-            tipo="transferencia",
-            valor=transferencia_data.valor,
-            descricao=descricao_origem,
-            saldo_anterior=saldo_anterior_origem,
-            saldo_posterior=conta_origem.saldo,
-            conta_id=conta_origem.id
-        )
-        
-        # Criar transação de crédito (destino)
-        descricao_destino = f"Transferência recebida de {cliente_origem.nome} - Conta {conta_origem.numero}"
-        if transferencia_data.descricao:
-            descricao_destino += f": {transferencia_data.descricao}"
+            if not conta_destino:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Conta de destino não encontrada"
+                )
             
-        transacao_destino = Transacao(
-            tipo="transferencia",
-            valor=transferencia_data.valor,
-            descricao=descricao_destino,
-            saldo_anterior=saldo_anterior_destino,
-            saldo_posterior=conta_destino.saldo,
-            conta_id=conta_destino.id
-        )
-        
-        db.add(transacao_origem)
-        db.add(transacao_destino)
-        db.commit()
-        db.refresh(transacao_origem)
-        
-        return transacao_origem
-        
+            # Verificar se não é a mesma conta
+            if conta_origem.numero == conta_destino.numero:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Não é possível transferir para a mesma conta"
+                )
+            
+            # Verificar saldo
+            if isinstance(conta_origem, ContaCorrente):
+                saldo_disponivel = saldo_total(conta_origem) + conta_origem.limite
+            else:
+                saldo_disponivel = saldo_total(conta_origem)
+            
+            if transferencia_data.valor > saldo_disponivel:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Saldo insuficiente"
+                )
+            
+            # Buscar informações dos clientes para incluir nomes nas descrições
+            cliente_origem = db.query(Cliente).filter(Cliente.id == conta_origem.cliente_id).first()
+            cliente_destino = db_destino.query(Cliente).filter(Cliente.id == conta_destino.cliente_id).first()
+            
+            # Descrições de débito (origem) e crédito (destino)
+            descricao_origem = f"Transferência para {cliente_destino.nome} - Conta {conta_destino.numero}"
+            descricao_destino = f"Transferência recebida de {cliente_origem.nome} - Conta {conta_origem.numero}"
+            if transferencia_data.descricao:
+                descricao_origem += f": {transferencia_data.descricao}"
+                descricao_destino += f": {transferencia_data.descricao}"
+            
+            if shard_router.same_shard(conta_numero, conta_destino.numero):
+                # Mesmo shard: débito e crédito na mesma transação
+                lancamento = abrir_lancamento(db, "transferencia", descricao_origem)
+                transacao_origem = debitar(
+                    db, conta_origem, transferencia_data.valor, "transferencia", descricao_origem,
+                    lancamento=lancamento
+                )
+                creditar(
+                    db, conta_destino, transferencia_data.valor, "transferencia", descricao_destino,
+                    lancamento=lancamento
+                )
+                db.commit()
+            else:
+                # Shards diferentes: débito + outbox, depois crédito idempotente
+                transacao_origem, pendente = iniciar_transferencia_remota(
+                    db,
+                    conta_origem,
+                    conta_destino.numero,
+                    transferencia_data.valor,
+                    "transferencia",
+                    descricao_origem,
+                    descricao_destino
+                )
+                db.commit()
+                try:
+                    concluir_transferencia_remota(db, db_destino, pendente)
+                except Exception as e:
+                    # O crédito será reaplicado pelo processamento do outbox
+                    db_destino.rollback()
+                    print(f"❌ Crédito da transferência {pendente.transferencia_id} adiado: {e}")
+            
+            db.refresh(transacao_origem)
+            
+            return transacao_origem
+    
+    try:
+        return com_retentativa(db, executar)
+    except (HTTPException, StaleDataError):
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -334,13 +364,37 @@ async def realizar_transferencia(
 async def obter_extrato(
     conta_numero: str,
     extrato_params: ExtratoRequest = Depends(),
-    current_user: Cliente = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Cliente = Depends(get_current_reader),
+    db: Session = Depends(get_shard_read_db)
 ):
     """
     Obtém o extrato de uma conta com filtros opcionais.
+    
+    Extratos já montados ficam em cache pela versão da conta: qualquer
+    transação nova muda a versão e a próxima consulta monta de novo.
     """
-    # Buscar conta
+    # Versão da conta (consulta por índice); vazia se a conta não é do usuário
+    versoes = versoes_contas(db, current_user.id, conta_numero)
+    if not versoes:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conta não encontrada"
+        )
+    
+    # Definir período padrão (últimos 30 dias, em minutos inteiros)
+    if extrato_params.data_fim:
+        data_fim = extrato_params.data_fim
+        data_inicio = extrato_params.data_inicio or (data_fim - timedelta(days=30))
+    else:
+        data_inicio, data_fim = janela_padrao(datetime.utcnow())
+        data_inicio = extrato_params.data_inicio or data_inicio
+    
+    corte = ler_corte()
+    chave = (conta_numero, data_inicio, data_fim, extrato_params.tipo_transacao, versoes[0], corte)
+    corpo = cache_extrato.obter(chave)
+    if corpo is not None:
+        return Response(content=corpo, media_type="application/json")
+    
     conta = db.query(Conta).filter(
         Conta.numero == conta_numero,
         Conta.cliente_id == current_user.id,
@@ -353,10 +407,6 @@ async def obter_extrato(
             detail="Conta não encontrada"
         )
     
-    # Definir período padrão (últimos 30 dias)
-    data_fim = extrato_params.data_fim or datetime.now()
-    data_inicio = extrato_params.data_inicio or (data_fim - timedelta(days=30))
-    
     # Construir query de transações
     query = db.query(Transacao).filter(
         Transacao.conta_id == conta.id,
@@ -371,23 +421,37 @@ async def obter_extrato(
     # Ordenar por data (mais recente primeiro)
     transacoes = query.order_by(Transacao.created_at.desc()).all()
     
-    # Calcular totais
-    total_saques = sum(
-        t.valor for t in transacoes 
-        if t.tipo == "saque" or (t.tipo == "transferencia" and t.valor < 0)
-    )
-    total_depositos = sum(
-        t.valor for t in transacoes 
-        if t.tipo == "deposito" or (t.tipo == "transferencia" and t.valor > 0)
+    # Período anterior ao corte de arquivamento: completar com os arquivos Parquet
+    if corte and data_inicio < corte:
+        try:
+            transacoes += ler_arquivadas(
+                conta.numero,
+                data_inicio,
+                min(data_fim, corte),
+                extrato_params.tipo_transacao
+            )
+        except RuntimeError as e:
+            print(f"❌ Erro ao ler transações arquivadas: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Extrato de períodos arquivados indisponível"
+            )
+    
+    # Totais: dias inteiros dos resumos diários, pontas das transações carregadas
+    total_saques, total_depositos = totais_periodo(
+        db, conta.id, data_inicio, data_fim, extrato_params.tipo_transacao, transacoes
     )
     
-    return ExtratoResponse(
+    extrato = ExtratoResponse(
         conta_numero=conta.numero,
-        saldo_atual=conta.saldo,
+        saldo_atual=saldo_total(conta),
         periodo_inicio=data_inicio,
         periodo_fim=data_fim,
         transacoes=transacoes,
         total_saques=total_saques,
         total_depositos=total_depositos,
         quantidade_transacoes=len(transacoes)
-    )
\ No newline at end of file
+    )
+    corpo = extrato.model_dump_json().encode()
+    cache_extrato.guardar(chave, corpo)
+    return Response(content=corpo, media_type="application/json")
\ No newline at end of file
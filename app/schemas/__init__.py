@@ -1,4 +1,5 @@
-from .auth import LoginRequest, LoginResponse, RegisterRequest, RegisterResponse
+from .dinheiro import Valor
+from .auth import LoginRequest, LoginResponse, RefreshRequest, RegisterRequest, RegisterResponse
 from .cliente import (
     ClienteBase,
     ClienteCreate,
@@ -32,13 +33,18 @@ from .pix import (
     PixTransferenciaRequest,
     PixValidationResponse,
     PixTransferenciaResponse,
+    PixTransferenciaListResponse,
+    PixHistoricoItem,
+    PixHistoricoResponse,
     ChavePixDeleteRequest
 )
 
 __all__ = [
+    "Valor",
     # Auth
     "LoginRequest",
     "LoginResponse",
+    "RefreshRequest",
     "RegisterRequest",
     "RegisterResponse",
     # Cliente
@@ -71,5 +77,8 @@ __all__ = [
     "PixTransferenciaRequest",
     "PixValidationResponse",
     "PixTransferenciaResponse",
+    "PixTransferenciaListResponse",
+    "PixHistoricoItem",
+    "PixHistoricoResponse",
     "ChavePixDeleteRequest",
 ]
\ No newline at end of file
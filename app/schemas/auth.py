@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, validator
 from datetime import date
+from typing import Optional
 from app.auth.security import validate_cpf
 
 class LoginRequest(BaseModel):
@@ -18,6 +19,12 @@ class LoginResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_in: int = 1800  # 30 minutos
+    refresh_token: Optional[str] = None
+    refresh_expires_in: Optional[int] = None
+
+class RefreshRequest(BaseModel):
+    """Schema para renovação do token de acesso"""
+    refresh_token: str = Field(..., description="Refresh token recebido no login")
 
 class RegisterRequest(BaseModel):
     """Schema para cadastro de cliente"""
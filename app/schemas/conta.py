@@ -3,6 +3,8 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional
 
+from .dinheiro import Valor
+
 class ContaBase(BaseModel):
     """Schema base para Conta"""
     numero: str = Field(..., description="Número da conta")
@@ -12,7 +14,7 @@ class ContaBase(BaseModel):
 class ContaCreate(BaseModel):
     """Schema para criação de conta"""
     tipo_conta: str = Field(default="corrente", description="Tipo da conta")
-    limite: Optional[Decimal] = Field(default=Decimal('500.00'), description="Limite para conta corrente")
+    limite: Optional[Valor] = Field(default=Decimal('500.00'), description="Limite para conta corrente")
     
     @validator('tipo_conta')
     def validate_tipo_conta(cls, v):
@@ -23,12 +25,12 @@ class ContaCreate(BaseModel):
 class ContaUpdate(BaseModel):
     """Schema para atualização de conta"""
     ativa: Optional[bool] = Field(None, description="Status da conta")
-    limite: Optional[Decimal] = Field(None, description="Limite da conta")
+    limite: Optional[Valor] = Field(None, description="Limite da conta")
 
 class ContaResponse(ContaBase):
     """Schema para resposta de conta"""
     id: int
-    saldo: Decimal
+    saldo: Valor
     ativa: bool
     cliente_id: int
     created_at: datetime
@@ -39,7 +41,7 @@ class ContaResponse(ContaBase):
 
 class ContaCorrenteResponse(ContaResponse):
     """Schema para resposta de conta corrente"""
-    limite: Decimal
+    limite: Valor
     limite_saques: int
     saques_realizados: int
     
@@ -56,9 +58,9 @@ class ContaWithTransacoes(ContaResponse):
 class SaldoResponse(BaseModel):
     """Schema para consulta de saldo"""
     conta_numero: str
-    saldo_atual: Decimal
-    saldo_disponivel: Decimal  # Saldo + limite para conta corrente
-    limite: Optional[Decimal] = None
+    saldo_atual: Valor
+    saldo_disponivel: Valor  # Saldo + limite para conta corrente
+    limite: Optional[Valor] = None
     
 # Forward reference
 from .transacao import TransacaoResponse
@@ -0,0 +1,29 @@
+from decimal import Decimal, InvalidOperation
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+from app.models.dinheiro import CENTAVO, de_centavos
+
+# Maior valor cujos centavos cabem no BIGINT da coluna Dinheiro
+VALOR_MAXIMO = de_centavos(2 ** 63 - 1)
+
+
+def _validar_centavos(valor: Decimal) -> Decimal:
+    if not valor.is_finite():
+        raise ValueError("Valor inválido")
+    # Antes do quantize: valores enormes estouram a precisão do Decimal
+    if abs(valor) > VALOR_MAXIMO:
+        raise ValueError("Valor fora do intervalo permitido")
+    try:
+        arredondado = valor.quantize(CENTAVO)
+    except InvalidOperation:
+        raise ValueError("Valor inválido")
+    if valor != arredondado:
+        raise ValueError("Valor deve ter no máximo duas casas decimais")
+    # Sempre com duas casas na resposta: 10 -> "10.00", 2.5 -> "2.50"
+    return arredondado
+
+
+# Valor monetário exato em reais; no banco vira centavos (ver app.models.dinheiro)
+Valor = Annotated[Decimal, AfterValidator(_validar_centavos)]
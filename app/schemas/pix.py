@@ -4,6 +4,8 @@ from datetime import datetime
 from decimal import Decimal
 import re
 
+from .dinheiro import Valor
+
 class TipoChavePixEnum(str):
     CPF = "cpf"
     CNPJ = "cnpj"
@@ -82,7 +84,7 @@ class ChavePixListResponse(BaseModel):
 
 class PixTransferenciaRequest(BaseModel):
     chave_destino: str = Field(..., description="Chave PIX de destino")
-    valor: Decimal = Field(..., gt=0, description="Valor da transferência")
+    valor: Valor = Field(..., gt=0, le=Decimal("50000.00"), description="Valor da transferência")
     descricao: Optional[str] = Field(None, max_length=200, description="Descrição da transferência")
     
     @validator('valor')
@@ -97,16 +99,16 @@ class PixValidationResponse(BaseModel):
     chave_destino: str
     beneficiario_nome: str
     beneficiario_cpf: str
-    valor: Decimal
-    taxa: Decimal = Decimal('0.00')
-    valor_total: Decimal
-    saldo_disponivel: Decimal
+    valor: Valor
+    taxa: Valor = Decimal('0.00')
+    valor_total: Valor
+    saldo_disponivel: Valor
     
 class PixTransferenciaResponse(BaseModel):
     id: int
     chave_origem: str
     chave_destino: str
-    valor: Decimal
+    valor: Valor
     descricao: Optional[str] = None
     status: str
     data_transacao: datetime
@@ -114,5 +116,16 @@ class PixTransferenciaResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class PixTransferenciaListResponse(BaseModel):
+    transferencias: List[PixTransferenciaResponse]
+    proximo_cursor: Optional[str] = Field(None, description="Cursor da próxima página (ausente na última)")
+
+class PixHistoricoItem(PixTransferenciaResponse):
+    natureza: str = Field(..., description="'debito' (enviado) ou 'credito' (recebido)")
+
+class PixHistoricoResponse(BaseModel):
+    transferencias: List[PixHistoricoItem]
+    proximo_cursor: Optional[str] = Field(None, description="Cursor da próxima página (ausente na última)")
+
 class ChavePixDeleteRequest(BaseModel):
     chave: str = Field(..., description="Chave PIX a ser removida")
\ No newline at end of file
@@ -3,10 +3,12 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
+from .dinheiro import Valor
+
 class TransacaoBase(BaseModel):
     """Schema base para Transação"""
     tipo: str = Field(..., description="Tipo da transação")
-    valor: Decimal = Field(..., gt=0, description="Valor da transação")
+    valor: Valor = Field(..., gt=0, description="Valor da transação")
     descricao: Optional[str] = Field(None, description="Descrição da transação")
     
     @validator('tipo')
@@ -17,7 +19,7 @@ class TransacaoBase(BaseModel):
 
 class SaqueRequest(BaseModel):
     """Schema para solicitação de saque"""
-    valor: Decimal = Field(..., gt=0, description="Valor do saque")
+    valor: Valor = Field(..., gt=0, description="Valor do saque")
     descricao: Optional[str] = Field(None, description="Descrição do saque")
     
     @validator('valor')
@@ -28,7 +30,7 @@ class SaqueRequest(BaseModel):
 
 class DepositoRequest(BaseModel):
     """Schema para solicitação de depósito"""
-    valor: Decimal = Field(..., gt=0, description="Valor do depósito")
+    valor: Valor = Field(..., gt=0, description="Valor do depósito")
     origem: Optional[str] = Field(default="caixa", description="Origem do depósito")
     descricao: Optional[str] = Field(None, description="Descrição do depósito")
     
@@ -41,7 +43,7 @@ class DepositoRequest(BaseModel):
 class TransferenciaRequest(BaseModel):
     """Schema para solicitação de transferência"""
     conta_destino: str = Field(..., description="Número da conta de destino")
-    valor: Decimal = Field(..., gt=0, description="Valor da transferência")
+    valor: Valor = Field(..., gt=0, description="Valor da transferência")
     descricao: Optional[str] = Field(None, description="Descrição da transferência")
     
     @validator('valor')
@@ -55,10 +57,10 @@ class TransferenciaValidationResponse(BaseModel):
     conta_destino: str = Field(..., description="Número da conta de destino")
     beneficiario_nome: str = Field(..., description="Nome do beneficiário")
     beneficiario_cpf: str = Field(..., description="CPF do beneficiário")
-    valor: Decimal = Field(..., description="Valor da transferência")
-    saldo_disponivel: Decimal = Field(..., description="Saldo disponível na conta origem")
-    taxa: Decimal = Field(default=Decimal('0.00'), description="Taxa da transferência")
-    valor_total: Decimal = Field(..., description="Valor total com taxas")
+    valor: Valor = Field(..., description="Valor da transferência")
+    saldo_disponivel: Valor = Field(..., description="Saldo disponível na conta origem")
+    taxa: Valor = Field(default=Decimal('0.00'), description="Taxa da transferência")
+    valor_total: Valor = Field(..., description="Valor total com taxas")
     
     class Config:
         from_attributes = True
@@ -66,8 +68,9 @@ class TransferenciaValidationResponse(BaseModel):
 class TransacaoResponse(TransacaoBase):
     """Schema para resposta de transação"""
     id: int
-    saldo_anterior: Decimal
-    saldo_posterior: Decimal
+    saldo_anterior: Valor
+    saldo_posterior: Valor
+    natureza: Optional[str] = Field(None, description="'debito' ou 'credito'")
     conta_id: int
     created_at: datetime
     
@@ -89,10 +92,10 @@ class ExtratoRequest(BaseModel):
 class ExtratoResponse(BaseModel):
     """Schema para resposta de extrato"""
     conta_numero: str
-    saldo_atual: Decimal
+    saldo_atual: Valor
     periodo_inicio: datetime
     periodo_fim: datetime
     transacoes: list[TransacaoResponse]
-    total_saques: Decimal
-    total_depositos: Decimal
+    total_saques: Valor
+    total_depositos: Valor
     quantidade_transacoes: int
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Inicialização do servidor HTTP.
+
+Uso:
+    python -m app.server
+
+Em produção o servidor sobe vários processos (workers) que compartilham o
+mesmo socket; o SIGTERM faz cada worker parar de aceitar conexões e
+concluir as requisições em andamento antes de encerrar. As migrações são
+aplicadas uma vez no processo principal, antes de os workers subirem.
+"""
+import importlib.util
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def worker_count() -> int:
+    """Número de workers configurado (0 = um por núcleo disponível)"""
+    if settings.server_workers > 0:
+        return settings.server_workers
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def resolve_loop() -> str:
+    """Loop de eventos: uvloop quando instalado, salvo configuração explícita"""
+    if settings.server_loop != "auto":
+        return settings.server_loop
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def resolve_http() -> str:
+    """Parser HTTP: httptools quando instalado, salvo configuração explícita"""
+    if settings.server_http != "auto":
+        return settings.server_http
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def run():
+    """Sobe o servidor conforme as configurações"""
+    if settings.server_reload:
+        # Modo desenvolvimento: processo único com recarga automática
+        uvicorn.run(
+            "app.main:app",
+            host=settings.server_host,
+            port=settings.server_port,
+            reload=True,
+            log_level=settings.log_level,
+        )
+        return
+
+    # Migrar uma vez aqui, antes dos workers: no startup deles o schema já está na head
+    from app.database import create_tables
+
+    if create_tables():
+        print("✅ Migrações do banco de dados aplicadas")
+
+    workers = worker_count()
+    print(f"🚀 Iniciando {workers} worker(s) em {settings.server_host}:{settings.server_port}")
+    uvicorn.run(
+        "app.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        loop=resolve_loop(),
+        http=resolve_http(),
+        backlog=settings.server_backlog,
+        timeout_keep_alive=settings.server_keepalive,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        proxy_headers=True,
+        access_log=settings.server_access_log,
+        log_level=settings.log_level,
+    )
+
+
+if __name__ == "__main__":
+    run()
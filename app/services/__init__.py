@@ -0,0 +1,53 @@
+from .faixas import saldo_total, configurar_faixas
+from .razao import abrir_lancamento, lancar, saldos_do_razao, verificar_razao
+from .movimentacao import (
+    debitar,
+    creditar,
+    iniciar_transferencia_remota,
+    concluir_transferencia_remota,
+    estornar_transferencia_remota,
+    processar_transferencias_pendentes,
+    processar_transferencias_periodicamente
+)
+from .arquivo import arquivar_transacoes, ler_arquivadas, ler_corte
+from .concorrencia import tocar_conta, com_retentativa
+from .versoes import versoes_contas, gerar_etag, etag_corresponde, nao_modificado, cabecalhos_cache
+from .resumos import acumular_resumo, totais_periodo, verificar_resumos
+from .paginacao import codificar_cursor, decodificar_cursor, antes_de, intercalar, fatiar_pagina
+from .cache_extrato import cache_extrato, janela_padrao
+
+__all__ = [
+    "saldo_total",
+    "configurar_faixas",
+    "abrir_lancamento",
+    "lancar",
+    "saldos_do_razao",
+    "verificar_razao",
+    "debitar",
+    "creditar",
+    "iniciar_transferencia_remota",
+    "concluir_transferencia_remota",
+    "estornar_transferencia_remota",
+    "processar_transferencias_pendentes",
+    "processar_transferencias_periodicamente",
+    "arquivar_transacoes",
+    "ler_arquivadas",
+    "ler_corte",
+    "tocar_conta",
+    "com_retentativa",
+    "versoes_contas",
+    "gerar_etag",
+    "etag_corresponde",
+    "nao_modificado",
+    "cabecalhos_cache",
+    "acumular_resumo",
+    "totais_periodo",
+    "verificar_resumos",
+    "codificar_cursor",
+    "decodificar_cursor",
+    "antes_de",
+    "intercalar",
+    "fatiar_pagina",
+    "cache_extrato",
+    "janela_padrao",
+]
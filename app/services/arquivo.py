@@ -0,0 +1,285 @@
+"""
+Arquivamento de transações antigas em arquivos Parquet.
+
+Transações anteriores ao corte saem das tabelas do banco e vão para
+arquivos colunares comprimidos (zstd), um por conta e mês:
+
+    <archive_dir>/conta=<numero>/mes=AAAA-MM.parquet
+
+O extrato lê esses arquivos (com memory map) quando o período pedido
+começa antes do corte registrado em `<archive_dir>/_corte`.
+
+As transações são lidas do banco em lotes por chave (conta, data, id),
+sem carregar tudo de uma vez: cada lote vira um row group do arquivo do
+mês, e as linhas do mês só saem do banco depois que o arquivo está
+completo em disco.
+
+Uso:
+    python -m app.services.arquivo --dias 365
+
+Requer o pacote opcional `pyarrow`.
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Conta, Deposito, Saque, Transacao, natureza_pelo_saldo
+from app.schemas import TransacaoResponse
+
+ARQUIVO_CORTE = "_corte"
+LOTE_EXCLUSAO = 500
+LOTE_LEITURA = 5000
+
+# Corte já lido, por caminho: (mtime do arquivo, corte)
+_cortes: Dict[str, Tuple[int, datetime]] = {}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Arquivamento requer o pacote opcional pyarrow") from e
+    return pyarrow
+
+
+def _schema(pa):
+    dinheiro = pa.decimal128(15, 2)
+    return pa.schema([
+        ("id", pa.int64()),
+        ("tipo", pa.string()),
+        ("valor", dinheiro),
+        ("descricao", pa.string()),
+        ("saldo_anterior", dinheiro),
+        ("saldo_posterior", dinheiro),
+        ("conta_id", pa.int64()),
+        ("created_at", pa.timestamp("us")),
+        ("taxa", pa.decimal128(5, 2)),
+        ("origem", pa.string()),
+    ])
+
+
+def caminho_mes(diretorio: str, conta_numero: str, ano: int, mes: int) -> str:
+    return os.path.join(diretorio, f"conta={conta_numero}", f"mes={ano:04d}-{mes:02d}.parquet")
+
+
+def ler_corte(diretorio: Optional[str] = None) -> Optional[datetime]:
+    """
+    Data até a qual as transações já foram arquivadas (None se nunca).
+    Consultada a cada extrato: o arquivo só é relido quando seu mtime muda.
+    """
+    caminho = os.path.join(diretorio or settings.archive_dir, ARQUIVO_CORTE)
+    try:
+        mtime = os.stat(caminho).st_mtime_ns
+        em_cache = _cortes.get(caminho)
+        if em_cache and em_cache[0] == mtime:
+            return em_cache[1]
+        with open(caminho) as arquivo:
+            corte = datetime.fromisoformat(arquivo.read().strip())
+    except FileNotFoundError:
+        return None
+    _cortes[caminho] = (mtime, corte)
+    return corte
+
+
+def _gravar_corte(diretorio: str, corte: datetime):
+    anterior = ler_corte(diretorio)
+    if anterior and anterior >= corte:
+        return
+    temporario = os.path.join(diretorio, ARQUIVO_CORTE + ".tmp")
+    with open(temporario, "w") as arquivo:
+        arquivo.write(corte.isoformat())
+    os.replace(temporario, os.path.join(diretorio, ARQUIVO_CORTE))
+
+
+def _linha(transacao: Transacao) -> Dict:
+    return {
+        "id": transacao.id,
+        "tipo": transacao.tipo,
+        "valor": transacao.valor,
+        "descricao": transacao.descricao,
+        "saldo_anterior": transacao.saldo_anterior,
+        "saldo_posterior": transacao.saldo_posterior,
+        "conta_id": transacao.conta_id,
+        "created_at": transacao.created_at,
+        "taxa": getattr(transacao, "taxa", None),
+        "origem": getattr(transacao, "origem", None),
+    }
+
+
+class _ArquivoMes:
+    """
+    Arquivo de uma conta/mês gravado em row groups, um por lote. Fica num
+    temporário até `fechar`; linhas já presentes no arquivo (de uma
+    execução anterior interrompida antes da exclusão) são mantidas e não
+    se repetem.
+    """
+
+    def __init__(self, caminho: str):
+        pa = _pyarrow()
+        self._pa = pa
+        self.schema = _schema(pa)
+        self.caminho = caminho
+        self.temporario = caminho + ".tmp"
+        self.ids: List[int] = []  # a excluir do banco depois de fechar
+        self._existentes = set()
+
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self._writer = pa.parquet.ParquetWriter(self.temporario, self.schema, compression="zstd")
+        if os.path.exists(caminho):
+            existente = pa.parquet.read_table(caminho, schema=self.schema)
+            self._existentes = set(existente.column("id").to_pylist())
+            self._writer.write_table(existente)
+
+    def gravar(self, linhas: List[Dict]):
+        self.ids.extend(linha["id"] for linha in linhas)
+        novas = [linha for linha in linhas if linha["id"] not in self._existentes]
+        if novas:
+            self._writer.write_table(self._pa.Table.from_pylist(novas, schema=self.schema))
+
+    def fechar(self):
+        self._writer.close()
+        os.replace(self.temporario, self.caminho)
+
+
+def _excluir(db: Session, ids: List[int]):
+    for inicio in range(0, len(ids), LOTE_EXCLUSAO):
+        lote = ids[inicio:inicio + LOTE_EXCLUSAO]
+        # Tabelas filhas primeiro (herança por junção)
+        db.execute(delete(Saque.__table__).where(Saque.__table__.c.id.in_(lote)))
+        db.execute(delete(Deposito.__table__).where(Deposito.__table__.c.id.in_(lote)))
+        db.execute(delete(Transacao.__table__).where(Transacao.__table__.c.id.in_(lote)))
+
+
+def _concluir_mes(db: Session, arquivo: Optional[_ArquivoMes]) -> int:
+    """Fecha o arquivo do mês e só então remove suas transações do banco"""
+    if arquivo is None:
+        return 0
+    arquivo.fechar()
+    _excluir(db, arquivo.ids)
+    db.commit()
+    return len(arquivo.ids)
+
+
+def _lotes_da_conta(db: Session, conta_id: int, corte: datetime):
+    """Transações da conta anteriores a `corte`, em lotes por (data, id) pelo índice (conta, data)"""
+    posicao = None
+    while True:
+        query = db.query(Transacao).filter(
+            Transacao.conta_id == conta_id,
+            Transacao.created_at < corte
+        )
+        if posicao:
+            momento, transacao_id = posicao
+            query = query.filter(or_(
+                Transacao.created_at > momento,
+                and_(Transacao.created_at == momento, Transacao.id > transacao_id)
+            ))
+        lote = query.order_by(Transacao.created_at, Transacao.id).limit(LOTE_LEITURA).all()
+        if not lote:
+            return
+        posicao = (lote[-1].created_at, lote[-1].id)
+        yield lote
+
+
+def arquivar_transacoes(db: Session, corte: datetime, diretorio: Optional[str] = None) -> int:
+    """
+    Move para Parquet as transações anteriores a `corte`. Cada conta/mês é
+    gravado em disco antes de ser removido do banco, então a operação pode
+    ser repetida após uma falha sem perder nem duplicar linhas. A memória
+    usada é a de um lote, não a de todas as transações arquivadas.
+    """
+    _pyarrow()
+    diretorio = diretorio or settings.archive_dir
+    os.makedirs(diretorio, exist_ok=True)
+
+    total = 0
+    for conta_id, numero in db.query(Conta.id, Conta.numero).order_by(Conta.id).all():
+        arquivo, mes_atual = None, None
+        for lote in _lotes_da_conta(db, conta_id, corte):
+            linhas = [_linha(transacao) for transacao in lote]
+            # Só os dicionários seguem adiante: liberar os objetos da sessão
+            for transacao in lote:
+                db.expunge(transacao)
+            for mes, grupo in groupby(linhas, key=lambda l: (l["created_at"].year, l["created_at"].month)):
+                if mes != mes_atual:
+                    total += _concluir_mes(db, arquivo)
+                    arquivo, mes_atual = _ArquivoMes(caminho_mes(diretorio, numero, *mes)), mes
+                arquivo.gravar(list(grupo))
+        total += _concluir_mes(db, arquivo)
+
+    db.expire_all()
+    _gravar_corte(diretorio, corte)
+    return total
+
+
+def ler_arquivadas(
+    conta_numero: str,
+    inicio: datetime,
+    fim: datetime,
+    tipo: Optional[str] = None,
+    diretorio: Optional[str] = None,
+) -> List[TransacaoResponse]:
+    """Transações arquivadas da conta no período (mais recentes primeiro)"""
+    diretorio = diretorio or settings.archive_dir
+    pasta = os.path.join(diretorio, f"conta={conta_numero}")
+    if not os.path.isdir(pasta):
+        return []
+
+    pa = _pyarrow()
+    schema = _schema(pa)
+    filtros = [("created_at", ">=", inicio), ("created_at", "<=", fim)]
+    if tipo:
+        filtros.append(("tipo", "=", tipo))
+
+    primeiro_mes = (inicio.year, inicio.month)
+    ultimo_mes = (fim.year, fim.month)
+    resultado = []
+    for nome in sorted(os.listdir(pasta)):
+        if not (nome.startswith("mes=") and nome.endswith(".parquet")):
+            continue
+        ano, mes = map(int, nome[4:-8].split("-"))
+        if not primeiro_mes <= (ano, mes) <= ultimo_mes:
+            continue
+        tabela = pa.parquet.read_table(
+            os.path.join(pasta, nome),
+            schema=schema,
+            memory_map=True,
+            filters=filtros,
+        )
+        # Os arquivos não guardam a natureza: ela sai dos saldos
+        resultado.extend(
+            TransacaoResponse(**linha, natureza=natureza_pelo_saldo(linha["saldo_anterior"], linha["saldo_posterior"]))
+            for linha in tabela.to_pylist()
+        )
+
+    resultado.sort(key=lambda t: t.created_at, reverse=True)
+    return resultado
+
+
+def main():
+    from app.database.config import shard_router
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dias", type=int, default=settings.archive_hot_days, help="Manter no banco os últimos N dias")
+    parser.add_argument("--diretorio", default=settings.archive_dir)
+    args = parser.parse_args()
+
+    corte = datetime.utcnow() - timedelta(days=args.dias)
+    for indice, factory in enumerate(shard_router.session_factories):
+        db = factory()
+        try:
+            total = arquivar_transacoes(db, corte, args.diretorio)
+            print(f"✅ Shard {indice}: {total} transação(ões) arquivada(s) até {corte:%Y-%m-%d}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
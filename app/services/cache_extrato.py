@@ -0,0 +1,89 @@
+"""
+Cache dos extratos já montados.
+
+A chave é (conta, período, filtro de tipo, versão da conta, corte do
+arquivo). Toda transação nova muda a versão da conta (débito na linha da
+conta ou crédito em faixa, ver app.services.versoes), então uma entrada
+nunca fica desatualizada: ela simplesmente deixa de ser consultada e sai
+pelo LRU. O limite é em bytes do JSON guardado, não em número de
+entradas, porque um extrato de 30 dias pode ter de zero a milhares de
+transações.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+
+def janela_padrao(agora: datetime, dias: int = 30) -> Tuple[datetime, datetime]:
+    """
+    Período padrão do extrato (últimos `dias`) arredondado para o próximo
+    minuto: aberturas seguidas da tela caem na mesma chave. Arredondar
+    para cima não muda o resultado, pois não há transações no futuro.
+    """
+    fim = agora.replace(second=0, microsecond=0)
+    if fim < agora:
+        fim += timedelta(minutes=1)
+    return fim - timedelta(days=dias), fim
+
+
+class CacheExtrato:
+    """LRU de respostas JSON limitado pelo total de bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self.bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def obter(self, chave: Hashable) -> Optional[bytes]:
+        with self._lock:
+            corpo = self._entradas.get(chave)
+            if corpo is None:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return corpo
+
+    def guardar(self, chave: Hashable, corpo: bytes) -> None:
+        if len(corpo) > self.max_bytes:
+            # Maior que o cache inteiro: não vale expulsar todo o resto
+            return
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior)
+            self._entradas[chave] = corpo
+            self.bytes += len(corpo)
+            while self.bytes > self.max_bytes:
+                _, descartado = self._entradas.popitem(last=False)
+                self.bytes -= len(descartado)
+                self.descartes += 1
+
+    def metrics(self) -> dict:
+        return {
+            "entradas": len(self._entradas),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "descartes": self.descartes,
+        }
+
+    def clear(self) -> None:
+        """Esvazia o cache e zera os contadores (útil em testes)"""
+        with self._lock:
+            self._entradas.clear()
+            self.bytes = 0
+            self.acertos = 0
+            self.falhas = 0
+            self.descartes = 0
+
+
+cache_extrato = CacheExtrato(settings.extrato_cache_max_bytes)
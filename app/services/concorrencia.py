@@ -0,0 +1,46 @@
+"""
+Concorrência otimista nas contas.
+
+`Conta.versao` é o `version_id_col` do mapeamento: todo UPDATE da conta
+confere a versão lida e a incrementa. Se outra transação alterou a conta
+no meio do caminho, o flush levanta StaleDataError; a operação é então
+refeita do zero (nova leitura, novas validações) algumas vezes antes de
+desistir. Contas pouco disputadas nunca precisam de SELECT ... FOR UPDATE.
+"""
+import random
+import time
+from typing import Callable, TypeVar
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.config import settings
+from app.models import Conta
+
+T = TypeVar("T")
+
+
+def tocar_conta(conta: Conta):
+    """Força um UPDATE da conta (nova versão) sem alterar o saldo"""
+    flag_modified(conta, "updated_at")
+
+
+def com_retentativa(db: Session, operacao: Callable[[], T], tentativas: int = None) -> T:
+    """
+    Executa `operacao` (que lê as contas, valida, altera e faz commit),
+    repetindo-a em caso de conflito de versão. Na última falha o
+    StaleDataError é propagado (a API responde 409). A espera entre as
+    tentativas bloqueia a thread: chame apenas de rotas síncronas (`def`)
+    ou de tarefas em thread, nunca direto de uma rota `async def`.
+    """
+    tentativas = tentativas or settings.optimistic_retries
+    for tentativa in range(1, tentativas + 1):
+        try:
+            return operacao()
+        except StaleDataError:
+            db.rollback()
+            if tentativa == tentativas:
+                raise
+            # Espera curta e aleatória para as transações não colidirem de novo
+            time.sleep(random.uniform(0, 0.005 * tentativa))
@@ -0,0 +1,240 @@
+"""
+Eventos de alteração de saldo (outbox transacional + broker).
+
+Toda movimentação grava uma linha em `eventos` na mesma transação do
+banco (ver `registrar_evento`). O relay de cada processo lê os eventos
+novos de todos os shards e os publica no broker em memória, onde
+assinantes (notificações, antifraude, streams do frontend) os recebem
+por tópico `contas.<numero>` ou pelo tópico geral `*`.
+"""
+import asyncio
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Protocol, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database.sharding import ShardRouter
+from app.models import Conta, Evento, Transacao
+from app.schemas import TransacaoResponse
+
+TODOS = "*"
+
+# Ids de autoincremento podem ser confirmados fora de ordem; o relay
+# relê esta quantidade de ids antes do cursor para não perder nenhum
+FOLGA_REORDENACAO = 200
+
+
+def topico_conta(conta_numero: str) -> str:
+    return f"contas.{conta_numero}"
+
+
+def registrar_evento(db: Session, conta: Conta, transacao: Transacao, delta: Decimal, saldo: Decimal) -> Evento:
+    """Grava o evento da movimentação (sem commit, na mesma transação)"""
+    evento = Evento(
+        tipo="saldo_alterado",
+        conta_numero=conta.numero,
+        delta=delta,
+        saldo=saldo,
+        transacao=transacao,
+    )
+    db.add(evento)
+    return evento
+
+
+class Assinatura:
+    """Fila de um assinante. Se ele não acompanhar, os mais antigos são descartados."""
+
+    def __init__(self, broker: "BrokerLocal", topico: str, maxsize: int):
+        self.broker = broker
+        self.topico = topico
+        self.fila: asyncio.Queue = asyncio.Queue(maxsize)
+        self.descartados = 0
+
+    def entregar(self, mensagem: dict):
+        if self.fila.full():
+            self.fila.get_nowait()
+            self.descartados += 1
+        self.fila.put_nowait(mensagem)
+
+    async def proxima(self) -> dict:
+        return await self.fila.get()
+
+    def cancelar(self):
+        self.broker.cancelar(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        return await self.proxima()
+
+
+class EventPublisher(Protocol):
+    """Destino do relay; um broker externo pode implementar esta interface"""
+
+    def publicar(self, topico: str, mensagem: dict) -> int:
+        ...
+
+
+class BrokerLocal:
+    """
+    Broker em memória do processo. Deve ser usado a partir do loop de
+    eventos (asyncio.Queue não é thread-safe).
+    """
+
+    def __init__(self):
+        self._assinaturas: Dict[str, Set[Assinatura]] = defaultdict(set)
+        self.publicados = 0
+        self.entregues = 0
+
+    def assinar(self, topico: str = TODOS, maxsize: int = 100) -> Assinatura:
+        assinatura = Assinatura(self, topico, maxsize)
+        self._assinaturas[topico].add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura):
+        assinaturas = self._assinaturas.get(assinatura.topico)
+        if assinaturas is not None:
+            assinaturas.discard(assinatura)
+            if not assinaturas:
+                del self._assinaturas[assinatura.topico]
+
+    def publicar(self, topico: str, mensagem: dict) -> int:
+        destinatarios = list(self._assinaturas.get(topico, ())) + list(self._assinaturas.get(TODOS, ()))
+        for assinatura in destinatarios:
+            assinatura.entregar(mensagem)
+        self.publicados += 1
+        self.entregues += len(destinatarios)
+        return len(destinatarios)
+
+    def metrics(self) -> dict:
+        assinaturas = [a for grupo in self._assinaturas.values() for a in grupo]
+        return {
+            "assinantes": len(assinaturas),
+            "publicados": self.publicados,
+            "entregues": self.entregues,
+            "descartados": sum(a.descartados for a in assinaturas),
+        }
+
+    def clear(self):
+        self._assinaturas.clear()
+        self.publicados = 0
+        self.entregues = 0
+
+
+broker = BrokerLocal()
+
+
+def mensagem_evento(evento: Evento, transacao: Optional[Transacao]) -> dict:
+    return {
+        "id": evento.id,
+        "tipo": evento.tipo,
+        "conta_numero": evento.conta_numero,
+        "delta": str(evento.delta),
+        "saldo": str(evento.saldo),
+        "transacao": (
+            TransacaoResponse.model_validate(transacao).model_dump(mode="json")
+            if transacao is not None else None
+        ),
+    }
+
+
+class RelayEventos:
+    """
+    Lê os eventos novos de cada shard. Cada processo mantém seus próprios
+    cursores e entrega todos os eventos aos seus assinantes locais.
+    """
+
+    def __init__(self, router: ShardRouter, limite: int = 500):
+        self.router = router
+        self.limite = limite
+        self.cursores: List[int] = [0] * router.count
+        self._vistos = [deque(maxlen=4 * FOLGA_REORDENACAO) for _ in range(router.count)]
+
+    def iniciar_cursores(self):
+        """Começar do fim: eventos anteriores à subida do processo não são reenviados"""
+        for indice, factory in enumerate(self.router.session_factories):
+            db = factory()
+            try:
+                cursor = db.query(func.max(Evento.id)).scalar() or 0
+                self.cursores[indice] = cursor
+                self._vistos[indice].extend(
+                    evento_id for (evento_id,) in db.query(Evento.id).filter(
+                        Evento.id > cursor - FOLGA_REORDENACAO
+                    ).order_by(Evento.id).all()
+                )
+            finally:
+                db.close()
+
+    def ler_novos(self) -> List[dict]:
+        mensagens = []
+        for indice, factory in enumerate(self.router.session_factories):
+            db = factory()
+            try:
+                mensagens.extend(self._ler_shard(db, indice))
+            finally:
+                db.close()
+        return mensagens
+
+    def _ler_shard(self, db: Session, indice: int) -> List[dict]:
+        vistos = self._vistos[indice]
+        eventos = [
+            evento for evento in db.query(Evento).filter(
+                Evento.id > self.cursores[indice] - FOLGA_REORDENACAO
+            ).order_by(Evento.id).limit(self.limite + FOLGA_REORDENACAO).all()
+            if evento.id not in vistos
+        ][:self.limite]
+        if not eventos:
+            return []
+
+        ids_transacoes = [e.transacao_id for e in eventos if e.transacao_id]
+        transacoes = {
+            t.id: t for t in db.query(Transacao).filter(Transacao.id.in_(ids_transacoes)).all()
+        } if ids_transacoes else {}
+
+        for evento in eventos:
+            vistos.append(evento.id)
+        self.cursores[indice] = max(self.cursores[indice], eventos[-1].id)
+        return [mensagem_evento(e, transacoes.get(e.transacao_id)) for e in eventos]
+
+    def limpar(self, antes: datetime) -> int:
+        """Remove eventos antigos de todos os shards"""
+        total = 0
+        for factory in self.router.session_factories:
+            db = factory()
+            try:
+                total += db.query(Evento).filter(Evento.created_at < antes).delete(synchronize_session=False)
+                db.commit()
+            finally:
+                db.close()
+        return total
+
+
+def publicar(publisher: EventPublisher, mensagens: List[dict]) -> int:
+    for mensagem in mensagens:
+        publisher.publicar(topico_conta(mensagem["conta_numero"]), mensagem)
+    return len(mensagens)
+
+
+async def relay_eventos(relay: RelayEventos, publisher: EventPublisher, intervalo: float, retencao_horas: int):
+    """Tarefa de fundo que publica os eventos novos no broker"""
+    try:
+        await asyncio.to_thread(relay.iniciar_cursores)
+    except Exception as e:
+        print(f"❌ Erro ao iniciar o relay de eventos: {e}")
+    ultima_limpeza = datetime.utcnow()
+    while True:
+        try:
+            mensagens = await asyncio.to_thread(relay.ler_novos)
+            publicar(publisher, mensagens)
+            if datetime.utcnow() - ultima_limpeza > timedelta(minutes=10):
+                ultima_limpeza = datetime.utcnow()
+                await asyncio.to_thread(relay.limpar, ultima_limpeza - timedelta(hours=retencao_horas))
+        except Exception as e:
+            print(f"❌ Erro no relay de eventos: {e}")
+            mensagens = []
+        if not mensagens:
+            await asyncio.sleep(intervalo)
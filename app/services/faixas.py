@@ -0,0 +1,107 @@
+"""
+Saldo em faixas para contas que recebem muitos créditos simultâneos.
+
+Em uma conta com `faixas_saldo = K > 1`, cada crédito soma o valor em uma
+de K linhas de `sub_saldos`, escolhida pelo hash do id da transferência,
+com um UPDATE atômico. Créditos concorrentes disputam linhas diferentes e
+a vazão de entrada cresce com K. Débitos consolidam antes as faixas em
+`Conta.saldo`; leituras somam as faixas.
+
+Uso:
+    python -m app.services.faixas <numero_conta> --faixas 8
+"""
+import argparse
+import zlib
+from decimal import Decimal
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, object_session
+
+from app.models import Conta, SubSaldo
+
+
+def usa_faixas(conta: Conta) -> bool:
+    return (conta.faixas_saldo or 1) > 1
+
+
+def faixa_para(chave: str, faixas: int) -> int:
+    """Faixa que recebe o crédito identificado por `chave`"""
+    return zlib.crc32(chave.encode()) % faixas
+
+
+def saldo_faixas(db: Session, conta: Conta) -> Decimal:
+    total = db.query(func.sum(SubSaldo.saldo)).filter(SubSaldo.conta_id == conta.id).scalar()
+    return Decimal(total or 0)
+
+
+def saldo_total(conta: Conta) -> Decimal:
+    """Saldo da conta somando as faixas (sem custo extra para contas comuns)"""
+    if not usa_faixas(conta):
+        return conta.saldo
+    return conta.saldo + saldo_faixas(object_session(conta), conta)
+
+
+def creditar_em_faixa(db: Session, conta: Conta, valor: Decimal, chave: str) -> Decimal:
+    """
+    Soma o valor em uma das faixas e retorna o saldo total anterior (lido
+    sem bloqueio, apenas informativo para o extrato).
+    """
+    saldo_anterior = saldo_total(conta)
+    db.execute(
+        update(SubSaldo)
+        .where(SubSaldo.conta_id == conta.id, SubSaldo.faixa == faixa_para(chave, conta.faixas_saldo))
+        .values(saldo=SubSaldo.saldo + valor, versao=SubSaldo.versao + 1)
+    )
+    return saldo_anterior
+
+
+def consolidar_faixas(db: Session, conta: Conta) -> Decimal:
+    """Transfere o valor das faixas para `Conta.saldo` (bloqueando as faixas)"""
+    faixas = db.query(SubSaldo).filter(SubSaldo.conta_id == conta.id).with_for_update().all()
+    total = sum((Decimal(faixa.saldo) for faixa in faixas), Decimal("0.00"))
+    if total:
+        conta.saldo += total
+        for faixa in faixas:
+            faixa.saldo = Decimal("0.00")
+    return total
+
+
+def configurar_faixas(db: Session, conta: Conta, faixas: int):
+    """Define o número de faixas da conta (1 desativa o modo)"""
+    if faixas < 1:
+        raise ValueError("O número de faixas deve ser ao menos 1")
+
+    consolidar_faixas(db, conta)
+    for faixa in list(conta.sub_saldos):
+        db.delete(faixa)
+    db.flush()
+
+    if faixas > 1:
+        for indice in range(faixas):
+            db.add(SubSaldo(conta_id=conta.id, faixa=indice, saldo=Decimal("0.00")))
+    conta.faixas_saldo = faixas
+    db.commit()
+
+
+def main():
+    from app.database.config import shard_router
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("conta_numero")
+    parser.add_argument("--faixas", type=int, required=True)
+    args = parser.parse_args()
+
+    factory = shard_router.session_factories[shard_router.shard_for(args.conta_numero)]
+    db = factory()
+    try:
+        conta = db.query(Conta).filter(Conta.numero == args.conta_numero).first()
+        if conta is None:
+            raise SystemExit(f"❌ Conta {args.conta_numero} não encontrada")
+        configurar_faixas(db, conta, args.faixas)
+        print(f"✅ Conta {conta.numero}: {args.faixas} faixa(s) de saldo")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
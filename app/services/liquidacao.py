@@ -0,0 +1,228 @@
+"""
+Liquidação assíncrona de PIX.
+
+A rota de transferência apenas valida, grava a TransacaoPix como
+"processando" e enfileira o pedido em `fila_pix`. Um conjunto de
+trabalhadores reserva lotes da fila e liquida cada lote em uma única
+transação do banco, mantendo a latência da rota estável em picos.
+
+A conta de destino é conferida (existe e está ativa) antes do débito; se
+não estiver, o PIX é rejeitado sem movimentar nada. Um item que falha é
+devolvido à fila e, após `pix_max_attempts` falhas, vai para a fila morta
+(status "falhou") com o PIX rejeitado: como cada tentativa é desfeita por
+inteiro, nada chegou a ser debitado.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.sharding import ShardRouter
+from app.models import Conta, FilaPix, TransacaoPix, TransferenciaPendente
+from .concorrencia import com_retentativa
+from .faixas import saldo_total
+from .movimentacao import (
+    DestinoIndisponivel,
+    concluir_transferencia_remota,
+    conta_destino_valida,
+    creditar,
+    debitar,
+    iniciar_transferencia_remota,
+)
+from .razao import abrir_lancamento
+
+# Reservas mais antigas que isto são de trabalhadores que morreram
+RESERVA_EXPIRA = timedelta(minutes=5)
+
+# Acordar os trabalhadores assim que um PIX é enfileirado
+fila_pix_evento = asyncio.Event()
+
+
+def _rejeitar(db: Session, item: FilaPix, motivo: str) -> None:
+    item.transacao_pix.status = "rejeitada"
+    db.delete(item)
+    print(f"🚫 PIX {item.transacao_pix_id} rejeitado: {motivo}")
+
+
+def _destino_no_outro_shard(router: ShardRouter, conta_numero: str) -> Conta:
+    db_destino = router.session_factories[router.shard_for(conta_numero)]()
+    try:
+        return conta_destino_valida(db_destino, conta_numero)
+    finally:
+        db_destino.close()
+
+
+def _liquidar(db: Session, router: ShardRouter, item: FilaPix) -> Optional[TransferenciaPendente]:
+    """
+    Liquida um PIX (sem commit). Retorna a transferência pendente quando o
+    destino está em outro shard e o crédito ainda precisa ser concluído;
+    nesse caso o PIX continua "processando" até a conclusão.
+    """
+    transacao_pix = item.transacao_pix
+    # Sem bloqueio: a versão da conta detecta alterações concorrentes no commit
+    conta_origem = db.query(Conta).filter(Conta.id == transacao_pix.conta_origem_id).first()
+
+    if not conta_origem.ativa or saldo_total(conta_origem) < item.valor:
+        _rejeitar(db, item, "conta de origem inativa ou sem saldo")
+        return None
+
+    mesmo_shard = router.same_shard(conta_origem.numero, item.conta_destino_numero)
+    try:
+        if mesmo_shard:
+            conta_destino = conta_destino_valida(db, item.conta_destino_numero)
+        else:
+            _destino_no_outro_shard(router, item.conta_destino_numero)
+    except DestinoIndisponivel as e:
+        _rejeitar(db, item, str(e))
+        return None
+
+    pendente = None
+    if mesmo_shard:
+        lancamento = abrir_lancamento(db, "pix", item.descricao_origem)
+        debitar(db, conta_origem, item.valor, "pix", item.descricao_origem, lancamento=lancamento)
+        creditar(db, conta_destino, item.valor, "pix", item.descricao_destino, lancamento=lancamento)
+        transacao_pix.conta_destino_id = conta_destino.id
+        transacao_pix.status = "concluida"
+    else:
+        # Débito + outbox no shard de origem; crédito idempotente no destino.
+        # Se o destino sumir até lá, a segunda fase estorna o débito.
+        _, pendente = iniciar_transferencia_remota(
+            db,
+            conta_origem,
+            item.conta_destino_numero,
+            item.valor,
+            "pix",
+            item.descricao_origem,
+            item.descricao_destino,
+            transacao_pix_id=transacao_pix.id,
+        )
+
+    db.delete(item)
+    return pendente
+
+
+def _reservar(db: Session, limite: int) -> List[FilaPix]:
+    """Reserva até `limite` itens da fila para este trabalhador"""
+    agora = datetime.utcnow()
+    db.query(FilaPix).filter(
+        FilaPix.status == "reservado",
+        FilaPix.reservado_em < agora - RESERVA_EXPIRA
+    ).update({"status": "pendente", "lote": None}, synchronize_session=False)
+
+    ids = [
+        item_id for (item_id,) in db.query(FilaPix.id).filter(
+            FilaPix.status == "pendente"
+        ).order_by(FilaPix.id).limit(limite).all()
+    ]
+    if not ids:
+        db.commit()
+        return []
+
+    # UPDATE condicional: dois trabalhadores nunca reservam o mesmo item
+    lote = uuid.uuid4().hex
+    db.query(FilaPix).filter(
+        FilaPix.id.in_(ids),
+        FilaPix.status == "pendente"
+    ).update({"status": "reservado", "lote": lote, "reservado_em": agora}, synchronize_session=False)
+    db.commit()
+    return db.query(FilaPix).filter(FilaPix.lote == lote).order_by(FilaPix.id).all()
+
+
+def _devolver_a_fila(db: Session, item: FilaPix, erro: Exception) -> None:
+    """Devolve o item à fila ou, após muitas falhas, o move para a fila morta"""
+    item.lote = None
+    item.tentativas += 1
+    if item.tentativas >= settings.pix_max_attempts:
+        item.status = "falhou"
+        item.transacao_pix.status = "rejeitada"
+        print(f"☠️ PIX {item.transacao_pix_id} na fila morta após {item.tentativas} tentativas: {erro}")
+    else:
+        item.status = "pendente"
+        print(f"❌ Erro ao liquidar PIX {item.transacao_pix_id} (tentativa {item.tentativas}): {erro}")
+    db.commit()
+
+
+def liquidar_lote(db: Session, router: ShardRouter, limite: int = 100) -> int:
+    """
+    Reserva e liquida um lote da fila do shard de `db`. Retorna quantos
+    itens saíram da fila liquidados ou rejeitados; os que falharam e
+    voltaram para a fila não contam.
+    """
+    itens = _reservar(db, limite)
+    if not itens:
+        return 0
+
+    remotas = []
+    try:
+        for item in itens:
+            pendente = _liquidar(db, router, item)
+            if pendente:
+                remotas.append(pendente)
+        db.commit()
+        tratados = len(itens)
+    except Exception as e:
+        # Um item com problema não pode travar o lote: refazer um a um
+        db.rollback()
+        print(f"⚠️ Lote PIX com erro, liquidando item a item: {e}")
+        remotas = []
+        tratados = 0
+        for item in db.query(FilaPix).filter(FilaPix.id.in_([i.id for i in itens])).all():
+            def liquidar_item():
+                pendente = _liquidar(db, router, item)
+                db.commit()
+                return pendente
+
+            try:
+                pendente = com_retentativa(db, liquidar_item)
+                tratados += 1
+                if pendente:
+                    remotas.append(pendente)
+            except Exception as erro:
+                db.rollback()
+                _devolver_a_fila(db, item, erro)
+
+    for pendente in remotas:
+        db_destino = router.session_factories[router.shard_for(pendente.conta_destino_numero)]()
+        try:
+            concluir_transferencia_remota(db, db_destino, pendente)
+        except Exception as e:
+            # O crédito será reaplicado pelo processamento do outbox
+            db_destino.rollback()
+            db.rollback()
+            print(f"⚠️ Crédito PIX {pendente.transferencia_id} adiado: {e}")
+        finally:
+            db_destino.close()
+
+    return tratados
+
+
+def liquidar_fila_pix(router: ShardRouter, limite: int = 100) -> int:
+    """Liquida um lote de cada shard; retorna quantos itens saíram da fila"""
+    total = 0
+    for factory in router.session_factories:
+        db = factory()
+        try:
+            total += liquidar_lote(db, router, limite)
+        finally:
+            db.close()
+    return total
+
+
+async def trabalhador_pix(router: ShardRouter, limite: int, intervalo: float):
+    """Tarefa de fundo que liquida a fila enquanto houver itens"""
+    while True:
+        try:
+            tratados = await asyncio.to_thread(liquidar_fila_pix, router, limite)
+        except Exception as e:
+            print(f"❌ Erro na liquidação de PIX: {e}")
+            tratados = 0
+        if tratados:
+            continue
+        try:
+            await asyncio.wait_for(fila_pix_evento.wait(), timeout=intervalo)
+        except asyncio.TimeoutError:
+            pass
+        fila_pix_evento.clear()
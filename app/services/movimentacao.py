@@ -0,0 +1,297 @@
+import asyncio
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Tuple, Type
+
+from sqlalchemy.orm import Session
+
+from app.database.sharding import ShardRouter
+from app.models import (
+    CONTA_CAIXA,
+    CONTA_TRANSITO,
+    NATUREZA_CREDITO,
+    NATUREZA_DEBITO,
+    Conta,
+    Lancamento,
+    Transacao,
+    TransacaoPix,
+    TransferenciaPendente,
+    TransferenciaRecebida,
+)
+from .razao import abrir_lancamento, lancar
+from .faixas import usa_faixas, faixa_para, creditar_em_faixa, consolidar_faixas
+from .resumos import acumular_resumo
+from .eventos import registrar_evento
+from .concorrencia import com_retentativa
+
+
+class DestinoIndisponivel(ValueError):
+    """A conta de destino não existe ou está inativa: o crédito nunca será aplicado"""
+
+
+def conta_destino_valida(db: Session, conta_numero: str) -> Conta:
+    """Conta de destino de uma transferência, ou DestinoIndisponivel"""
+    conta = db.query(Conta).filter(Conta.numero == conta_numero).first()
+    if conta is None:
+        raise DestinoIndisponivel(f"Conta de destino {conta_numero} não encontrada")
+    if not conta.ativa:
+        raise DestinoIndisponivel(f"Conta de destino {conta_numero} inativa")
+    return conta
+
+
+def debitar(
+    db: Session,
+    conta: Conta,
+    valor: Decimal,
+    tipo: str,
+    descricao: str,
+    modelo: Type[Transacao] = Transacao,
+    lancamento: Optional[Lancamento] = None,
+    contrapartida: str = CONTA_CAIXA,
+    **campos
+) -> Transacao:
+    """
+    Retira o valor do saldo da conta e registra a transação e a partida no
+    razão (sem commit). Sem `lancamento`, abre um próprio com a
+    contrapartida na conta interna `contrapartida`; com `lancamento`, quem
+    chama inclui as demais partidas.
+    """
+    return _movimentar(db, conta, -valor, valor, tipo, descricao, modelo, lancamento, contrapartida, campos)
+
+
+def creditar(
+    db: Session,
+    conta: Conta,
+    valor: Decimal,
+    tipo: str,
+    descricao: str,
+    modelo: Type[Transacao] = Transacao,
+    lancamento: Optional[Lancamento] = None,
+    contrapartida: str = CONTA_CAIXA,
+    **campos
+) -> Transacao:
+    """Soma o valor ao saldo da conta; mesmas regras de `debitar`"""
+    return _movimentar(db, conta, valor, valor, tipo, descricao, modelo, lancamento, contrapartida, campos)
+
+
+def _movimentar(db, conta, variacao, valor, tipo, descricao, modelo, lancamento, contrapartida, campos):
+    if lancamento is None:
+        lancamento = abrir_lancamento(db, tipo, descricao)
+        lancar(lancamento, -variacao, conta_sistema=contrapartida)
+
+    faixa = 0
+    if usa_faixas(conta) and variacao > 0:
+        # Conta com faixas: o crédito não toca a linha da conta
+        saldo_anterior = creditar_em_faixa(db, conta, variacao, lancamento.transferencia_id)
+        saldo_posterior = saldo_anterior + variacao
+        faixa = faixa_para(lancamento.transferencia_id, conta.faixas_saldo)
+    else:
+        if usa_faixas(conta):
+            consolidar_faixas(db, conta)
+        saldo_anterior = conta.saldo
+        conta.saldo += variacao
+        saldo_posterior = conta.saldo
+
+    # Data definida aqui, e não pelo banco, para cair no mesmo dia (UTC) do resumo
+    campos.setdefault("created_at", datetime.utcnow())
+    acumular_resumo(db, conta.id, campos["created_at"], tipo, variacao, faixa)
+
+    transacao = modelo(
+        tipo=tipo,
+        valor=valor,
+        descricao=descricao,
+        saldo_anterior=saldo_anterior,
+        saldo_posterior=saldo_posterior,
+        natureza=NATUREZA_DEBITO if variacao < 0 else NATUREZA_CREDITO,
+        conta_id=conta.id,
+        **campos
+    )
+    db.add(transacao)
+    lancar(lancamento, variacao, conta=conta, transacao=transacao)
+    registrar_evento(db, conta, transacao, variacao, saldo_posterior)
+    return transacao
+
+
+def iniciar_transferencia_remota(
+    db_origem: Session,
+    conta_origem: Conta,
+    conta_destino_numero: str,
+    valor: Decimal,
+    tipo: str,
+    descricao_origem: str,
+    descricao_destino: str,
+    transacao_pix_id: Optional[int] = None,
+) -> Tuple[Transacao, TransferenciaPendente]:
+    """
+    Primeira fase de uma transferência entre shards: debita a origem e grava
+    a transferência no outbox, ambos na mesma transação do shard de origem.
+    O commit fica a cargo de quem chama. Com `transacao_pix_id`, o PIX fica
+    "processando" até a segunda fase concluí-lo ou estorná-lo.
+    """
+    transferencia_id = uuid.uuid4().hex
+    # No razão do shard de origem o valor fica na conta de trânsito
+    lancamento = abrir_lancamento(db_origem, tipo, descricao_origem, transferencia_id)
+    transacao = debitar(db_origem, conta_origem, valor, tipo, descricao_origem, lancamento=lancamento)
+    lancar(lancamento, valor, conta_sistema=CONTA_TRANSITO)
+    pendente = TransferenciaPendente(
+        transferencia_id=transferencia_id,
+        tipo=tipo,
+        conta_origem_numero=conta_origem.numero,
+        conta_destino_numero=conta_destino_numero,
+        valor=valor,
+        descricao_destino=descricao_destino,
+        status="pendente",
+        tentativas=0,
+        transacao_pix_id=transacao_pix_id,
+    )
+    db_origem.add(pendente)
+    return transacao, pendente
+
+
+def _atualizar_pix(db_origem: Session, pendente: TransferenciaPendente, status: str):
+    if pendente.transacao_pix_id is not None:
+        db_origem.query(TransacaoPix).filter(
+            TransacaoPix.id == pendente.transacao_pix_id
+        ).update({"status": status}, synchronize_session=False)
+
+
+def estornar_transferencia_remota(db_origem: Session, pendente: TransferenciaPendente, motivo: str):
+    """
+    Estado terminal do outbox: devolve o valor à conta de origem (saindo da
+    conta de trânsito), marca a transferência como "falhou" e o PIX, se
+    houver, como "rejeitada". Só deve ser chamada quando o shard de destino
+    confirmou que o crédito não foi nem será aplicado.
+    """
+    def estornar():
+        conta_origem = db_origem.query(Conta).filter(
+            Conta.numero == pendente.conta_origem_numero
+        ).one()
+        descricao = f"Estorno de {pendente.tipo}: {motivo}"
+        lancamento = abrir_lancamento(db_origem, pendente.tipo, descricao, pendente.transferencia_id)
+        lancar(lancamento, -pendente.valor, conta_sistema=CONTA_TRANSITO)
+        creditar(db_origem, conta_origem, pendente.valor, pendente.tipo, descricao, lancamento=lancamento)
+        pendente.status = "falhou"
+        _atualizar_pix(db_origem, pendente, "rejeitada")
+        db_origem.commit()
+
+    com_retentativa(db_origem, estornar)
+    print(f"↩️ Transferência {pendente.transferencia_id} estornada: {motivo}")
+
+
+def _registrar_pix_recebido(db_origem: Session, db_destino: Session, pendente: TransferenciaPendente, conta_destino: Conta):
+    """
+    Cópia do PIX no shard de destino (sem conta de origem, que não existe
+    lá), para que o histórico de recebidos da conta seja consultado no
+    próprio shard. Gravada na mesma transação do crédito.
+    """
+    enviado = db_origem.query(TransacaoPix).filter(TransacaoPix.id == pendente.transacao_pix_id).one()
+    db_destino.add(TransacaoPix(
+        chave_origem=enviado.chave_origem,
+        chave_destino=enviado.chave_destino,
+        valor=enviado.valor,
+        descricao=enviado.descricao,
+        status="concluida",
+        data_transacao=enviado.data_transacao,
+        conta_origem_id=None,
+        conta_destino_id=conta_destino.id,
+    ))
+
+
+def concluir_transferencia_remota(
+    db_origem: Session,
+    db_destino: Session,
+    pendente: TransferenciaPendente,
+) -> Optional[Transacao]:
+    """
+    Segunda fase: credita o destino (idempotente pelo id da transferência)
+    e marca o outbox como concluído. Pode ser repetida com segurança. Se a
+    conta de destino não existe ou está inativa, a transferência é estornada.
+    """
+    def creditar_destino() -> Optional[Transacao]:
+        ja_recebida = db_destino.query(TransferenciaRecebida).filter(
+            TransferenciaRecebida.transferencia_id == pendente.transferencia_id
+        ).first()
+        if ja_recebida:
+            return None
+
+        conta_destino = conta_destino_valida(db_destino, pendente.conta_destino_numero)
+
+        lancamento = abrir_lancamento(
+            db_destino, pendente.tipo, pendente.descricao_destino, pendente.transferencia_id
+        )
+        lancar(lancamento, -pendente.valor, conta_sistema=CONTA_TRANSITO)
+        credito = creditar(
+            db_destino,
+            conta_destino,
+            pendente.valor,
+            pendente.tipo,
+            pendente.descricao_destino,
+            lancamento=lancamento,
+        )
+        if pendente.transacao_pix_id is not None:
+            _registrar_pix_recebido(db_origem, db_destino, pendente, conta_destino)
+        db_destino.add(TransferenciaRecebida(
+            transferencia_id=pendente.transferencia_id,
+            conta_destino_numero=pendente.conta_destino_numero,
+        ))
+        db_destino.commit()
+        return credito
+
+    try:
+        # Sem bloquear a conta de destino: conflito de versão refaz o crédito
+        credito = com_retentativa(db_destino, creditar_destino)
+    except DestinoIndisponivel as e:
+        db_destino.rollback()
+        estornar_transferencia_remota(db_origem, pendente, str(e))
+        return None
+
+    pendente.status = "concluida"
+    _atualizar_pix(db_origem, pendente, "concluida")
+    db_origem.commit()
+    return credito
+
+
+def processar_transferencias_pendentes(router: ShardRouter) -> int:
+    """Reaplica a segunda fase das transferências que ficaram pendentes"""
+    concluidas = 0
+    for factory in router.session_factories:
+        db_origem = factory()
+        try:
+            pendentes = db_origem.query(TransferenciaPendente).filter(
+                TransferenciaPendente.status == "pendente"
+            ).order_by(TransferenciaPendente.id).all()
+
+            for pendente in pendentes:
+                destino = router.shard_for(pendente.conta_destino_numero)
+                db_destino = router.session_factories[destino]()
+                try:
+                    concluir_transferencia_remota(db_origem, db_destino, pendente)
+                    concluidas += 1
+                except Exception as e:
+                    # Falha transitória (shard fora do ar, conflito): tentar de novo depois
+                    db_destino.rollback()
+                    db_origem.rollback()
+                    pendente.tentativas += 1
+                    db_origem.commit()
+                    print(
+                        f"❌ Erro ao concluir transferência {pendente.transferencia_id} "
+                        f"(tentativa {pendente.tentativas}): {e}"
+                    )
+                finally:
+                    db_destino.close()
+        finally:
+            db_origem.close()
+    return concluidas
+
+
+async def processar_transferencias_periodicamente(router: ShardRouter, intervalo: float):
+    """Tarefa de fundo que conclui transferências entre shards interrompidas"""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            concluidas = await asyncio.to_thread(processar_transferencias_pendentes, router)
+            if concluidas:
+                print(f"🔁 {concluidas} transferência(s) entre shards concluída(s)")
+        except Exception as e:
+            print(f"❌ Erro ao processar transferências pendentes: {e}")
@@ -0,0 +1,61 @@
+"""
+Paginação por chave (keyset) para listas em ordem cronológica decrescente.
+
+O cursor é a posição (data, id) do último item entregue, codificada em
+base64 para o cliente tratá-la como opaca. A próxima página continua com
+`(data, id) < cursor` e percorre o índice a partir desse ponto, sem OFFSET:
+o custo de uma página não cresce com o número de páginas anteriores.
+
+Listas formadas por mais de uma consulta (ex.: PIX enviados e recebidos)
+são intercaladas com `intercalar`: cada consulta já vem ordenada pelo seu
+índice e limitada ao tamanho da página, e a mescla lê só o necessário.
+"""
+import base64
+import heapq
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import and_, or_
+
+Posicao = Tuple[datetime, int]
+T = TypeVar("T")
+
+
+def codificar_cursor(momento: datetime, item_id: int) -> str:
+    bruto = f"{momento.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Posicao:
+    """Posição do cursor; ValueError se ele não veio de `codificar_cursor`"""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        momento, item_id = bruto.split("|")
+        return datetime.fromisoformat(momento), int(item_id)
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def antes_de(coluna_data, coluna_id, posicao: Optional[Posicao]):
+    """Filtro `(data, id) < posicao`, escrito de forma que o índice seja usado"""
+    if posicao is None:
+        return None
+    momento, item_id = posicao
+    return or_(coluna_data < momento, and_(coluna_data == momento, coluna_id < item_id))
+
+
+def intercalar(fluxos: Iterable[Iterable[T]], chave: Callable[[T], Posicao], limite: int) -> List[T]:
+    """Até `limite` itens dos fluxos (cada um já em ordem decrescente de `chave`), mesclados"""
+    return list(islice(heapq.merge(*fluxos, key=chave, reverse=True), limite))
+
+
+def fatiar_pagina(itens: List[T], limite: int, chave: Callable[[T], Posicao]) -> Tuple[List[T], Optional[str]]:
+    """
+    Recebe até `limite + 1` itens (o extra só indica que há mais) e devolve
+    a página e o cursor da próxima, ou None se esta é a última.
+    """
+    if len(itens) <= limite:
+        return itens, None
+    itens = itens[:limite]
+    return itens, codificar_cursor(*chave(itens[-1]))
@@ -0,0 +1,129 @@
+"""
+Livro razão de partidas dobradas.
+
+Toda movimentação gera um lançamento cujas partidas somam zero: o valor
+que sai de uma conta entra em outra (de cliente ou interna do banco). Os
+registros só são inseridos; `Conta.saldo` é uma projeção em cache que pode
+ser recalculada a partir das partidas e conferida em lote.
+
+Uso:
+    python -m app.services.razao            # apenas verifica
+    python -m app.services.razao --corrigir # regrava os saldos divergentes
+"""
+import argparse
+import uuid
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Conta, Lancamento, Partida, Transacao
+from .faixas import saldo_total
+
+
+def abrir_lancamento(
+    db: Session,
+    tipo: str,
+    descricao: Optional[str] = None,
+    transferencia_id: Optional[str] = None,
+) -> Lancamento:
+    """Novo lançamento (sem commit); as partidas são incluídas com `lancar`"""
+    lancamento = Lancamento(
+        transferencia_id=transferencia_id or uuid.uuid4().hex,
+        tipo=tipo,
+        descricao=descricao,
+    )
+    db.add(lancamento)
+    return lancamento
+
+
+def lancar(
+    lancamento: Lancamento,
+    valor: Decimal,
+    conta: Optional[Conta] = None,
+    conta_sistema: Optional[str] = None,
+    transacao: Optional[Transacao] = None,
+) -> Partida:
+    """Inclui uma partida (crédito se positiva, débito se negativa)"""
+    partida = Partida(
+        valor=valor,
+        conta_id=conta.id if conta is not None else None,
+        conta_sistema=conta_sistema,
+        transacao=transacao,
+    )
+    lancamento.partidas.append(partida)
+    return partida
+
+
+def saldos_do_razao(db: Session) -> Dict[int, Decimal]:
+    """Saldo de cada conta de cliente segundo as partidas"""
+    linhas = db.query(Partida.conta_id, func.sum(Partida.valor)).filter(
+        Partida.conta_id.isnot(None)
+    ).group_by(Partida.conta_id).all()
+    return {conta_id: Decimal(total or 0) for conta_id, total in linhas}
+
+
+def lancamentos_desbalanceados(db: Session) -> List[str]:
+    """Transferências cujas partidas não somam zero"""
+    linhas = db.query(Lancamento.transferencia_id).join(Partida).group_by(
+        Lancamento.transferencia_id
+    ).having(func.sum(Partida.valor) != 0).all()
+    return [transferencia_id for (transferencia_id,) in linhas]
+
+
+def verificar_razao(db: Session, corrigir: bool = False) -> dict:
+    """
+    Confere `Conta.saldo` contra o razão. Com `corrigir`, regrava os saldos
+    divergentes com o valor do razão (o razão é a fonte da verdade).
+    """
+    saldos = saldos_do_razao(db)
+    divergencias = []
+    for conta in db.query(Conta).order_by(Conta.id).all():
+        esperado = saldos.get(conta.id, Decimal("0.00"))
+        atual = Decimal(saldo_total(conta))
+        if atual != esperado:
+            divergencias.append({
+                "conta_numero": conta.numero,
+                "saldo": atual,
+                "razao": esperado,
+            })
+            if corrigir:
+                # A diferença vai para a linha da conta; as faixas ficam como estão
+                conta.saldo += esperado - atual
+
+    if corrigir and divergencias:
+        db.commit()
+
+    return {
+        "divergencias": divergencias,
+        "desbalanceados": lancamentos_desbalanceados(db),
+    }
+
+
+def main():
+    from app.database.config import shard_router
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corrigir", action="store_true", help="Regravar os saldos divergentes")
+    args = parser.parse_args()
+
+    for indice, factory in enumerate(shard_router.session_factories):
+        db = factory()
+        try:
+            resultado = verificar_razao(db, corrigir=args.corrigir)
+        finally:
+            db.close()
+        for divergencia in resultado["divergencias"]:
+            print(
+                f"⚠️ Shard {indice}: conta {divergencia['conta_numero']} "
+                f"saldo {divergencia['saldo']} ≠ razão {divergencia['razao']}"
+            )
+        for transferencia_id in resultado["desbalanceados"]:
+            print(f"❌ Shard {indice}: lançamento {transferencia_id} não soma zero")
+        if not resultado["divergencias"] and not resultado["desbalanceados"]:
+            print(f"✅ Shard {indice}: razão consistente")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Resumos diários das contas (débitos, créditos e quantidades por tipo).
+
+Cada movimentação soma seu valor na linha (conta, dia, tipo, faixa) de
+`resumos_diarios` com um upsert atômico, na mesma transação que grava a
+transação. Os totais de um extrato vêm dos resumos dos dias inteiros do
+período; só os dias das pontas, cobertos em parte, são somados a partir
+das transações já carregadas.
+
+Os dias são dias UTC, como todas as datas gravadas (`created_at` e
+`data_transacao` são UTC sem fuso).
+
+Débito e crédito vêm de `Transacao.natureza`, e não do sinal de `valor`,
+que é sempre positivo.
+
+A conferência recalcula os resumos a partir de `transacoes` em uma única
+consulta agrupada (dias anteriores ao corte de arquivamento ficam de fora):
+
+    python -m app.services.resumos            # apenas verifica
+    python -m app.services.resumos --corrigir # regrava os dias divergentes
+"""
+import argparse
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, delete, func, tuple_
+from sqlalchemy.orm import Session
+
+from app.models import NATUREZA_CREDITO, NATUREZA_DEBITO, ResumoDiario, Transacao, natureza_pelo_saldo
+
+Totais = Tuple[Decimal, Decimal, int, int]
+ZERO = Decimal("0.00")
+
+
+def _insert(db: Session):
+    dialeto = db.get_bind().dialect.name
+    if dialeto == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    elif dialeto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return dialeto, insert
+
+
+def acumular_resumo(db: Session, conta_id: int, momento: datetime, tipo: str, variacao: Decimal, faixa: int = 0):
+    """Soma a movimentação no resumo do dia UTC de `momento` (sem commit)"""
+    debito = variacao < 0
+    valores = {
+        "conta_id": conta_id,
+        "dia": momento.date(),
+        "tipo": tipo,
+        "faixa": faixa,
+        "debitos": -variacao if debito else ZERO,
+        "creditos": ZERO if debito else variacao,
+        "quantidade_debitos": 1 if debito else 0,
+        "quantidade_creditos": 0 if debito else 1,
+    }
+    tabela = ResumoDiario.__table__
+    dialeto, insert = _insert(db)
+    comando = insert(tabela).values(**valores)
+    somas = ("debitos", "creditos", "quantidade_debitos", "quantidade_creditos")
+
+    if dialeto == "mysql":
+        comando = comando.on_duplicate_key_update(
+            {coluna: tabela.c[coluna] + comando.inserted[coluna] for coluna in somas},
+            updated_at=datetime.utcnow(),
+        )
+    else:
+        comando = comando.on_conflict_do_update(
+            index_elements=["conta_id", "dia", "tipo", "faixa"],
+            set_={
+                **{coluna: tabela.c[coluna] + comando.excluded[coluna] for coluna in somas},
+                "updated_at": datetime.utcnow(),
+            },
+        )
+    db.execute(comando)
+
+
+def _eh_debito(transacao) -> bool:
+    natureza = transacao.natureza or natureza_pelo_saldo(transacao.saldo_anterior, transacao.saldo_posterior)
+    return natureza == NATUREZA_DEBITO
+
+
+def _dias_inteiros(inicio: datetime, fim: datetime) -> Tuple[date, date]:
+    """Primeiro e último dia totalmente dentro de [inicio, fim]"""
+    primeiro = inicio.date()
+    if inicio != datetime.combine(primeiro, datetime.min.time()):
+        primeiro += timedelta(days=1)
+    # O dia de `fim` só estaria inteiro se fim fosse a meia-noite seguinte
+    return primeiro, fim.date() - timedelta(days=1)
+
+
+def totais_periodo(
+    db: Session,
+    conta_id: int,
+    inicio: datetime,
+    fim: datetime,
+    tipo: Optional[str],
+    transacoes: Iterable,
+) -> Tuple[Decimal, Decimal]:
+    """
+    (débitos, créditos) da conta no período. `transacoes` são as do
+    extrato, já carregadas: delas só se usam as dos dias das pontas.
+    """
+    debitos, creditos = ZERO, ZERO
+    primeiro, ultimo = _dias_inteiros(inicio, fim)
+
+    if primeiro <= ultimo:
+        consulta = db.query(
+            func.sum(ResumoDiario.debitos), func.sum(ResumoDiario.creditos)
+        ).filter(
+            ResumoDiario.conta_id == conta_id,
+            ResumoDiario.dia >= primeiro,
+            ResumoDiario.dia <= ultimo,
+        )
+        if tipo:
+            consulta = consulta.filter(ResumoDiario.tipo == tipo)
+        soma_debitos, soma_creditos = consulta.one()
+        debitos += Decimal(soma_debitos or 0)
+        creditos += Decimal(soma_creditos or 0)
+
+    for transacao in transacoes:
+        if primeiro <= transacao.created_at.date() <= ultimo:
+            continue
+        if _eh_debito(transacao):
+            debitos += transacao.valor
+        else:
+            creditos += transacao.valor
+
+    return debitos.quantize(ZERO), creditos.quantize(ZERO)
+
+
+def _dia(valor) -> date:
+    # SQLite devolve date() como texto
+    return date.fromisoformat(valor) if isinstance(valor, str) else valor
+
+
+def _totais(debitos, creditos, quantidade_debitos, quantidade_creditos) -> Totais:
+    return (
+        Decimal(debitos or 0).quantize(ZERO),
+        Decimal(creditos or 0).quantize(ZERO),
+        int(quantidade_debitos or 0),
+        int(quantidade_creditos or 0),
+    )
+
+
+def recalcular_resumos(db: Session, desde: Optional[date] = None) -> Dict[Tuple[int, date, str], Totais]:
+    """Resumos calculados a partir das transações, em uma consulta agrupada"""
+    debito = Transacao.natureza == NATUREZA_DEBITO
+    credito = Transacao.natureza == NATUREZA_CREDITO
+    dia = func.date(Transacao.created_at)
+    consulta = db.query(
+        Transacao.conta_id,
+        dia,
+        Transacao.tipo,
+        func.sum(case((debito, Transacao.valor), else_=0)),
+        func.sum(case((credito, Transacao.valor), else_=0)),
+        func.sum(case((debito, 1), else_=0)),
+        func.sum(case((credito, 1), else_=0)),
+    )
+    if desde is not None:
+        consulta = consulta.filter(Transacao.created_at >= datetime.combine(desde, datetime.min.time()))
+    linhas = consulta.group_by(Transacao.conta_id, dia, Transacao.tipo).all()
+    return {(conta_id, _dia(d), tipo): _totais(*somas) for conta_id, d, tipo, *somas in linhas}
+
+
+def resumos_gravados(db: Session, desde: Optional[date] = None) -> Dict[Tuple[int, date, str], Totais]:
+    """Resumos gravados, somando as faixas"""
+    consulta = db.query(
+        ResumoDiario.conta_id,
+        ResumoDiario.dia,
+        ResumoDiario.tipo,
+        func.sum(ResumoDiario.debitos),
+        func.sum(ResumoDiario.creditos),
+        func.sum(ResumoDiario.quantidade_debitos),
+        func.sum(ResumoDiario.quantidade_creditos),
+    )
+    if desde is not None:
+        consulta = consulta.filter(ResumoDiario.dia >= desde)
+    linhas = consulta.group_by(ResumoDiario.conta_id, ResumoDiario.dia, ResumoDiario.tipo).all()
+    return {(conta_id, _dia(d), tipo): _totais(*somas) for conta_id, d, tipo, *somas in linhas}
+
+
+def verificar_resumos(db: Session, desde: Optional[date] = None, corrigir: bool = False) -> dict:
+    """
+    Confere os resumos contra as transações a partir de `desde`. Com
+    `corrigir`, regrava os dias divergentes (as transações são a fonte da
+    verdade).
+    """
+    esperados = recalcular_resumos(db, desde)
+    gravados = resumos_gravados(db, desde)
+    vazio = (ZERO, ZERO, 0, 0)
+
+    divergencias = []
+    for chave in sorted(set(esperados) | set(gravados)):
+        esperado = esperados.get(chave, vazio)
+        gravado = gravados.get(chave, vazio)
+        if esperado != gravado:
+            conta_id, dia, tipo = chave
+            divergencias.append({
+                "conta_id": conta_id,
+                "dia": dia,
+                "tipo": tipo,
+                "resumo": gravado,
+                "transacoes": esperado,
+            })
+
+    if corrigir and divergencias:
+        chaves = [(d["conta_id"], d["dia"], d["tipo"]) for d in divergencias]
+        db.execute(
+            delete(ResumoDiario).where(
+                tuple_(ResumoDiario.conta_id, ResumoDiario.dia, ResumoDiario.tipo).in_(chaves)
+            )
+        )
+        for conta_id, dia, tipo in chaves:
+            debitos, creditos, quantidade_debitos, quantidade_creditos = esperados.get((conta_id, dia, tipo), vazio)
+            if quantidade_debitos or quantidade_creditos:
+                db.add(ResumoDiario(
+                    conta_id=conta_id,
+                    dia=dia,
+                    tipo=tipo,
+                    faixa=0,
+                    debitos=debitos,
+                    creditos=creditos,
+                    quantidade_debitos=quantidade_debitos,
+                    quantidade_creditos=quantidade_creditos,
+                ))
+        db.commit()
+
+    return {"divergencias": divergencias}
+
+
+def main():
+    from app.database.config import shard_router
+    from .arquivo import ler_corte
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corrigir", action="store_true", help="Regravar os dias divergentes")
+    args = parser.parse_args()
+
+    # Dias já arquivados (mesmo que em parte) não têm mais as transações no banco
+    corte = ler_corte()
+    desde = corte.date() + timedelta(days=1) if corte else None
+
+    for indice, factory in enumerate(shard_router.session_factories):
+        db = factory()
+        try:
+            resultado = verificar_resumos(db, desde=desde, corrigir=args.corrigir)
+        finally:
+            db.close()
+        for divergencia in resultado["divergencias"]:
+            print(
+                f"⚠️ Shard {indice}: conta {divergencia['conta_id']} em {divergencia['dia']} "
+                f"({divergencia['tipo']}) resumo {divergencia['resumo']} ≠ transações {divergencia['transacoes']}"
+            )
+        if not resultado["divergencias"]:
+            print(f"✅ Shard {indice}: resumos diários consistentes")
+
+
+if __name__ == "__main__":
+    main()
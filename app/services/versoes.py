@@ -0,0 +1,65 @@
+"""
+Versões das contas para GET condicional (ETag / If-None-Match).
+
+A versão de uma conta é o par (`contas.versao`, soma de `sub_saldos.versao`):
+toda escrita na linha da conta incrementa a primeira parte (é o
+`version_id_col` do mapeamento, ver app.services.concorrencia) e todo
+crédito em faixa incrementa a segunda, sem tocar a linha da conta. As
+rotas leem só esse par, por índice, e respondem 304 sem montar o corpo
+quando o cliente já tem a versão atual.
+"""
+import hashlib
+from typing import List, Optional, Tuple
+
+from fastapi import Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Conta, SubSaldo
+
+Versao = Tuple[str, int, int]
+
+
+def versoes_contas(db: Session, cliente_id: int, conta_numero: Optional[str] = None) -> List[Versao]:
+    """(numero, versao, versao das faixas) das contas ativas do cliente"""
+    consulta = db.query(
+        Conta.numero,
+        Conta.versao,
+        func.coalesce(func.sum(SubSaldo.versao), 0),
+    ).outerjoin(
+        SubSaldo, SubSaldo.conta_id == Conta.id
+    ).filter(
+        Conta.cliente_id == cliente_id,
+        Conta.ativa == True
+    )
+    if conta_numero is not None:
+        consulta = consulta.filter(Conta.numero == conta_numero)
+    return sorted(
+        (numero, versao, int(faixas))
+        for numero, versao, faixas in consulta.group_by(Conta.numero, Conta.versao).all()
+    )
+
+
+def gerar_etag(*partes) -> str:
+    resumo = hashlib.sha1(repr(partes).encode()).hexdigest()[:20]
+    return f'"{resumo}"'
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """Se o ETag atual está entre os enviados em If-None-Match"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparação fraca: W/"x" equivale a "x"
+    enviados = (valor.strip() for valor in if_none_match.split(","))
+    return etag in (valor[2:] if valor.startswith("W/") else valor for valor in enviados)
+
+
+def nao_modificado(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos_cache(etag))
+
+
+def cabecalhos_cache(etag: str) -> dict:
+    # Sempre revalidar: o saldo muda a qualquer momento
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
@@ -0,0 +1,220 @@
+"""
+Arquivos estáticos pré-comprimidos.
+
+O passo de build grava, ao lado de cada arquivo comprimível, as versões
+`.br` (se o pacote brotli estiver instalado) e `.gz` no nível máximo de
+compressão, que seria caro demais fazer a cada requisição:
+
+    python -m app.static frontend/build
+
+`PrecompressedStaticFiles` serve a versão pré-comprimida aceita pelo
+cliente. O arquivo é enviado com a extensão ASGI `http.response.zerocopy`
+(sendfile) quando o servidor a oferece; caso contrário, em blocos.
+
+Em produção a API também serve o build do React (`FRONTEND_BUILD_DIR`):
+`SPAStaticFiles` guarda em cache permanente os assets com hash no nome
+e devolve o index.html para as rotas do SPA.
+"""
+import argparse
+import gzip
+import mimetypes
+import os
+import stat
+from typing import Iterator, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.middleware.compression import TIPOS_COMPRIMIVEIS, brotli, codificacoes_aceitas
+
+EXTENSOES = {"br": ".br", "gzip": ".gz"}
+TAMANHO_MINIMO = 1024
+
+# O build do create-react-app põe o hash do conteúdo no nome de tudo em static/
+PASTA_IMUTAVEL = "static"
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+CACHE_REVALIDAR = "no-cache"
+
+# Caminhos da API que o navegador abre diretamente
+CAMINHOS_API_HTML = ("/docs", "/redoc", "/openapi.json")
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """FileResponse que usa sendfile quando o servidor ASGI suporta"""
+
+    chunk_size = 256 * 1024
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if "http.response.zerocopy" not in scope.get("extensions", {}) or self.send_header_only:
+            await super().__call__(scope, receive, send)
+            return
+
+        with open(self.path, "rb") as arquivo:
+            tamanho = os.fstat(arquivo.fileno()).st_size
+            if self.stat_result is None:
+                self.set_stat_headers(os.fstat(arquivo.fileno()))
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.zerocopy", "file": arquivo, "count": tamanho, "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles que serve `arquivo.br`/`arquivo.gz` quando existem e o cliente aceita"""
+
+    def _precomprimido(self, full_path: str, scope: Scope) -> Optional[Tuple[str, str, os.stat_result]]:
+        aceitas = codificacoes_aceitas(Headers(scope=scope).get("accept-encoding", ""), tuple(EXTENSOES))
+        for codificacao in aceitas:
+            candidato = full_path + EXTENSOES[codificacao]
+            try:
+                resultado = os.stat(candidato)
+            except OSError:
+                continue
+            if stat.S_ISREG(resultado.st_mode):
+                return codificacao, candidato, resultado
+        return None
+
+    def cabecalhos_cache(self, full_path: str) -> dict:
+        return {}
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        headers = {"Vary": "Accept-Encoding", **self.cabecalhos_cache(str(full_path))}
+        media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+        precomprimido = self._precomprimido(str(full_path), scope)
+        if precomprimido:
+            codificacao, full_path, stat_result = precomprimido
+            headers["Content-Encoding"] = codificacao
+
+        response = ZeroCopyFileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+            method=scope["method"],
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class SPAStaticFiles(PrecompressedStaticFiles):
+    """Build do frontend: assets com hash imutáveis, index.html para as rotas do SPA"""
+
+    def cabecalhos_cache(self, full_path: str) -> dict:
+        relativo = os.path.relpath(full_path, self.directory)
+        if relativo.split(os.sep)[0] == PASTA_IMUTAVEL:
+            return {"Cache-Control": CACHE_IMUTAVEL}
+        # index.html, manifest etc.: sempre revalidar para pegar um novo deploy
+        return {"Cache-Control": CACHE_REVALIDAR}
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as e:
+            # Arquivo inexistente com extensão é 404 de verdade; o resto é rota do SPA
+            if e.status_code != 404 or "." in os.path.basename(path):
+                raise
+            return await super().get_response("index.html", scope)
+
+
+class SPANavigationMiddleware:
+    """
+    Entrega o SPA quando o navegador navega (recarregar /contas, abrir um
+    link) para um caminho que também existe na API. Requisições do axios
+    não pedem text/html e seguem para as rotas normalmente.
+    """
+
+    def __init__(self, app: ASGIApp, spa: SPAStaticFiles):
+        self.app = app
+        self.spa = spa
+
+    def _navegacao(self, scope: Scope) -> bool:
+        if scope["method"] not in ("GET", "HEAD"):
+            return False
+        caminho = scope["path"]
+        if caminho.startswith(CAMINHOS_API_HTML) or "." in caminho.rsplit("/", 1)[-1]:
+            return False
+        headers = Headers(scope=scope)
+        if headers.get("sec-fetch-mode") == "navigate":
+            return True
+        return headers.get("accept", "").split(",")[0].strip() == "text/html"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and self._navegacao(scope):
+            await self.spa(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+def criar_frontend(diretorio: Optional[str]) -> Optional[SPAStaticFiles]:
+    """SPAStaticFiles do build, ou None se não configurado/não encontrado"""
+    if not diretorio:
+        return None
+    if not os.path.isfile(os.path.join(diretorio, "index.html")):
+        print(f"⚠️ Build do frontend não encontrado em {diretorio}; servindo apenas a API")
+        return None
+    return SPAStaticFiles(directory=diretorio, html=True)
+
+
+def _comprimiveis(diretorio: str) -> Iterator[str]:
+    for raiz, _, arquivos in os.walk(diretorio):
+        for nome in arquivos:
+            if nome.endswith(tuple(EXTENSOES.values())):
+                continue
+            caminho = os.path.join(raiz, nome)
+            tipo = mimetypes.guess_type(nome)[0]
+            if tipo in TIPOS_COMPRIMIVEIS and os.path.getsize(caminho) >= TAMANHO_MINIMO:
+                yield caminho
+
+
+def _gravar(caminho: str, dados: bytes, original: os.stat_result):
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(dados)
+    # Mesma data do original: os ETags das duas versões mudam juntos
+    os.utime(temporario, (original.st_atime, original.st_mtime))
+    os.replace(temporario, caminho)
+
+
+def precomprimir(diretorio: str) -> int:
+    """Grava as versões .br/.gz dos arquivos comprimíveis; retorna quantos"""
+    total = 0
+    for caminho in _comprimiveis(diretorio):
+        original = os.stat(caminho)
+        with open(caminho, "rb") as arquivo:
+            dados = arquivo.read()
+        comprimido = gzip.compress(dados, compresslevel=9, mtime=0)
+        if len(comprimido) < len(dados):
+            _gravar(caminho + EXTENSOES["gzip"], comprimido, original)
+        if brotli is not None:
+            comprimido = brotli.compress(dados, quality=11)
+            if len(comprimido) < len(dados):
+                _gravar(caminho + EXTENSOES["br"], comprimido, original)
+        total += 1
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("diretorio", help="Diretório do build (ex.: frontend/build)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.diretorio):
+        raise SystemExit(f"❌ Diretório {args.diretorio} não encontrado")
+    total = precomprimir(args.diretorio)
+    formatos = ".br e .gz" if brotli is not None else ".gz (instale brotli para .br)"
+    print(f"✅ {total} arquivo(s) pré-comprimido(s) em {formatos}")
+
+
+if __name__ == "__main__":
+    main()
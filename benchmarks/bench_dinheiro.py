@@ -0,0 +1,155 @@
+"""
+Benchmark da representação de valores monetários.
+
+Compara, com as mesmas linhas de extrato (valor, saldo anterior e
+posterior), a representação antiga e a nova:
+
+- antes:  colunas Numeric(15, 2) e o valor do PIX como texto de centavos;
+- depois: colunas `Dinheiro` (BIGINT de centavos, Decimal no Python).
+
+Mede linhas por segundo em cada etapa do caminho do extrato: gravar as
+linhas, ler e converter os valores, somar os totais no banco (SUM) e no
+Python, e converter o valor de uma transferência PIX para reais.
+
+Por padrão usa SQLite em memória; passe DATABASE_URL para medir em outro
+banco (as tabelas do benchmark são criadas e removidas).
+
+Uso:
+    python benchmarks/bench_dinheiro.py --linhas 10000 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import warnings
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Column, Integer, MetaData, Numeric, String, Table, create_engine, func, select  # noqa: E402
+from sqlalchemy import exc as sa_exc  # noqa: E402
+
+from app.models import Dinheiro, de_centavos  # noqa: E402
+
+# O SQLite não tem DECIMAL nativo; o aviso é justamente parte do problema medido
+warnings.filterwarnings("ignore", category=sa_exc.SAWarning)
+
+
+def tabelas(metadata: MetaData):
+    antes = Table(
+        "bench_dinheiro_antes", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("valor", Numeric(15, 2), nullable=False),
+        Column("saldo_anterior", Numeric(15, 2), nullable=False),
+        Column("saldo_posterior", Numeric(15, 2), nullable=False),
+        Column("valor_pix", String(20), nullable=False),
+    )
+    depois = Table(
+        "bench_dinheiro_depois", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("valor", Dinheiro(), nullable=False),
+        Column("saldo_anterior", Dinheiro(), nullable=False),
+        Column("saldo_posterior", Dinheiro(), nullable=False),
+        Column("valor_pix", Dinheiro(), nullable=False),
+    )
+    return antes, depois
+
+
+def gerar_linhas(quantidade: int) -> list:
+    aleatorio = random.Random(42)
+    saldo = Decimal("1000.00")
+    linhas = []
+    for indice in range(1, quantidade + 1):
+        valor = Decimal(aleatorio.randint(1, 500_00)).scaleb(-2)
+        debito = aleatorio.random() < 0.5 and saldo >= valor
+        anterior, saldo = saldo, saldo - valor if debito else saldo + valor
+        linhas.append({
+            "id": indice,
+            "valor": valor,
+            "saldo_anterior": anterior,
+            "saldo_posterior": saldo,
+            "valor_pix": valor,
+        })
+    return linhas
+
+
+def cronometrar(funcao) -> tuple:
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+
+def medir(engine, tabela, linhas: list, antes: bool) -> dict:
+    # Na representação antiga o PIX guardava os centavos como texto
+    parametros = [
+        {**linha, "valor_pix": str(int(linha["valor_pix"] * 100))} if antes else linha
+        for linha in linhas
+    ]
+    tempos = {}
+    with engine.begin() as conn:
+        tempos["gravar"], _ = cronometrar(lambda: conn.execute(tabela.insert(), parametros))
+
+    with engine.connect() as conn:
+        tempos["ler"], lidas = cronometrar(
+            lambda: conn.execute(select(tabela.c.valor, tabela.c.saldo_anterior, tabela.c.saldo_posterior)).all()
+        )
+
+        def totais_python():
+            debitos = creditos = Decimal("0.00")
+            for valor, anterior, posterior in lidas:
+                if posterior < anterior:
+                    debitos += valor
+                else:
+                    creditos += valor
+            return debitos, creditos
+
+        tempos["totais py"], totais = cronometrar(totais_python)
+        tempos["SUM"], soma = cronometrar(lambda: conn.execute(select(func.sum(tabela.c.valor))).scalar())
+
+        textos = [linha["valor_pix"] for linha in conn.execute(select(tabela.c.valor_pix)).mappings()]
+        if antes:
+            tempos["pix"], _ = cronometrar(lambda: [Decimal(valor) / 100 for valor in textos])
+        else:
+            # Já chega em reais; o equivalente é a conversão feita pelo tipo
+            centavos = [int(valor * 100) for valor in textos]
+            tempos["pix"], _ = cronometrar(lambda: [de_centavos(valor) for valor in centavos])
+
+    return {"tempos": tempos, "totais": totais, "soma": Decimal(soma).quantize(Decimal("0.01"))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ.get("DATABASE_URL", "sqlite://"))
+    etapas = ("gravar", "ler", "totais py", "SUM", "pix")
+    print(f"{'linhas':>8} {'repr.':>7} " + " ".join(f"{etapa + ' l/s':>14}" for etapa in etapas))
+
+    for quantidade in args.linhas:
+        linhas = gerar_linhas(quantidade)
+        metadata = MetaData()
+        antes, depois = tabelas(metadata)
+        metadata.create_all(engine)
+        try:
+            resultados = {
+                "antes": medir(engine, antes, linhas, antes=True),
+                "depois": medir(engine, depois, linhas, antes=False),
+            }
+        finally:
+            metadata.drop_all(engine)
+
+        for nome, resultado in resultados.items():
+            print(
+                f"{quantidade:>8} {nome:>7} "
+                + " ".join(f"{quantidade / max(resultado['tempos'][etapa], 1e-9):>14,.0f}" for etapa in etapas)
+            )
+        if resultados["antes"]["totais"] != resultados["depois"]["totais"]:
+            print("❌ Totais diferentes entre as representações")
+        if resultados["antes"]["soma"] != resultados["depois"]["soma"]:
+            print(f"⚠️ SUM difere: {resultados['antes']['soma']} (Numeric) ≠ {resultados['depois']['soma']} (centavos)")
+
+
+if __name__ == "__main__":
+    main()
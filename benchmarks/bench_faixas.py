@@ -0,0 +1,120 @@
+"""
+Benchmark de créditos PIX concorrentes em uma única conta.
+
+Várias threads creditam a mesma conta de destino (como um lojista
+recebendo PIX em uma chave), cada uma com sua própria sessão e commit por
+crédito, e o benchmark mede créditos por segundo variando o número de
+faixas de saldo. Com 1 faixa todos os créditos disputam a mesma linha:
+a conta é versionada, então cada crédito é refeito em conflito (como na
+API, com `com_retentativa`) e os que esgotam as tentativas são contados
+na coluna "conflitos", sem entrar na taxa.
+
+Use um banco com bloqueio por linha (MySQL); no SQLite o banco inteiro é
+bloqueado a cada escrita e as faixas não fazem diferença.
+
+Uso:
+    DATABASE_URL=mysql+pymysql://... python benchmarks/bench_faixas.py --faixas 1 4 16 --threads 32
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.orm.exc import StaleDataError  # noqa: E402
+
+from app.models import Base, Cliente, Conta  # noqa: E402
+from app.services import com_retentativa, configurar_faixas, creditar  # noqa: E402
+
+
+def preparar(SessionLocal) -> str:
+    db = SessionLocal()
+    try:
+        cliente = Cliente(
+            cpf=uuid.uuid4().hex[:11],
+            nome="Lojista Benchmark",
+            data_nascimento=date(1990, 1, 1),
+            endereco="Rua Benchmark, 1",
+            senha_hash="-",
+            ativo=True,
+        )
+        db.add(cliente)
+        db.flush()
+        numero = uuid.uuid4().hex[:10]
+        db.add(Conta(numero=numero, agencia="0001", saldo=Decimal("0.00"), tipo_conta="poupanca", cliente_id=cliente.id))
+        db.commit()
+        return numero
+    finally:
+        db.close()
+
+
+def medir(SessionLocal, numero: str, faixas: int, threads: int, duracao: float) -> tuple:
+    db = SessionLocal()
+    try:
+        configurar_faixas(db, db.query(Conta).filter(Conta.numero == numero).one(), faixas)
+    finally:
+        db.close()
+
+    fim = time.perf_counter() + duracao
+    contagens = [0] * threads
+    conflitos = [0] * threads
+
+    def trabalhador(indice: int):
+        sessao = SessionLocal()
+
+        def creditar_uma_vez():
+            conta = sessao.query(Conta).filter(Conta.numero == numero).one()
+            creditar(sessao, conta, Decimal("1.00"), "pix", "PIX benchmark")
+            sessao.commit()
+
+        try:
+            while time.perf_counter() < fim:
+                try:
+                    com_retentativa(sessao, creditar_uma_vez)
+                    contagens[indice] += 1
+                except StaleDataError:
+                    # Tentativas esgotadas (a API responderia 409)
+                    conflitos[indice] += 1
+        finally:
+            sessao.close()
+
+    trabalhadores = [threading.Thread(target=trabalhador, args=(i,)) for i in range(threads)]
+    inicio = time.perf_counter()
+    for trabalhador_thread in trabalhadores:
+        trabalhador_thread.start()
+    for trabalhador_thread in trabalhadores:
+        trabalhador_thread.join()
+    return sum(contagens) / (time.perf_counter() - inicio), sum(conflitos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faixas", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--duracao", type=float, default=10.0, help="Segundos por rodada")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL", "sqlite:///./bench_faixas.db")
+    engine = create_engine(url, pool_size=args.threads, max_overflow=0) if not url.startswith("sqlite") else \
+        create_engine(url, connect_args={"check_same_thread": False, "timeout": 60})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    numero = preparar(SessionLocal)
+
+    base = None
+    print(f"{'faixas':>8} {'créditos/s':>12} {'escala':>8} {'conflitos':>10}")
+    for faixas in args.faixas:
+        taxa, conflitos = medir(SessionLocal, numero, faixas, args.threads, args.duracao)
+        base = base or taxa
+        print(f"{faixas:>8} {taxa:>12.0f} {taxa / base:>7.2f}x {conflitos:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark do fan-out de eventos para streams SSE.
+
+Abre milhares de streams ociosos (`eventos_sse`, o mesmo gerador da rota
+/stream/contas/{numero}), cada um em sua própria tarefa e conta, mais
+alguns streams na mesma conta "quente". Em seguida publica eventos na conta
+quente e mede:
+
+- memória por stream ocioso (tracemalloc);
+- custo de `broker.publicar` com milhares de assinantes em outros tópicos;
+- latência entre a publicação e o envio do evento em cada stream quente.
+
+Uso:
+    python benchmarks/bench_stream.py --ociosos 1000 10000 --quentes 100 --eventos 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.routes.stream import eventos_sse  # noqa: E402
+from app.services.eventos import broker, topico_conta  # noqa: E402
+
+CONTA_QUENTE = "9999999999"
+
+
+async def consumir(stream, latencias: list, publicados: dict):
+    async for bloco in stream:
+        if bloco.startswith("id: "):
+            evento_id = int(bloco[4:bloco.index("\n")])
+            latencias.append(time.perf_counter() - publicados[evento_id])
+
+
+async def abrir(quantidade: int, conta, latencias: list, publicados: dict, heartbeat: float) -> list:
+    tarefas = []
+    for indice in range(quantidade):
+        numero = conta or f"{indice:010d}"
+        stream = eventos_sse(topico_conta(numero), {"conta_numero": numero, "saldo": "0.00"}, heartbeat)
+        tarefas.append(asyncio.create_task(consumir(stream, latencias, publicados)))
+    # Deixar cada stream enviar o saldo inicial e ficar ocioso na fila
+    await asyncio.sleep(0.5)
+    return tarefas
+
+
+async def rodada(ociosos: int, quentes: int, eventos: int, heartbeat: float):
+    broker.clear()
+    latencias, publicados = [], {}
+
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    tarefas = await abrir(ociosos, None, latencias, publicados, heartbeat)
+    memoria = (tracemalloc.get_traced_memory()[0] - antes) / max(ociosos, 1)
+    tracemalloc.stop()
+
+    tarefas += await abrir(quentes, CONTA_QUENTE, latencias, publicados, heartbeat)
+
+    custo_publicar = []
+    topico = topico_conta(CONTA_QUENTE)
+    for evento_id in range(1, eventos + 1):
+        mensagem = {"id": evento_id, "conta_numero": CONTA_QUENTE, "delta": "1.00", "saldo": f"{evento_id}.00"}
+        inicio = time.perf_counter()
+        publicados[evento_id] = inicio
+        broker.publicar(topico, mensagem)
+        custo_publicar.append(time.perf_counter() - inicio)
+        # Um evento a cada ~1ms, como um relay sob carga
+        await asyncio.sleep(0.001)
+
+    esperado = quentes * eventos
+    prazo = time.perf_counter() + 10
+    while len(latencias) < esperado and time.perf_counter() < prazo:
+        await asyncio.sleep(0.01)
+
+    for tarefa in tarefas:
+        tarefa.cancel()
+    await asyncio.gather(*tarefas, return_exceptions=True)
+
+    latencias.sort()
+    p99 = latencias[int(len(latencias) * 0.99) - 1] if latencias else float("nan")
+    print(
+        f"{ociosos:>8} {memoria / 1024:>9.1f} "
+        f"{statistics.mean(custo_publicar) * 1e6:>12.1f} "
+        f"{statistics.median(latencias) * 1e3 if latencias else float('nan'):>9.2f} "
+        f"{p99 * 1e3:>9.2f} {len(latencias):>9}/{esperado}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ociosos", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--quentes", type=int, default=100, help="Streams da conta que recebe os eventos")
+    parser.add_argument("--eventos", type=int, default=200)
+    parser.add_argument("--heartbeat", type=float, default=15.0)
+    args = parser.parse_args()
+
+    print(f"{'ociosos':>8} {'KiB/strm':>9} {'publicar µs':>12} {'p50 ms':>9} {'p99 ms':>9} {'entregues':>9}")
+    for ociosos in args.ociosos:
+        asyncio.run(rodada(ociosos, args.quentes, args.eventos, args.heartbeat))
+
+
+if __name__ == "__main__":
+    main()
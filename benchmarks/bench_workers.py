@@ -0,0 +1,106 @@
+"""
+Benchmark de escalabilidade do servidor por número de workers.
+
+Sobe `python -m app.server` com 1, 2, 4... workers e mede requisições por
+segundo em um endpoint sem acesso ao banco, usando vários processos
+clientes para não limitar a medição pelo gerador de carga.
+
+Uso:
+    python benchmarks/bench_workers.py --workers 1 2 4 --duracao 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def aguardar_servidor(url: str, timeout: float = 30.0):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Servidor não respondeu a tempo")
+
+
+async def _gerar_carga(url: str, duracao: float, conexoes: int) -> int:
+    fim = time.perf_counter() + duracao
+    total = 0
+
+    async def conexao(cliente: httpx.AsyncClient):
+        nonlocal total
+        while time.perf_counter() < fim:
+            resposta = await cliente.get(url)
+            if resposta.status_code == 200:
+                total += 1
+
+    limites = httpx.Limits(max_connections=conexoes, max_keepalive_connections=conexoes)
+    async with httpx.AsyncClient(limits=limites) as cliente:
+        await asyncio.gather(*(conexao(cliente) for _ in range(conexoes)))
+    return total
+
+
+def processo_cliente(url: str, duracao: float, conexoes: int, fila):
+    fila.put(asyncio.run(_gerar_carga(url, duracao, conexoes)))
+
+
+def medir(workers: int, porta: int, duracao: float, clientes: int, conexoes: int, caminho: str) -> float:
+    env = dict(
+        os.environ,
+        SERVER_WORKERS=str(workers),
+        SERVER_PORT=str(porta),
+        SERVER_HOST="127.0.0.1",
+        LOG_LEVEL="warning",
+    )
+    env.setdefault("DATABASE_URL", "sqlite:///./bench_workers.db")
+    servidor = subprocess.Popen([sys.executable, "-m", "app.server"], cwd=RAIZ, env=env)
+    url = f"http://127.0.0.1:{porta}{caminho}"
+    try:
+        aguardar_servidor(url)
+        fila = multiprocessing.Queue()
+        processos = [
+            multiprocessing.Process(target=processo_cliente, args=(url, duracao, conexoes, fila))
+            for _ in range(clientes)
+        ]
+        for processo in processos:
+            processo.start()
+        total = sum(fila.get() for _ in processos)
+        for processo in processos:
+            processo.join()
+        return total / duracao
+    finally:
+        # SIGTERM: os workers concluem as requisições em andamento e encerram
+        servidor.terminate()
+        servidor.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duracao", type=float, default=10.0, help="Segundos de carga por rodada")
+    parser.add_argument("--clientes", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--conexoes", type=int, default=32, help="Conexões por processo cliente")
+    parser.add_argument("--caminho", default="/health")
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+
+    base = None
+    print(f"{'workers':>8} {'req/s':>12} {'escala':>8}")
+    for workers in args.workers:
+        rps = medir(workers, args.porta, args.duracao, args.clientes, args.conexoes, args.caminho)
+        base = base or rps
+        print(f"{workers:>8} {rps:>12.0f} {rps / base:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
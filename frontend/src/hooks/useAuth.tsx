@@ -31,6 +31,9 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
       
       // Salvar token
       localStorage.setItem('token', authResponse.access_token);
+      if (authResponse.refresh_token) {
+        localStorage.setItem('refresh_token', authResponse.refresh_token);
+      }
       setToken(authResponse.access_token);
 
       // Buscar dados do usuário
@@ -94,6 +97,7 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
     } finally {
       // Limpar dados locais
       localStorage.removeItem('token');
+      localStorage.removeItem('refresh_token');
       localStorage.removeItem('user');
       setToken(null);
       setUser(null);
@@ -0,0 +1,76 @@
+import { useEffect, useRef } from 'react';
+import { Transacao } from '../types';
+import { apiService } from '../services/api';
+
+export interface EventoConta {
+  id: number;
+  conta_numero: string;
+  delta: string;
+  saldo: string;
+  transacao: Transacao | null;
+}
+
+interface ContaStreamHandlers {
+  onSaldo?: (saldo: number) => void;
+  onTransacao?: (evento: EventoConta) => void;
+}
+
+/**
+ * Assina o stream SSE da conta (/stream/contas/{numero}).
+ * Cada conexão usa um ticket novo: se a conexão cair ou o servidor encerrar
+ * a sessão, um novo ticket é pedido (com o token de acesso atual) antes de reconectar.
+ */
+export const useContaStream = (contaNumero: string | undefined, handlers: ContaStreamHandlers) => {
+  // Manter os handlers mais recentes sem reabrir a conexão a cada render
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    if (!contaNumero || typeof EventSource === 'undefined') return;
+
+    let source: EventSource | null = null;
+    let reconexao: ReturnType<typeof setTimeout> | undefined;
+    let ativo = true;
+
+    const reconectar = () => {
+      source?.close();
+      if (ativo) reconexao = setTimeout(conectar, 3000);
+    };
+
+    const conectar = async () => {
+      let url: string;
+      try {
+        url = await apiService.urlStreamConta(contaNumero);
+      } catch {
+        // Sem sessão válida (logout ou refresh negado): não insistir
+        return;
+      }
+      if (!ativo) return;
+
+      source = new EventSource(url);
+
+      source.addEventListener('saldo', (event) => {
+        const dados = JSON.parse((event as MessageEvent).data);
+        handlersRef.current.onSaldo?.(Number(dados.saldo));
+      });
+
+      source.addEventListener('transacao', (event) => {
+        const evento: EventoConta = JSON.parse((event as MessageEvent).data);
+        handlersRef.current.onSaldo?.(Number(evento.saldo));
+        handlersRef.current.onTransacao?.(evento);
+      });
+
+      // O servidor encerra o stream quando o token de acesso expira ou é revogado
+      source.addEventListener('encerrado', reconectar);
+      source.onerror = reconectar;
+    };
+
+    conectar();
+
+    return () => {
+      ativo = false;
+      clearTimeout(reconexao);
+      source?.close();
+    };
+  }, [contaNumero]);
+};
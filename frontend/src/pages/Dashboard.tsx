@@ -15,6 +15,7 @@ import { theme, Button, Card } from '../styles/GlobalStyles';
 import { useAuth } from '../hooks/useAuth';
 import { useSelectedAccount } from '../hooks/useSelectedAccount';
 import { useToast } from '../hooks/useNotification';
+import { useContaStream } from '../hooks/useContaStream';
 import { apiService } from '../services/api';
 import { Conta, Transacao } from '../types';
 import { formatCurrency, formatDateTime, formatAccountNumber } from '../utils';
@@ -329,6 +330,7 @@ const Dashboard: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [showBalance, setShowBalance] = useState(true);
   const [monthlyTransactions, setMonthlyTransactions] = useState(0);
+  const [saldoAoVivo, setSaldoAoVivo] = useState<number | null>(null);
   const { user } = useAuth();
   const { selectedAccount, accounts } = useSelectedAccount();
   const { error: showError } = useToast();
@@ -365,6 +367,22 @@ const Dashboard: React.FC = () => {
     }
   }, [selectedAccount, showError]);
 
+  // Saldo e movimentações em tempo real, sem recarregar o extrato
+  useEffect(() => {
+    setSaldoAoVivo(null);
+  }, [selectedAccount?.numero]);
+
+  useContaStream(selectedAccount?.numero, {
+    onSaldo: setSaldoAoVivo,
+    onTransacao: ({ transacao }) => {
+      if (!transacao) return;
+      setRecentTransactions(anteriores => [transacao, ...anteriores.filter(t => t.id !== transacao.id)].slice(0, 5));
+      setMonthlyTransactions(total => total + 1);
+    },
+  });
+
+  const saldoAtual = saldoAoVivo ?? selectedAccount?.saldo ?? 0;
+
   useEffect(() => {
     if (selectedAccount) {
       loadDashboardData();
@@ -414,7 +432,7 @@ const Dashboard: React.FC = () => {
           <StatContent>
             <StatLabel>Saldo Total</StatLabel>
             <StatValue>
-              {showBalance ? formatCurrency(selectedAccount?.saldo || 0) : '••••••'}
+              {showBalance ? formatCurrency(saldoAtual) : '••••••'}
             </StatValue>
           </StatContent>
         </StatCard>
@@ -454,7 +472,7 @@ const Dashboard: React.FC = () => {
                 <Balance>
                   <h3>Saldo Disponível</h3>
                   <p>
-                    {showBalance ? formatCurrency(selectedAccount.saldo) : '••••••'}
+                    {showBalance ? formatCurrency(saldoAtual) : '••••••'}
                   </p>
                 </Balance>
                 
@@ -489,7 +507,7 @@ const Dashboard: React.FC = () => {
                 </TransactionDetails>
                 
                 <TransactionAmount type={transacao.tipo}>
-                  {transacao.tipo === 'deposito' ? '+' : '-'}
+                  {(transacao.natureza ? transacao.natureza === 'credito' : transacao.tipo === 'deposito') ? '+' : '-'}
                   {formatCurrency(transacao.valor)}
                 </TransactionAmount>
               </TransactionItem>
@@ -485,13 +485,23 @@ const Pix: React.FC = () => {
     
     try {
       setLoading(true);
-      await apiService.realizarTransferenciaPix(selectedAccount.numero, {
+      let pix = await apiService.realizarTransferenciaPix(selectedAccount.numero, {
         chave_destino: validationData.chave_destino,
         valor: validationData.valor,
         descricao: transferData.descricao
       });
       
-      console.log('Transferência PIX realizada com sucesso!');
+      // A liquidação é assíncrona: acompanhar até sair de "processando"
+      for (let tentativa = 0; pix.status === 'processando' && tentativa < 20; tentativa++) {
+        await new Promise((resolve) => setTimeout(resolve, 500));
+        pix = await apiService.consultarTransferenciaPix(pix.id, selectedAccount.numero);
+      }
+      
+      if (pix.status === 'rejeitada') {
+        console.error('Transferência PIX rejeitada: saldo insuficiente');
+      } else {
+        console.log(`Transferência PIX ${pix.status === 'concluida' ? 'realizada com sucesso' : 'em processamento'}!`);
+      }
       setShowConfirmation(false);
       setValidationData(null);
       resetTransfer();
@@ -7,6 +7,7 @@ import { Calendar, Filter, Download, ArrowUpCircle, ArrowDownCircle, ArrowRightL
 import { useAuth } from '../hooks/useAuth';
 import { useSelectedAccount } from '../hooks/useSelectedAccount';
 import { useNotification } from '../hooks/useNotification';
+import { useContaStream } from '../hooks/useContaStream';
 import { apiService } from '../services/api';
 import { formatCurrency, formatDate } from '../utils';
 import { Conta } from '../types';
@@ -261,6 +262,7 @@ interface Transaction {
   descricao?: string;
   saldo_anterior: number;
   saldo_posterior: number;
+  natureza?: 'debito' | 'credito';
   conta_id: number;
 }
 
@@ -284,6 +286,11 @@ const filterSchema: yup.ObjectSchema<FilterForm> = yup.object().shape({
 
 // Função para determinar o sinal da transação
 const getTransactionSign = (transaction: Transaction): string => {
+  // A API informa o sentido da movimentação
+  if (transaction.natureza) {
+    return transaction.natureza === 'debito' ? '-' : '+';
+  }
+  
   // Para saques, sempre negativo
   if (transaction.tipo === 'saque') {
     return '-';
@@ -355,6 +362,11 @@ export const Statement: React.FC = () => {
 
 
 
+  // Atualizar o extrato quando chegar uma movimentação da conta filtrada
+  useContaStream(watchedContaId || undefined, {
+    onTransacao: () => loadTransactions(filterForm.getValues(), false),
+  });
+
   const loadTransactions = async (filters?: FilterForm, showLoading: boolean = true) => {
     try {
       if (showLoading) {
@@ -25,11 +25,14 @@ import {
 
 class ApiService {
   private api: AxiosInstance;
-  private baseURL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+  // Vazio quando o build é servido pela própria API (mesma origem)
+  private baseURL = process.env.REACT_APP_API_URL ?? 'http://localhost:8000';
 
   constructor() {
     this.api = axios.create({
       baseURL: this.baseURL,
+      // Envia o cookie de última escrita (leituras logo após gravar vão ao primário)
+      withCredentials: true,
       headers: {
         'Content-Type': 'application/json',
       },
@@ -52,10 +55,32 @@ class ApiService {
     // Interceptor para tratar respostas e erros
     this.api.interceptors.response.use(
       (response) => response,
-      (error) => {
+      async (error) => {
+        const originalRequest = error.config;
+        const refreshToken = localStorage.getItem('refresh_token');
+
+        // Token expirado: tentar renovar uma única vez com o refresh token
+        if (
+          error.response?.status === 401 &&
+          refreshToken &&
+          originalRequest &&
+          !originalRequest._retry &&
+          !originalRequest.url?.startsWith('/auth/')
+        ) {
+          originalRequest._retry = true;
+          try {
+            const authResponse = await this.refresh(refreshToken);
+            originalRequest.headers.Authorization = `Bearer ${authResponse.access_token}`;
+            return this.api(originalRequest);
+          } catch {
+            // Refresh inválido: seguir para o logout abaixo
+          }
+        }
+
         if (error.response?.status === 401) {
           // Token expirado ou inválido
           localStorage.removeItem('token');
+          localStorage.removeItem('refresh_token');
           localStorage.removeItem('user');
           window.location.href = '/login';
         }
@@ -64,6 +89,27 @@ class ApiService {
     );
   }
 
+  private refreshPromise: Promise<AuthResponse> | null = null;
+
+  // Renova o token de acesso; requisições simultâneas compartilham a mesma renovação
+  async refresh(refreshToken: string): Promise<AuthResponse> {
+    if (!this.refreshPromise) {
+      this.refreshPromise = axios
+        .post<AuthResponse>(`${this.baseURL}/auth/refresh`, { refresh_token: refreshToken })
+        .then((response) => {
+          localStorage.setItem('token', response.data.access_token);
+          if (response.data.refresh_token) {
+            localStorage.setItem('refresh_token', response.data.refresh_token);
+          }
+          return response.data;
+        })
+        .finally(() => {
+          this.refreshPromise = null;
+        });
+    }
+    return this.refreshPromise;
+  }
+
   // Métodos de autenticação
   async login(data: LoginRequest): Promise<AuthResponse> {
     const loginData = {
@@ -86,7 +132,8 @@ class ApiService {
   }
 
   async logout(): Promise<void> {
-    await this.api.post('/auth/logout');
+    const refreshToken = localStorage.getItem('refresh_token');
+    await this.api.post('/auth/logout', refreshToken ? { refresh_token: refreshToken } : undefined);
   }
 
   async getCurrentUser(): Promise<User> {
@@ -172,6 +219,19 @@ class ApiService {
     return response.data;
   }
 
+  async consultarTransferenciaPix(id: number, contaNumero: string): Promise<PixTransferenciaResponse> {
+    const response: AxiosResponse<PixTransferenciaResponse> = await this.api.get(`/pix/transferencia/${id}`, {
+      params: { conta_numero: contaNumero }
+    });
+    return response.data;
+  }
+
+  // Stream SSE da conta (EventSource não envia cabeçalhos: ticket de curta duração na query)
+  async urlStreamConta(contaNumero: string): Promise<string> {
+    const response: AxiosResponse<{ ticket: string }> = await this.api.post(`/stream/contas/${contaNumero}/ticket`);
+    return `${this.baseURL}/stream/contas/${contaNumero}?ticket=${encodeURIComponent(response.data.ticket)}`;
+  }
+
   // Métodos de configurações
   async updateProfile(data: any): Promise<User> {
     const response: AxiosResponse<User> = await this.api.put('/auth/profile', data);
@@ -30,6 +30,9 @@ export interface RegisterBackendRequest {
 export interface AuthResponse {
   access_token: string;
   token_type: string;
+  expires_in?: number;
+  refresh_token?: string;
+  refresh_expires_in?: number;
 }
 
 export interface User {
@@ -77,6 +80,7 @@ export interface Transacao {
   descricao?: string;
   saldo_anterior: number;
   saldo_posterior: number;
+  natureza?: 'debito' | 'credito';
   conta_id: number;
   created_at: string;
 }
@@ -0,0 +1,54 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.database.config import DATABASE_URL
+from app.models import Base
+
+config = context.config
+
+# Quem chama pela API (ex.: o startup da aplicação) pode manter o próprio logging
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Gerar o SQL das migrações sem conectar ao banco"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url") or DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Aplicar as migrações no banco configurado"""
+    # Permite reutilizar uma conexão existente (ex.: testes)
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    connectable = create_engine(
+        config.get_main_option("sqlalchemy.url") or DATABASE_URL,
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,154 @@
+"""schema inicial
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _colunas_base():
+    return [
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "clientes",
+        sa.Column("cpf", sa.String(11), nullable=False),
+        sa.Column("nome", sa.String(100), nullable=False),
+        sa.Column("data_nascimento", sa.Date(), nullable=False),
+        sa.Column("endereco", sa.String(200), nullable=False),
+        sa.Column("senha_hash", sa.String(255), nullable=False),
+        sa.Column("ativo", sa.Boolean(), nullable=False),
+        *_colunas_base(),
+    )
+    op.create_index("ix_clientes_id", "clientes", ["id"])
+    op.create_index("ix_clientes_cpf", "clientes", ["cpf"], unique=True)
+
+    op.create_table(
+        "contas",
+        sa.Column("numero", sa.String(20), nullable=False),
+        sa.Column("agencia", sa.String(10), nullable=False),
+        sa.Column("saldo", sa.Numeric(15, 2), nullable=False),
+        sa.Column("tipo_conta", sa.String(20), nullable=False),
+        sa.Column("ativa", sa.Boolean(), nullable=False),
+        sa.Column("cliente_id", sa.Integer(), sa.ForeignKey("clientes.id"), nullable=False),
+        *_colunas_base(),
+    )
+    op.create_index("ix_contas_id", "contas", ["id"])
+    op.create_index("ix_contas_numero", "contas", ["numero"], unique=True)
+
+    op.create_table(
+        "contas_corrente",
+        sa.Column("id", sa.Integer(), sa.ForeignKey("contas.id"), primary_key=True),
+        sa.Column("limite", sa.Numeric(10, 2), nullable=False),
+        sa.Column("limite_saques", sa.Integer(), nullable=False),
+        sa.Column("saques_realizados", sa.Integer(), nullable=False),
+    )
+
+    op.create_table(
+        "transacoes",
+        sa.Column("tipo", sa.String(20), nullable=False),
+        sa.Column("valor", sa.Numeric(15, 2), nullable=False),
+        sa.Column("descricao", sa.Text(), nullable=True),
+        sa.Column("saldo_anterior", sa.Numeric(15, 2), nullable=False),
+        sa.Column("saldo_posterior", sa.Numeric(15, 2), nullable=False),
+        sa.Column("conta_id", sa.Integer(), sa.ForeignKey("contas.id"), nullable=False),
+        *_colunas_base(),
+    )
+    op.create_index("ix_transacoes_id", "transacoes", ["id"])
+
+    op.create_table(
+        "saques",
+        sa.Column("id", sa.Integer(), sa.ForeignKey("transacoes.id"), primary_key=True),
+        sa.Column("taxa", sa.Numeric(5, 2), nullable=False),
+    )
+
+    op.create_table(
+        "depositos",
+        sa.Column("id", sa.Integer(), sa.ForeignKey("transacoes.id"), primary_key=True),
+        sa.Column("origem", sa.String(50), nullable=True),
+    )
+
+    op.create_table(
+        "chaves_pix",
+        sa.Column("chave", sa.String(77), nullable=False),
+        sa.Column(
+            "tipo",
+            sa.Enum("CPF", "CNPJ", "EMAIL", "TELEFONE", "ALEATORIA", name="tipochavepix"),
+            nullable=False,
+        ),
+        sa.Column("ativa", sa.Boolean(), nullable=False),
+        sa.Column("data_criacao", sa.DateTime(), nullable=False),
+        sa.Column("conta_id", sa.Integer(), sa.ForeignKey("contas.id"), nullable=False),
+        *_colunas_base(),
+    )
+    op.create_index("ix_chaves_pix_id", "chaves_pix", ["id"])
+    op.create_index("ix_chaves_pix_chave", "chaves_pix", ["chave"], unique=True)
+
+    op.create_table(
+        "transacoes_pix",
+        sa.Column("chave_origem", sa.String(77), nullable=False),
+        sa.Column("chave_destino", sa.String(77), nullable=False),
+        sa.Column("valor", sa.String(20), nullable=False),
+        sa.Column("descricao", sa.String(200), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("data_transacao", sa.DateTime(), nullable=False),
+        sa.Column("conta_origem_id", sa.Integer(), sa.ForeignKey("contas.id"), nullable=False),
+        sa.Column("conta_destino_id", sa.Integer(), sa.ForeignKey("contas.id"), nullable=True),
+        *_colunas_base(),
+    )
+    op.create_index("ix_transacoes_pix_id", "transacoes_pix", ["id"])
+
+    op.create_table(
+        "tokens_revogados",
+        sa.Column("jti", sa.String(36), nullable=False),
+        sa.Column("expira_em", sa.DateTime(), nullable=False),
+        *_colunas_base(),
+    )
+    op.create_index("ix_tokens_revogados_id", "tokens_revogados", ["id"])
+    op.create_index("ix_tokens_revogados_jti", "tokens_revogados", ["jti"], unique=True)
+    op.create_index("ix_tokens_revogados_expira_em", "tokens_revogados", ["expira_em"])
+
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("token_hash", sa.String(64), nullable=False),
+        sa.Column("familia", sa.String(32), nullable=False),
+        sa.Column("expira_em", sa.DateTime(), nullable=False),
+        sa.Column("usado", sa.Boolean(), nullable=False),
+        sa.Column("revogado", sa.Boolean(), nullable=False),
+        sa.Column(
+            "cliente_id",
+            sa.Integer(),
+            sa.ForeignKey("clientes.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        *_colunas_base(),
+    )
+    op.create_index("ix_refresh_tokens_id", "refresh_tokens", ["id"])
+    op.create_index("ix_refresh_tokens_token_hash", "refresh_tokens", ["token_hash"], unique=True)
+    op.create_index("ix_refresh_tokens_familia", "refresh_tokens", ["familia"])
+
+
+def downgrade():
+    op.drop_table("refresh_tokens")
+    op.drop_table("tokens_revogados")
+    op.drop_table("transacoes_pix")
+    op.drop_table("chaves_pix")
+    op.drop_table("depositos")
+    op.drop_table("saques")
+    op.drop_table("transacoes")
+    op.drop_table("contas_corrente")
+    op.drop_table("contas")
+    op.drop_table("clientes")
@@ -0,0 +1,63 @@
+"""transferencias entre shards
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _colunas_base():
+    return [
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "transferencias_pendentes",
+        sa.Column("transferencia_id", sa.String(32), nullable=False),
+        sa.Column("tipo", sa.String(20), nullable=False),
+        sa.Column("conta_origem_numero", sa.String(20), nullable=False),
+        sa.Column("conta_destino_numero", sa.String(20), nullable=False),
+        sa.Column("valor", sa.Numeric(15, 2), nullable=False),
+        sa.Column("descricao_destino", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        *_colunas_base(),
+    )
+    op.create_index("ix_transferencias_pendentes_id", "transferencias_pendentes", ["id"])
+    op.create_index(
+        "ix_transferencias_pendentes_transferencia_id",
+        "transferencias_pendentes",
+        ["transferencia_id"],
+        unique=True,
+    )
+    op.create_index("ix_transferencias_pendentes_status", "transferencias_pendentes", ["status"])
+
+    op.create_table(
+        "transferencias_recebidas",
+        sa.Column("transferencia_id", sa.String(32), nullable=False),
+        sa.Column("conta_destino_numero", sa.String(20), nullable=False),
+        *_colunas_base(),
+    )
+    op.create_index("ix_transferencias_recebidas_id", "transferencias_recebidas", ["id"])
+    op.create_index(
+        "ix_transferencias_recebidas_transferencia_id",
+        "transferencias_recebidas",
+        ["transferencia_id"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_table("transferencias_recebidas")
+    op.drop_table("transferencias_pendentes")
@@ -0,0 +1,75 @@
+"""particionar transacoes por mes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 11:00:00
+
+No MySQL a tabela `transacoes` passa a ser particionada por
+RANGE COLUMNS(created_at), uma partição por mês. O MySQL exige que a chave
+primária inclua a coluna de particionamento e não aceita chaves
+estrangeiras em tabelas particionadas, por isso a PK vira (id, created_at)
+e as FKs de/para `transacoes` são removidas (a integridade continua
+garantida pela aplicação). Nos demais bancos só o índice é criado.
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.partitions import TABELA, somar_meses, sql_particionar
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+MESES_FUTUROS = 3
+
+# (tabela, coluna, tabela referenciada, coluna referenciada)
+CHAVES_ESTRANGEIRAS = [
+    ("saques", "id", "transacoes", "id"),
+    ("depositos", "id", "transacoes", "id"),
+    ("transacoes", "conta_id", "contas", "id"),
+]
+
+
+def _nome_fk(bind, tabela, coluna, referenciada):
+    return bind.execute(sa.text(
+        "SELECT CONSTRAINT_NAME FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabela "
+        "AND COLUMN_NAME = :coluna AND REFERENCED_TABLE_NAME = :referenciada"
+    ), {"tabela": tabela, "coluna": coluna, "referenciada": referenciada}).scalar()
+
+
+def upgrade():
+    op.create_index("ix_transacoes_conta_id_created_at", "transacoes", ["conta_id", "created_at"])
+
+    bind = op.get_bind()
+    if bind.dialect.name != "mysql":
+        return
+
+    for tabela, coluna, referenciada, _ in CHAVES_ESTRANGEIRAS:
+        nome = _nome_fk(bind, tabela, coluna, referenciada)
+        if nome:
+            op.drop_constraint(nome, tabela, type_="foreignkey")
+
+    op.execute(f"ALTER TABLE {TABELA} DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)")
+
+    # Partições desde o mês da transação mais antiga até alguns meses à frente
+    hoje = date.today()
+    mais_antiga = bind.execute(sa.text(f"SELECT MIN(created_at) FROM {TABELA}")).scalar()
+    inicio = (mais_antiga.year, mais_antiga.month) if mais_antiga else (hoje.year, hoje.month)
+    fim = somar_meses(hoje.year, hoje.month, MESES_FUTUROS)
+    op.execute(sql_particionar(inicio, fim))
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "mysql":
+        op.execute(f"ALTER TABLE {TABELA} REMOVE PARTITIONING")
+        op.execute(f"ALTER TABLE {TABELA} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+        for tabela, coluna, referenciada, coluna_referenciada in CHAVES_ESTRANGEIRAS:
+            op.create_foreign_key(None, tabela, referenciada, [coluna], [coluna_referenciada])
+
+    op.drop_index("ix_transacoes_conta_id_created_at", table_name="transacoes")
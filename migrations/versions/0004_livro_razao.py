@@ -0,0 +1,82 @@
+"""livro razao de partidas dobradas
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00
+
+Cria lancamentos/partidas e registra o saldo atual de cada conta como um
+lançamento de abertura contra a conta interna "abertura", para que o
+razão já comece consistente com `contas.saldo`.
+"""
+import uuid
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def _colunas_base():
+    return [
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade():
+    lancamentos = op.create_table(
+        "lancamentos",
+        sa.Column("transferencia_id", sa.String(32), nullable=False),
+        sa.Column("tipo", sa.String(20), nullable=False),
+        sa.Column("descricao", sa.Text(), nullable=True),
+        *_colunas_base(),
+    )
+    op.create_index("ix_lancamentos_id", "lancamentos", ["id"])
+    op.create_index("ix_lancamentos_transferencia_id", "lancamentos", ["transferencia_id"])
+
+    partidas = op.create_table(
+        "partidas",
+        sa.Column("valor", sa.Numeric(15, 2), nullable=False),
+        sa.Column("conta_sistema", sa.String(20), nullable=True),
+        sa.Column("lancamento_id", sa.Integer(), sa.ForeignKey("lancamentos.id"), nullable=False),
+        sa.Column("conta_id", sa.Integer(), sa.ForeignKey("contas.id"), nullable=True),
+        sa.Column("transacao_id", sa.Integer(), nullable=True),
+        *_colunas_base(),
+        sa.CheckConstraint(
+            "(conta_id IS NULL) <> (conta_sistema IS NULL)",
+            name="ck_partidas_uma_conta"
+        ),
+    )
+    op.create_index("ix_partidas_id", "partidas", ["id"])
+    op.create_index("ix_partidas_lancamento_id", "partidas", ["lancamento_id"])
+    op.create_index("ix_partidas_conta_id", "partidas", ["conta_id"])
+
+    # Lançamentos de abertura com os saldos existentes
+    bind = op.get_bind()
+    agora = datetime.utcnow()
+    contas = bind.execute(sa.text("SELECT id, saldo FROM contas WHERE saldo <> 0")).fetchall()
+    for conta_id, saldo in contas:
+        lancamento_id = bind.execute(lancamentos.insert().values(
+            transferencia_id=uuid.uuid4().hex,
+            tipo="abertura",
+            descricao="Saldo anterior ao livro razão",
+            created_at=agora,
+            updated_at=agora,
+        )).inserted_primary_key[0]
+        bind.execute(partidas.insert(), [
+            {"lancamento_id": lancamento_id, "conta_id": conta_id, "conta_sistema": None,
+             "valor": saldo, "created_at": agora, "updated_at": agora},
+            {"lancamento_id": lancamento_id, "conta_id": None, "conta_sistema": "abertura",
+             "valor": -saldo, "created_at": agora, "updated_at": agora},
+        ])
+
+
+def downgrade():
+    op.drop_table("partidas")
+    op.drop_table("lancamentos")
@@ -0,0 +1,39 @@
+"""saldo em faixas para contas muito movimentadas
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 13:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "contas",
+        sa.Column("faixas_saldo", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+    op.create_table(
+        "sub_saldos",
+        sa.Column("faixa", sa.Integer(), nullable=False),
+        sa.Column("saldo", sa.Numeric(15, 2), nullable=False),
+        sa.Column("conta_id", sa.Integer(), sa.ForeignKey("contas.id"), nullable=False),
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("conta_id", "faixa", name="uq_sub_saldos_conta_faixa"),
+    )
+    op.create_index("ix_sub_saldos_id", "sub_saldos", ["id"])
+
+
+def downgrade():
+    op.drop_table("sub_saldos")
+    with op.batch_alter_table("contas") as batch_op:
+        batch_op.drop_column("faixas_saldo")
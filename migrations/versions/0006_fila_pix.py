@@ -0,0 +1,40 @@
+"""fila de liquidacao de pix
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "fila_pix",
+        sa.Column("transacao_pix_id", sa.Integer(), sa.ForeignKey("transacoes_pix.id"), nullable=False),
+        sa.Column("conta_destino_numero", sa.String(20), nullable=False),
+        sa.Column("valor", sa.Numeric(15, 2), nullable=False),
+        sa.Column("descricao_origem", sa.Text(), nullable=False),
+        sa.Column("descricao_destino", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("lote", sa.String(32), nullable=True),
+        sa.Column("reservado_em", sa.DateTime(), nullable=True),
+        sa.Column("tentativas", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_fila_pix_id", "fila_pix", ["id"])
+    op.create_index("ix_fila_pix_transacao_pix_id", "fila_pix", ["transacao_pix_id"], unique=True)
+    op.create_index("ix_fila_pix_status", "fila_pix", ["status"])
+    op.create_index("ix_fila_pix_lote", "fila_pix", ["lote"])
+
+
+def downgrade():
+    op.drop_table("fila_pix")
@@ -0,0 +1,34 @@
+"""outbox de eventos de saldo
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 15:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "eventos",
+        sa.Column("tipo", sa.String(40), nullable=False),
+        sa.Column("conta_numero", sa.String(20), nullable=False),
+        sa.Column("delta", sa.Numeric(15, 2), nullable=False),
+        sa.Column("saldo", sa.Numeric(15, 2), nullable=False),
+        sa.Column("transacao_id", sa.Integer(), nullable=True),
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_eventos_id", "eventos", ["id"])
+    op.create_index("ix_eventos_conta_numero", "eventos", ["conta_numero"])
+
+
+def downgrade():
+    op.drop_table("eventos")
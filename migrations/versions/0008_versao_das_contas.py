@@ -0,0 +1,32 @@
+"""versão das contas e das faixas de saldo (ETags)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 16:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "contas",
+        sa.Column("versao", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "sub_saldos",
+        sa.Column("versao", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("sub_saldos") as batch_op:
+        batch_op.drop_column("versao")
+    with op.batch_alter_table("contas") as batch_op:
+        batch_op.drop_column("versao")
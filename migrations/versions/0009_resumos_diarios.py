@@ -0,0 +1,60 @@
+"""resumos diários das contas (totais do extrato)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 17:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "resumos_diarios",
+        sa.Column("dia", sa.Date(), nullable=False),
+        sa.Column("tipo", sa.String(20), nullable=False),
+        sa.Column("faixa", sa.Integer(), nullable=False),
+        sa.Column("debitos", sa.Numeric(15, 2), nullable=False),
+        sa.Column("creditos", sa.Numeric(15, 2), nullable=False),
+        sa.Column("quantidade_debitos", sa.Integer(), nullable=False),
+        sa.Column("quantidade_creditos", sa.Integer(), nullable=False),
+        sa.Column("conta_id", sa.Integer(), sa.ForeignKey("contas.id"), nullable=False),
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("conta_id", "dia", "tipo", "faixa", name="uq_resumos_diarios_conta_dia_tipo_faixa"),
+    )
+    op.create_index("ix_resumos_diarios_id", "resumos_diarios", ["id"])
+
+    # Resumos das transações que já estão no banco, em um único INSERT ... SELECT
+    op.execute(
+        """
+        INSERT INTO resumos_diarios (
+            conta_id, dia, tipo, faixa, debitos, creditos,
+            quantidade_debitos, quantidade_creditos, created_at, updated_at
+        )
+        SELECT
+            conta_id,
+            DATE(created_at),
+            tipo,
+            0,
+            SUM(CASE WHEN saldo_posterior < saldo_anterior THEN valor ELSE 0 END),
+            SUM(CASE WHEN saldo_posterior < saldo_anterior THEN 0 ELSE valor END),
+            SUM(CASE WHEN saldo_posterior < saldo_anterior THEN 1 ELSE 0 END),
+            SUM(CASE WHEN saldo_posterior < saldo_anterior THEN 0 ELSE 1 END),
+            CURRENT_TIMESTAMP,
+            CURRENT_TIMESTAMP
+        FROM transacoes
+        GROUP BY conta_id, DATE(created_at), tipo
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("resumos_diarios")
@@ -0,0 +1,49 @@
+"""natureza (débito/crédito) das transações
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 18:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+# Linhas por UPDATE no preenchimento: não segurar a tabela inteira de uma vez
+LOTE = 10000
+
+
+def upgrade():
+    op.add_column("transacoes", sa.Column("natureza", sa.String(7), nullable=True))
+
+    # Preencher pelas faixas de id; o sentido sai dos saldos
+    bind = op.get_bind()
+    menor, maior = bind.execute(sa.text("SELECT MIN(id), MAX(id) FROM transacoes")).one()
+    if menor is not None:
+        for inicio in range(menor, maior + 1, LOTE):
+            bind.execute(
+                sa.text(
+                    "UPDATE transacoes SET natureza = CASE "
+                    "WHEN saldo_posterior < saldo_anterior THEN 'debito' ELSE 'credito' END "
+                    "WHERE id >= :inicio AND id < :fim AND natureza IS NULL"
+                ),
+                {"inicio": inicio, "fim": inicio + LOTE},
+            )
+
+    with op.batch_alter_table("transacoes") as batch_op:
+        batch_op.alter_column("natureza", existing_type=sa.String(7), nullable=False)
+    op.create_index(
+        "ix_transacoes_conta_id_natureza_created_at",
+        "transacoes",
+        ["conta_id", "natureza", "created_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_transacoes_conta_id_natureza_created_at", table_name="transacoes")
+    with op.batch_alter_table("transacoes") as batch_op:
+        batch_op.drop_column("natureza")
@@ -0,0 +1,81 @@
+"""valores monetários em centavos inteiros (BIGINT)
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 19:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+LOTE = 10000
+
+# (tabela, coluna, dígitos do Numeric original)
+COLUNAS = [
+    ("contas", "saldo", 15),
+    ("contas_corrente", "limite", 10),
+    ("sub_saldos", "saldo", 15),
+    ("transacoes", "valor", 15),
+    ("transacoes", "saldo_anterior", 15),
+    ("transacoes", "saldo_posterior", 15),
+    ("saques", "taxa", 5),
+    ("partidas", "valor", 15),
+    ("eventos", "delta", 15),
+    ("eventos", "saldo", 15),
+    ("fila_pix", "valor", 15),
+    ("transferencias_pendentes", "valor", 15),
+    ("resumos_diarios", "debitos", 15),
+    ("resumos_diarios", "creditos", 15),
+]
+
+
+def _por_lotes(tabela: str, atribuicoes: str):
+    """UPDATE em faixas de id, para não bloquear a tabela inteira de uma vez"""
+    bind = op.get_bind()
+    menor, maior = bind.execute(sa.text(f"SELECT MIN(id), MAX(id) FROM {tabela}")).one()
+    if menor is None:
+        return
+    for inicio in range(menor, maior + 1, LOTE):
+        bind.execute(
+            sa.text(f"UPDATE {tabela} SET {atribuicoes} WHERE id >= :inicio AND id < :fim"),
+            {"inicio": inicio, "fim": inicio + LOTE},
+        )
+
+
+def _converter(tabela: str, colunas: list, tipo_novo, expressao: str):
+    """Coluna nova ao lado da antiga, preenchida por lotes, que então a substitui"""
+    for coluna, _ in colunas:
+        op.add_column(tabela, sa.Column(f"{coluna}_novo", tipo_novo(coluna), nullable=True))
+    _por_lotes(tabela, ", ".join(f"{coluna}_novo = {expressao.format(coluna=coluna)}" for coluna, _ in colunas))
+    with op.batch_alter_table(tabela) as batch_op:
+        for coluna, _ in colunas:
+            batch_op.drop_column(coluna)
+            batch_op.alter_column(
+                f"{coluna}_novo",
+                new_column_name=coluna,
+                existing_type=tipo_novo(coluna),
+                nullable=False,
+            )
+
+
+def _por_tabela():
+    tabelas = {}
+    for tabela, coluna, digitos in COLUNAS:
+        tabelas.setdefault(tabela, []).append((coluna, digitos))
+    return tabelas.items()
+
+
+def upgrade():
+    for tabela, colunas in _por_tabela():
+        _converter(tabela, colunas, lambda _: sa.BigInteger(), "ROUND({coluna} * 100)")
+
+
+def downgrade():
+    for tabela, colunas in _por_tabela():
+        digitos = dict(colunas)
+        _converter(tabela, colunas, lambda coluna: sa.Numeric(digitos[coluna], 2), "{coluna} / 100.0")
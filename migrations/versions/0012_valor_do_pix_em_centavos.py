@@ -0,0 +1,53 @@
+"""valor do PIX como centavos numéricos e índice do histórico
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 20:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+LOTE = 10000
+
+
+def _por_lotes(atribuicao: str):
+    bind = op.get_bind()
+    menor, maior = bind.execute(sa.text("SELECT MIN(id), MAX(id) FROM transacoes_pix")).one()
+    if menor is None:
+        return
+    for inicio in range(menor, maior + 1, LOTE):
+        bind.execute(
+            sa.text(f"UPDATE transacoes_pix SET {atribuicao} WHERE id >= :inicio AND id < :fim"),
+            {"inicio": inicio, "fim": inicio + LOTE},
+        )
+
+
+def _trocar_coluna(tipo_novo, expressao: str):
+    op.add_column("transacoes_pix", sa.Column("valor_novo", tipo_novo, nullable=True))
+    _por_lotes(f"valor_novo = {expressao}")
+    with op.batch_alter_table("transacoes_pix") as batch_op:
+        batch_op.drop_column("valor")
+        batch_op.alter_column("valor_novo", new_column_name="valor", existing_type=tipo_novo, nullable=False)
+
+
+def upgrade():
+    # O texto já guarda centavos: basta convertê-lo para inteiro
+    inteiro = "SIGNED" if op.get_bind().dialect.name == "mysql" else "INTEGER"
+    _trocar_coluna(sa.BigInteger(), f"CAST(valor AS {inteiro})")
+    op.create_index(
+        "ix_transacoes_pix_conta_origem_id_data_transacao",
+        "transacoes_pix",
+        ["conta_origem_id", "data_transacao"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_transacoes_pix_conta_origem_id_data_transacao", table_name="transacoes_pix")
+    texto = "CHAR(20)" if op.get_bind().dialect.name == "mysql" else "TEXT"
+    _trocar_coluna(sa.String(20), f"CAST(valor AS {texto})")
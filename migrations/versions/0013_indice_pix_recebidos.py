@@ -0,0 +1,25 @@
+"""índice dos PIX recebidos por conta
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 21:00:00
+"""
+from alembic import op
+
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_transacoes_pix_conta_destino_id_data_transacao",
+        "transacoes_pix",
+        ["conta_destino_id", "data_transacao"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_transacoes_pix_conta_destino_id_data_transacao", table_name="transacoes_pix")
@@ -0,0 +1,31 @@
+"""tentativas e estado terminal das transferências entre shards
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-20 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "transferencias_pendentes",
+        sa.Column("tentativas", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "transferencias_pendentes",
+        sa.Column("transacao_pix_id", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("transferencias_pendentes") as batch_op:
+        batch_op.drop_column("transacao_pix_id")
+        batch_op.drop_column("tentativas")
@@ -0,0 +1,26 @@
+"""cópia dos PIX recebidos de outro shard
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-20 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A cópia gravada no shard de destino não tem a conta de origem
+    with op.batch_alter_table("transacoes_pix") as batch_op:
+        batch_op.alter_column("conta_origem_id", existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    op.execute("DELETE FROM transacoes_pix WHERE conta_origem_id IS NULL")
+    with op.batch_alter_table("transacoes_pix") as batch_op:
+        batch_op.alter_column("conta_origem_id", existing_type=sa.Integer(), nullable=False)
@@ -6,9 +6,12 @@ from sqlalchemy.pool import StaticPool
 from datetime import date
 
 from app.main import app
-from app.database import get_db
+from app.core.config import settings
+from app.database import get_db, get_read_db
 from app.models import Base
-from app.auth.security import get_password_hash
+from app.auth.security import get_password_hash, create_access_token
+from app.auth.rate_limit import rate_limiters
+from app.services.cache_extrato import cache_extrato
 from app.models import Cliente, Conta, ContaCorrente
 
 # Configurar banco de dados de teste em memória
@@ -23,6 +26,23 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# A fila de PIX e o relay de eventos são acionados explicitamente nos testes
+settings.pix_workers = 0
+settings.events_relay_enabled = False
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiters():
+    """Evita que tentativas de login de um teste afetem os seguintes"""
+    for limiter in rate_limiters.values():
+        limiter.clear()
+    yield
+
+@pytest.fixture(autouse=True)
+def reset_cache_extrato():
+    """Cada teste tem um banco novo: extratos de outro teste não valem"""
+    cache_extrato.clear()
+    yield
+
 @pytest.fixture(scope="function")
 def db_session():
     """Cria uma sessão de banco de dados para testes"""
@@ -44,6 +64,7 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -92,4 +113,17 @@ def auth_headers(client, sample_cliente):
     }
     response = client.post("/auth/login", json=login_data)
     token = response.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"}
\ No newline at end of file
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def token_headers(sample_cliente):
+    """Cria headers com um token emitido diretamente, sem passar pelo login"""
+    token = create_access_token(data={"sub": sample_cliente.cpf})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def metrics_headers(monkeypatch):
+    """Configura o token de /metrics e devolve o cabeçalho que o apresenta"""
+    monkeypatch.setattr(settings, "metrics_token", "token-de-metricas")
+    return {"Authorization": "Bearer token-de-metricas"}
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.core.config import settings
+from app.models import Transacao, Deposito
+from app.services import arquivar_transacoes, ler_arquivadas, ler_corte
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def diretorio_arquivo(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path))
+    return str(tmp_path)
+
+
+def _transacao(db_session, conta, dias_atras, valor="10.00", modelo=Transacao, **campos):
+    transacao = modelo(
+        tipo=campos.pop("tipo", "deposito"),
+        valor=Decimal(valor),
+        descricao="Teste",
+        saldo_anterior=Decimal("0.00"),
+        saldo_posterior=Decimal(valor),
+        conta_id=conta.id,
+        created_at=datetime.utcnow() - timedelta(days=dias_atras),
+        **campos
+    )
+    db_session.add(transacao)
+    db_session.commit()
+    return transacao
+
+
+def test_arquivar_remove_do_banco(db_session, sample_conta, diretorio_arquivo):
+    _transacao(db_session, sample_conta, 400)
+    _transacao(db_session, sample_conta, 420, modelo=Deposito, origem="caixa")
+    _transacao(db_session, sample_conta, 5)
+
+    corte = datetime.utcnow() - timedelta(days=365)
+    assert arquivar_transacoes(db_session, corte) == 2
+    assert db_session.query(Transacao).count() == 1
+    assert ler_corte() == corte
+
+    arquivadas = ler_arquivadas(sample_conta.numero, corte - timedelta(days=100), corte)
+    assert len(arquivadas) == 2
+    assert arquivadas[0].created_at > arquivadas[1].created_at
+
+    # Repetir não duplica nada
+    assert arquivar_transacoes(db_session, corte) == 0
+    assert len(ler_arquivadas(sample_conta.numero, corte - timedelta(days=100), corte)) == 2
+
+
+def test_extrato_inclui_periodo_arquivado(client, db_session, sample_conta, token_headers, diretorio_arquivo):
+    _transacao(db_session, sample_conta, 400, valor="30.00")
+    _transacao(db_session, sample_conta, 5, valor="20.00")
+    arquivar_transacoes(db_session, datetime.utcnow() - timedelta(days=365))
+
+    inicio = (datetime.utcnow() - timedelta(days=500)).isoformat()
+    response = client.get(
+        f"/transacoes/{sample_conta.numero}/extrato",
+        params={"data_inicio": inicio},
+        headers=token_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["quantidade_transacoes"] == 2
+    assert [Decimal(t["valor"]) for t in data["transacoes"]] == [Decimal("20.00"), Decimal("30.00")]
+
+    # Janela padrão (30 dias) não toca o arquivo
+    response = client.get(f"/transacoes/{sample_conta.numero}/extrato", headers=token_headers)
+    assert response.json()["quantidade_transacoes"] == 1
+
+
+def test_arquivar_em_lotes(db_session, sample_conta, diretorio_arquivo, monkeypatch):
+    monkeypatch.setattr("app.services.arquivo.LOTE_LEITURA", 2)
+    for dias in (400, 401, 402, 430, 431, 460, 5):
+        _transacao(db_session, sample_conta, dias)
+
+    # Primeiro só as mais antigas; depois o restante completa os mesmos arquivos
+    assert arquivar_transacoes(db_session, datetime.utcnow() - timedelta(days=429)) == 3
+    corte = datetime.utcnow() - timedelta(days=365)
+    assert arquivar_transacoes(db_session, corte) == 3
+    assert db_session.query(Transacao).count() == 1
+
+    arquivadas = ler_arquivadas(sample_conta.numero, corte - timedelta(days=200), corte)
+    assert len({t.id for t in arquivadas}) == len(arquivadas) == 6
+
+
+def test_corte_relido_so_quando_o_arquivo_muda(diretorio_arquivo, monkeypatch):
+    assert ler_corte() is None
+    corte = datetime(2025, 1, 1)
+    with open(os.path.join(diretorio_arquivo, "_corte"), "w") as arquivo:
+        arquivo.write(corte.isoformat())
+    assert ler_corte() == corte
+
+    aberturas = []
+    abrir = open
+    monkeypatch.setattr("builtins.open", lambda *args, **kwargs: aberturas.append(args) or abrir(*args, **kwargs))
+    assert ler_corte() == corte
+    assert aberturas == []
@@ -1,6 +1,18 @@
 import pytest
+from datetime import datetime, timedelta
 from fastapi import status
 
+from sqlalchemy import event, update
+
+from app.auth.revocation import BloomFilter, TokenRevocationList, remover_refresh_tokens_expirados, revocation_list
+from app.auth.security import get_password_hash, password_needs_rehash
+from app.auth.rate_limit import InMemoryBucketBackend
+from app.routes.auth import login_cpf_limiter
+from app.core import settings
+from passlib.hash import bcrypt
+from app.models import Cliente, TokenRevogado, RefreshToken
+from app.routes.auth import emitir_tokens
+
 def test_register_cliente(client):
     """Testa o registro de um novo cliente"""
     register_data = {
@@ -111,4 +123,159 @@ def test_logout(client):
     response = client.post("/auth/logout")
     
     assert response.status_code == status.HTTP_200_OK
-    assert response.json()["message"] == "Logout realizado com sucesso"
\ No newline at end of file
+    assert response.json()["message"] == "Logout realizado com sucesso"
+
+def test_logout_revoga_token(client, db_session, token_headers):
+    """Testa que o token enviado no logout deixa de ser aceito"""
+    response = client.get("/auth/me", headers=token_headers)
+    assert response.status_code == status.HTTP_200_OK
+    
+    response = client.post("/auth/logout", headers=token_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert db_session.query(TokenRevogado).count() == 1
+    
+    response = client.get("/auth/me", headers=token_headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["detail"] == "Token revogado"
+    revocation_list.clear()
+
+def test_bloom_filter_sem_falsos_negativos():
+    """Testa que todo item inserido no filtro de Bloom é encontrado"""
+    bloom = BloomFilter(capacidade=1000)
+    itens = [f"jti-{i}" for i in range(1000)]
+    for item in itens:
+        bloom.add(item)
+    
+    assert all(item in bloom for item in itens)
+    falsos_positivos = sum(f"outro-{i}" in bloom for i in range(10000))
+    assert falsos_positivos < 100
+
+def test_revocation_list_sincroniza_do_banco(db_session):
+    """Testa a sincronização e a limpeza de revogações expiradas"""
+    agora = datetime.utcnow()
+    db_session.add(TokenRevogado(jti="ativo", expira_em=agora + timedelta(minutes=10)))
+    db_session.add(TokenRevogado(jti="expirado", expira_em=agora - timedelta(minutes=1)))
+    db_session.commit()
+    
+    lista = TokenRevocationList(capacidade=10)
+    assert lista.sync(db_session) == 1
+    assert lista.is_revoked("ativo")
+    assert not lista.is_revoked("expirado")
+    assert db_session.query(TokenRevogado).count() == 1
+
+def test_refresh_token_rotacao(client, db_session, sample_cliente):
+    """Testa que o refresh token emite novos tokens e é rotacionado"""
+    tokens = emitir_tokens(db_session, sample_cliente)
+    
+    response = client.post("/auth/refresh", json={"refresh_token": tokens.refresh_token})
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["access_token"]
+    assert data["refresh_token"] != tokens.refresh_token
+    
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {data['access_token']}"})
+    assert response.status_code == status.HTTP_200_OK
+
+def test_refresh_token_reutilizado_revoga_familia(client, db_session, sample_cliente):
+    """Testa a detecção de reuso de refresh token"""
+    tokens = emitir_tokens(db_session, sample_cliente)
+    novo = client.post("/auth/refresh", json={"refresh_token": tokens.refresh_token}).json()
+    
+    # Reapresentar o token antigo invalida toda a família, inclusive o novo
+    response = client.post("/auth/refresh", json={"refresh_token": tokens.refresh_token})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert "reutilizado" in response.json()["detail"]
+    
+    response = client.post("/auth/refresh", json={"refresh_token": novo["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert db_session.query(RefreshToken).filter(RefreshToken.revogado == False).count() == 0
+
+def test_refresh_token_concorrente_so_rotaciona_uma_vez(client, db_session, sample_cliente):
+    """Outra requisição usa o mesmo token entre a leitura e a rotação"""
+    tokens = emitir_tokens(db_session, sample_cliente)
+    
+    usos = []
+    
+    def usar_em_paralelo(estado):
+        if not usos and estado.is_select and estado.bind_mapper is not None and estado.bind_mapper.class_ is Cliente:
+            usos.append(True)
+            estado.session.connection().execute(update(RefreshToken.__table__).values(usado=True))
+    
+    event.listen(db_session, "do_orm_execute", usar_em_paralelo)
+    try:
+        response = client.post("/auth/refresh", json={"refresh_token": tokens.refresh_token})
+    finally:
+        event.remove(db_session, "do_orm_execute", usar_em_paralelo)
+    
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert db_session.query(RefreshToken).count() == 1
+    assert db_session.query(RefreshToken).one().revogado
+
+def test_refresh_tokens_expirados_sao_removidos(db_session, sample_cliente):
+    """Tokens vencidos saem da tabela; usados ainda no prazo ficam para detectar reuso"""
+    emitir_tokens(db_session, sample_cliente)
+    usado = db_session.query(RefreshToken).one()
+    usado.usado = True
+    db_session.add(RefreshToken(
+        token_hash="0" * 64,
+        familia="f" * 32,
+        expira_em=datetime.utcnow() - timedelta(minutes=1),
+        cliente_id=sample_cliente.id
+    ))
+    db_session.commit()
+    
+    assert remover_refresh_tokens_expirados(db_session) == 1
+    assert db_session.query(RefreshToken).one().id == usado.id
+
+def test_refresh_token_invalido(client):
+    """Testa refresh com token desconhecido"""
+    response = client.post("/auth/refresh", json={"refresh_token": "token-inexistente"})
+    
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_password_needs_rehash_custo_diferente():
+    """Testa que hashes com custo diferente do configurado são marcados para atualização"""
+    hash_antigo = bcrypt.using(rounds=settings.bcrypt_rounds - 1).hash("senha123")
+    
+    assert password_needs_rehash(hash_antigo)
+    assert not password_needs_rehash(get_password_hash("senha123"))
+
+def test_token_bucket_reposicao():
+    """Testa consumo e reposição das fichas do balde"""
+    agora = [0.0]
+    backend = InMemoryBucketBackend(relogio=lambda: agora[0])
+    
+    assert backend.consume("ip", capacidade=2, taxa=1.0) == (True, 0.0)
+    assert backend.consume("ip", capacidade=2, taxa=1.0) == (True, 0.0)
+    permitido, espera = backend.consume("ip", capacidade=2, taxa=1.0)
+    assert not permitido
+    assert espera == pytest.approx(1.0)
+    
+    agora[0] = 1.0
+    assert backend.consume("ip", capacidade=2, taxa=1.0)[0]
+
+def test_login_limitado_por_cpf(client, metrics_headers):
+    """Testa que tentativas repetidas para o mesmo CPF são rejeitadas antes do banco"""
+    login_data = {"cpf": "52998224725", "senha": "senha_errada"}
+    
+    for _ in range(login_cpf_limiter.capacidade):
+        response = client.post("/auth/login", json=login_data)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    response = client.post("/auth/login", json=login_data)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert "Retry-After" in response.headers
+    assert client.get("/metrics", headers=metrics_headers).json()["rate_limit"]["login_cpf"]["rejeitadas"] == 1
+
+
+def test_metrics_restrito(client, monkeypatch):
+    """Sem METRICS_TOKEN a rota não existe; com ele, exige o token no cabeçalho"""
+    assert client.get("/metrics").status_code == status.HTTP_404_NOT_FOUND
+
+    monkeypatch.setattr(settings, "metrics_token", "token-de-metricas")
+    assert client.get("/metrics").status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.get("/metrics", headers={"Authorization": "Bearer outro"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.get("/metrics", headers={"Authorization": "Bearer token-de-metricas"})
+    assert response.status_code == status.HTTP_200_OK
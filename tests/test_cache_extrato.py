@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from app.services.cache_extrato import CacheExtrato, cache_extrato, janela_padrao
+
+
+def test_extrato_repetido_vem_do_cache(client, sample_conta, token_headers):
+    url = f"/transacoes/{sample_conta.numero}/extrato"
+    client.post(f"/transacoes/{sample_conta.numero}/deposito", json={"valor": 10.0}, headers=token_headers)
+
+    primeiro = client.get(url, headers=token_headers)
+    segundo = client.get(url, headers=token_headers)
+    assert primeiro.status_code == segundo.status_code == 200
+    assert segundo.content == primeiro.content
+    assert primeiro.json()["quantidade_transacoes"] == 1
+    assert cache_extrato.metrics()["acertos"] == 1
+
+    # Filtro de tipo é outra chave
+    client.get(url, params={"tipo_transacao": "saque"}, headers=token_headers)
+    assert cache_extrato.metrics()["falhas"] == 2
+
+
+def test_nova_transacao_invalida_o_extrato(client, sample_conta, token_headers, metrics_headers):
+    url = f"/transacoes/{sample_conta.numero}/extrato"
+    assert client.get(url, headers=token_headers).json()["quantidade_transacoes"] == 0
+
+    client.post(f"/transacoes/{sample_conta.numero}/saque", json={"valor": 5.0}, headers=token_headers)
+    extrato = client.get(url, headers=token_headers).json()
+    assert extrato["quantidade_transacoes"] == 1
+    assert cache_extrato.metrics()["acertos"] == 0
+
+    assert client.get("/metrics", headers=metrics_headers).json()["cache_extrato"]["entradas"] == 2
+
+
+def test_extrato_de_outro_cliente_nao_vem_do_cache(client, sample_conta, token_headers):
+    url = f"/transacoes/{sample_conta.numero}/extrato"
+    client.get(url, headers=token_headers)
+    assert client.get(url).status_code in (401, 403)
+
+
+def test_lru_limitado_por_bytes():
+    cache = CacheExtrato(max_bytes=10)
+    cache.guardar("a", b"1234")
+    cache.guardar("b", b"1234")
+    assert cache.obter("a") == b"1234"  # "a" passa a ser a mais recente
+    cache.guardar("c", b"1234")
+    assert cache.obter("b") is None
+    assert cache.metrics()["bytes"] == 8
+    assert cache.metrics()["descartes"] == 1
+
+    cache.guardar("grande", b"x" * 11)
+    assert cache.obter("grande") is None
+    assert cache.obter("a") == b"1234"
+
+
+def test_janela_padrao_arredonda_para_o_proximo_minuto():
+    inicio, fim = janela_padrao(datetime(2024, 5, 10, 12, 30, 15))
+    assert fim == datetime(2024, 5, 10, 12, 31)
+    assert inicio == datetime(2024, 4, 10, 12, 31)
+    assert janela_padrao(datetime(2024, 5, 10, 12, 30))[1] == datetime(2024, 5, 10, 12, 30)
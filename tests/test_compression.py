@@ -0,0 +1,144 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import CompressionMiddleware
+from app.middleware.compression import brotli, codificacoes_aceitas
+from app.static import PrecompressedStaticFiles, ZeroCopyFileResponse, precomprimir
+
+GRANDE = {"transacoes": [{"id": i, "descricao": "Depósito em conta"} for i in range(200)]}
+
+
+@pytest.fixture
+def cliente_comprimido():
+    app = FastAPI()
+
+    @app.get("/grande")
+    def grande():
+        return GRANDE
+
+    @app.get("/pequeno")
+    def pequeno():
+        return {"ok": True}
+
+    @app.get("/eventos")
+    def eventos():
+        async def gerar():
+            for i in range(3):
+                yield f"data: {i}\n\n" * 100
+        return StreamingResponse(gerar(), media_type="text/event-stream")
+
+    @app.get("/csv")
+    def csv():
+        async def gerar():
+            for i in range(50):
+                yield f"{i};Depósito em conta;100.00\n" * 20
+        return StreamingResponse(gerar(), media_type="text/csv")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return TestClient(app)
+
+
+def test_comprime_respostas_grandes(cliente_comprimido):
+    response = cliente_comprimido.get("/grande", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(json.dumps(GRANDE))
+    assert response.json() == GRANDE
+
+
+def test_nao_comprime_pequenas_nem_sse(cliente_comprimido):
+    response = cliente_comprimido.get("/pequeno", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+    response = cliente_comprimido.get("/eventos", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+    response = cliente_comprimido.get("/grande", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_comprime_streaming(cliente_comprimido):
+    response = cliente_comprimido.get("/csv", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert response.text.count("\n") == 1000
+
+
+@pytest.mark.skipif(brotli is None, reason="pacote brotli não instalado")
+def test_prefere_brotli(cliente_comprimido):
+    response = cliente_comprimido.get("/grande", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+
+
+def test_codificacoes_aceitas():
+    assert codificacoes_aceitas("gzip, deflate", ("br", "gzip")) == ["gzip"]
+    assert codificacoes_aceitas("br;q=0, *", ("br", "gzip")) == ["gzip"]
+    assert codificacoes_aceitas("", ("gzip",)) == []
+
+
+def test_estaticos_pre_comprimidos(tmp_path):
+    conteudo = "console.log('banco');\n" * 200
+    (tmp_path / "main.abc123.js").write_text(conteudo)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + b"\x00" * 2000)
+    assert precomprimir(str(tmp_path)) == 1
+    assert (tmp_path / "main.abc123.js.gz").exists()
+    assert not (tmp_path / "logo.png.gz").exists()
+
+    app = FastAPI()
+    app.mount("/", PrecompressedStaticFiles(directory=str(tmp_path)))
+    app.add_middleware(CompressionMiddleware)
+    client = TestClient(app)
+
+    response = client.get("/main.abc123.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Content-Length"] == str((tmp_path / "main.abc123.js.gz").stat().st_size)
+    assert "javascript" in response.headers["Content-Type"]
+    assert response.text == conteudo
+
+    response = client.get("/main.abc123.js", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.text == conteudo
+
+
+def test_sendfile_quando_o_servidor_oferece(tmp_path):
+    caminho = tmp_path / "app.css"
+    caminho.write_text("body { margin: 0 }\n" * 100)
+    enviados = []
+
+    async def send(message):
+        enviados.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [], "extensions": {"http.response.zerocopy": {}}}
+    asyncio.run(ZeroCopyFileResponse(str(caminho))(scope, None, send))
+
+    assert enviados[1]["type"] == "http.response.zerocopy"
+    assert enviados[1]["count"] == caminho.stat().st_size
+
+
+def test_sendfile_atras_da_compressao_envia_o_inicio(tmp_path):
+    caminho = tmp_path / "app.css"
+    caminho.write_text("body { margin: 0 }\n" * 100)
+    enviados = []
+
+    async def send(message):
+        enviados.append(message)
+
+    async def app(scope, receive, send):
+        await ZeroCopyFileResponse(str(caminho))(scope, receive, send)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "headers": [(b"accept-encoding", b"gzip")],
+        "extensions": {"http.response.zerocopy": {}},
+    }
+    asyncio.run(CompressionMiddleware(app, minimum_size=10)(scope, None, send))
+
+    assert [m["type"] for m in enviados] == ["http.response.start", "http.response.zerocopy"]
+    assert enviados[0]["status"] == 200
+    assert b"content-encoding" not in dict(enviados[0]["headers"])
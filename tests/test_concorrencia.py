@@ -0,0 +1,71 @@
+import inspect
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.models import Conta
+from app.routes.transacao import realizar_deposito, realizar_saque, realizar_transferencia
+from app.services import com_retentativa, creditar, debitar
+from tests.conftest import TestingSessionLocal
+
+
+def _alterar_em_outra_sessao(numero: str, valor: str):
+    outra = TestingSessionLocal()
+    try:
+        conta = outra.query(Conta).filter(Conta.numero == numero).one()
+        creditar(outra, conta, Decimal(valor), "deposito", "Depósito concorrente")
+        outra.commit()
+    finally:
+        outra.close()
+
+
+def test_escrita_com_versao_antiga_e_rejeitada(db_session, sample_conta):
+    versao = sample_conta.versao
+    _alterar_em_outra_sessao(sample_conta.numero, "10.00")
+
+    # A sessão ainda vê a versão antiga; o UPDATE não encontra a linha
+    debitar(db_session, sample_conta, Decimal("100.00"), "saque", "Saque")
+    with pytest.raises(StaleDataError):
+        db_session.commit()
+    db_session.rollback()
+
+    db_session.refresh(sample_conta)
+    assert sample_conta.saldo == Decimal("1010.00")
+    assert sample_conta.versao == versao + 1
+
+
+def test_retentativa_rele_a_conta(db_session, sample_conta):
+    tentativas = []
+
+    def operacao():
+        conta = db_session.query(Conta).filter(Conta.numero == sample_conta.numero).one()
+        if not tentativas:
+            _alterar_em_outra_sessao(conta.numero, "10.00")
+        tentativas.append(conta.saldo)
+        transacao = debitar(db_session, conta, Decimal("100.00"), "saque", "Saque")
+        db_session.commit()
+        return transacao
+
+    transacao = com_retentativa(db_session, operacao, tentativas=3)
+
+    # A segunda tentativa partiu do saldo com o depósito concorrente
+    assert tentativas == [Decimal("1000.00"), Decimal("1010.00")]
+    assert transacao.saldo_posterior == Decimal("910.00")
+
+
+def test_retentativas_esgotadas(db_session, sample_conta):
+    def operacao():
+        conta = db_session.query(Conta).filter(Conta.numero == sample_conta.numero).one()
+        _alterar_em_outra_sessao(conta.numero, "1.00")
+        debitar(db_session, conta, Decimal("1.00"), "saque", "Saque")
+        db_session.commit()
+
+    with pytest.raises(StaleDataError):
+        com_retentativa(db_session, operacao, tentativas=2)
+
+
+def test_rotas_com_retentativa_rodam_no_threadpool():
+    """A espera entre tentativas não pode bloquear o event loop"""
+    for rota in (realizar_saque, realizar_deposito, realizar_transferencia):
+        assert not inspect.iscoroutinefunction(rota)
@@ -1,6 +1,8 @@
 import pytest
 from fastapi import status
 
+from app.database.routing import COOKIE_ULTIMA_ESCRITA, ReadRouter
+
 def test_criar_conta_corrente(client, auth_headers):
     """Testa criação de conta corrente"""
     conta_data = {
@@ -113,4 +115,58 @@ def test_acesso_com_token_invalido(client):
     headers = {"Authorization": "Bearer token_invalido"}
     response = client.get("/contas/", headers=headers)
     
-    assert response.status_code == status.HTTP_401_UNAUTHORIZED
\ No newline at end of file
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_read_router_distribui_leituras_entre_replicas():
+    """Testa o rodízio de leituras entre as réplicas"""
+    router = ReadRouter(lambda: "primario", [lambda: "replica1", lambda: "replica2"])
+    
+    assert [router.session_for(None) for _ in range(4)] == [
+        "replica1", "replica2", "replica1", "replica2"
+    ]
+
+def test_read_router_le_do_primario_apos_escrita():
+    """Testa a leitura das próprias escritas logo após uma transferência"""
+    agora = [100.0]
+    router = ReadRouter(
+        lambda: "primario", [lambda: "replica"], sticky_seconds=5, relogio=lambda: agora[0]
+    )
+    
+    assert router.session_for(98.0) == "primario"
+    assert router.session_for(None) == "replica"
+    
+    agora[0] = 104.0
+    assert router.session_for(98.0) == "replica"
+
+def test_cookie_de_escrita_vale_em_qualquer_worker(client, db_session, sample_conta, token_headers):
+    """A marca da escrita vai para o cliente; outro processo a lê do cookie"""
+    from sqlalchemy import event
+    from app.database import read_router
+    from app.database.config import _registrar_escrita
+    from tests.conftest import TestingSessionLocal
+    
+    # Nos testes o "primário" é a sessão de teste
+    event.listen(TestingSessionLocal, "after_commit", _registrar_escrita)
+    replicas = read_router.replica_factories
+    read_router.replica_factories = [lambda: None]
+    try:
+        response = client.post(
+            f"/transacoes/{sample_conta.numero}/deposito", json={"valor": 10}, headers=token_headers
+        )
+    finally:
+        read_router.replica_factories = replicas
+        event.remove(TestingSessionLocal, "after_commit", _registrar_escrita)
+    
+    assert response.status_code == status.HTTP_200_OK
+    marca = float(response.cookies[COOKIE_ULTIMA_ESCRITA])
+    assert read_router.is_sticky(marca)
+    
+    # Um "outro worker" sem estado compartilhado decide só pelo cookie
+    outro = ReadRouter(lambda: "primario", [lambda: "replica"], sticky_seconds=5)
+    assert outro.session_for(marca) == "primario"
+
+def test_read_router_sem_replicas_usa_primario():
+    """Testa que sem réplicas configuradas tudo vai para o primário"""
+    router = ReadRouter(lambda: "primario")
+    
+    assert router.session_for("12345678901") == "primario"
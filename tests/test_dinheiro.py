@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import text
+
+from app.models import Conta, SubSaldo, de_centavos, para_centavos
+from app.schemas import DepositoRequest, PixTransferenciaRequest, Valor
+
+
+def test_conversao_exata():
+    assert para_centavos(Decimal("12.34")) == 1234
+    assert para_centavos(0.1) == 10
+    assert para_centavos("-5") == -500
+    assert para_centavos(Decimal("0.005")) == 1
+    assert de_centavos(1234) == Decimal("12.34")
+    assert str(de_centavos(0)) == "0.00"
+
+
+def test_colunas_gravam_centavos(db_session, sample_conta):
+    bruto = db_session.execute(text("SELECT saldo FROM contas WHERE id = :id"), {"id": sample_conta.id}).scalar()
+    assert bruto == 100000
+
+    db_session.expire_all()
+    conta = db_session.get(Conta, sample_conta.id)
+    assert conta.saldo == Decimal("1000.00")
+    assert str(conta.saldo) == "1000.00"
+
+    # Literais em expressões SQL também viram centavos
+    db_session.add(SubSaldo(conta_id=conta.id, faixa=0, saldo=Decimal("1.50")))
+    db_session.commit()
+    db_session.query(SubSaldo).update({SubSaldo.saldo: SubSaldo.saldo + Decimal("0.25")})
+    db_session.commit()
+    assert db_session.query(SubSaldo.saldo).scalar() == Decimal("1.75")
+
+
+def test_valor_da_api_tem_duas_casas():
+    class Modelo(BaseModel):
+        valor: Valor
+
+    assert Modelo(valor=10).model_dump_json() == '{"valor":"10.00"}'
+    assert Modelo(valor="2.5").valor == Decimal("2.50")
+    with pytest.raises(ValidationError):
+        Modelo(valor="10.005")
+
+
+@pytest.mark.parametrize("valor", ["1e26", "92233720368547758.08", "-1e30"])
+def test_valor_que_nao_cabe_em_centavos_e_rejeitado(valor):
+    class Modelo(BaseModel):
+        valor: Valor
+
+    with pytest.raises(ValidationError):
+        Modelo(valor=valor)
+    with pytest.raises(ValidationError):
+        DepositoRequest(valor=valor)
+    with pytest.raises(ValidationError):
+        PixTransferenciaRequest(chave_destino="destino@teste.com", valor=valor)
+
+
+def test_deposito_com_fracao_de_centavo_e_rejeitado(client, sample_conta, token_headers):
+    response = client.post(
+        f"/transacoes/{sample_conta.numero}/deposito", json={"valor": 10.005}, headers=token_headers
+    )
+    assert response.status_code == 422
+
+
+def test_filtro_de_valor_enorme_e_rejeitado(client, sample_conta, token_headers):
+    response = client.get(
+        "/pix/transferencias",
+        params={"conta_numero": sample_conta.numero, "valor_max": "1e26"},
+        headers=token_headers,
+    )
+    assert response.status_code == 422
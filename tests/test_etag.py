@@ -0,0 +1,67 @@
+from decimal import Decimal
+
+from app.services import configurar_faixas, creditar, etag_corresponde
+
+
+def _revalidar(client, url, headers, etag):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+
+def test_saldo_responde_304_ate_a_conta_mudar(client, sample_conta, token_headers):
+    url = f"/contas/{sample_conta.numero}/saldo"
+    response = client.get(url, headers=token_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    response = _revalidar(client, url, token_headers, etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    client.post(f"/transacoes/{sample_conta.numero}/deposito", json={"valor": 10.0}, headers=token_headers)
+    response = _revalidar(client, url, token_headers, etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_credito_em_faixa_muda_o_etag(client, db_session, sample_conta, token_headers):
+    configurar_faixas(db_session, sample_conta, 4)
+    url = f"/contas/{sample_conta.numero}/saldo"
+    etag = client.get(url, headers=token_headers).headers["ETag"]
+
+    # O crédito em faixa não altera a linha da conta
+    creditar(db_session, sample_conta, Decimal("5.00"), "pix", "PIX recebido")
+    db_session.commit()
+
+    response = _revalidar(client, url, token_headers, etag)
+    assert response.status_code == 200
+    assert Decimal(str(response.json()["saldo_atual"])) == Decimal("1005.00")
+
+
+def test_listas_de_contas_e_chaves(client, sample_conta, token_headers):
+    etag_contas = client.get("/contas/", headers=token_headers).headers["ETag"]
+    url_chaves = f"/pix/chaves/{sample_conta.numero}"
+    etag_chaves = client.get(url_chaves, headers=token_headers).headers["ETag"]
+    assert _revalidar(client, "/contas/", token_headers, etag_contas).status_code == 304
+    assert _revalidar(client, url_chaves, token_headers, etag_chaves).status_code == 304
+
+    response = client.post(
+        "/pix/chaves",
+        json={"chave": "", "tipo": "aleatoria", "conta_numero": sample_conta.numero},
+        headers=token_headers,
+    )
+    assert response.status_code == 200
+    response = _revalidar(client, url_chaves, token_headers, etag_chaves)
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+
+    client.post("/contas/", json={"tipo_conta": "poupanca"}, headers=token_headers)
+    assert _revalidar(client, "/contas/", token_headers, etag_contas).status_code == 200
+
+
+def test_etag_corresponde():
+    assert etag_corresponde('"a", W/"b"', '"b"')
+    assert etag_corresponde("*", '"a"')
+    assert not etag_corresponde('"a"', '"b"')
+    assert not etag_corresponde(None, '"a"')
@@ -0,0 +1,60 @@
+import asyncio
+from decimal import Decimal
+
+from app.database.sharding import ShardRouter
+from app.models import Evento
+from app.services.eventos import BrokerLocal, RelayEventos, publicar, topico_conta
+from tests.conftest import TestingSessionLocal
+
+
+def test_movimentacoes_gravam_eventos(client, db_session, sample_conta, token_headers):
+    response = client.post(f"/transacoes/{sample_conta.numero}/deposito", json={"valor": 50.0}, headers=token_headers)
+    assert response.status_code == 200
+    response = client.post(f"/transacoes/{sample_conta.numero}/saque", json={"valor": 20.0}, headers=token_headers)
+    assert response.status_code == 200
+
+    eventos = db_session.query(Evento).order_by(Evento.id).all()
+    assert [(e.delta, e.saldo) for e in eventos] == [
+        (Decimal("50.00"), Decimal("1050.00")),
+        (Decimal("-20.00"), Decimal("1030.00")),
+    ]
+    assert all(e.transacao_id for e in eventos)
+
+
+def test_relay_publica_no_broker(client, db_session, sample_conta, token_headers):
+    relay = RelayEventos(ShardRouter([TestingSessionLocal]))
+    relay.iniciar_cursores()
+
+    async def cenario():
+        broker = BrokerLocal()
+        da_conta = broker.assinar(topico_conta(sample_conta.numero))
+        de_outra = broker.assinar(topico_conta("0000000000"))
+        todas = broker.assinar()
+
+        client.post(f"/transacoes/{sample_conta.numero}/deposito", json={"valor": 75.0}, headers=token_headers)
+        assert publicar(broker, relay.ler_novos()) == 1
+        # Nada novo: nada é reenviado
+        assert publicar(broker, relay.ler_novos()) == 0
+
+        mensagem = await asyncio.wait_for(da_conta.proxima(), timeout=1)
+        assert mensagem["conta_numero"] == sample_conta.numero
+        assert Decimal(mensagem["delta"]) == Decimal("75.00")
+        assert mensagem["transacao"]["tipo"] == "deposito"
+        assert (await asyncio.wait_for(todas.proxima(), timeout=1))["id"] == mensagem["id"]
+        assert de_outra.fila.empty()
+
+    asyncio.run(cenario())
+
+
+def test_assinante_lento_descarta_os_mais_antigos():
+    async def cenario():
+        broker = BrokerLocal()
+        assinatura = broker.assinar("contas.1", maxsize=2)
+        for i in range(3):
+            broker.publicar("contas.1", {"id": i})
+        assert assinatura.descartados == 1
+        assert (await assinatura.proxima())["id"] == 1
+        assinatura.cancelar()
+        assert broker.metrics()["assinantes"] == 0
+
+    asyncio.run(cenario())
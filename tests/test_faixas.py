@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+from app.models import SubSaldo
+from app.services import configurar_faixas, creditar, debitar, saldo_total
+from app.services.faixas import faixa_para
+
+
+def test_creditos_caem_nas_faixas(db_session, sample_conta):
+    configurar_faixas(db_session, sample_conta, 4)
+
+    for _ in range(8):
+        creditar(db_session, sample_conta, Decimal("10.00"), "pix", "PIX recebido")
+    db_session.commit()
+    db_session.refresh(sample_conta)
+
+    # A linha da conta não muda; o saldo lido soma as faixas
+    assert sample_conta.saldo == Decimal("1000.00")
+    assert saldo_total(sample_conta) == Decimal("1080.00")
+    faixas_usadas = db_session.query(SubSaldo).filter(SubSaldo.saldo > 0).count()
+    assert faixas_usadas > 1
+
+
+def test_debito_consolida_as_faixas(db_session, sample_conta):
+    configurar_faixas(db_session, sample_conta, 4)
+    creditar(db_session, sample_conta, Decimal("50.00"), "pix", "PIX recebido")
+    db_session.commit()
+
+    transacao = debitar(db_session, sample_conta, Decimal("30.00"), "saque", "Saque")
+    db_session.commit()
+
+    assert transacao.saldo_anterior == Decimal("1050.00")
+    assert sample_conta.saldo == Decimal("1020.00")
+    assert saldo_total(sample_conta) == Decimal("1020.00")
+
+
+def test_consultar_saldo_soma_faixas(client, db_session, sample_conta, token_headers):
+    configurar_faixas(db_session, sample_conta, 2)
+    creditar(db_session, sample_conta, Decimal("25.00"), "pix", "PIX recebido")
+    db_session.commit()
+
+    response = client.get(f"/contas/{sample_conta.numero}/saldo", headers=token_headers)
+    assert response.status_code == 200
+    assert Decimal(response.json()["saldo_atual"]) == Decimal("1025.00")
+
+
+def test_faixa_para_estavel():
+    assert faixa_para("abc", 8) == faixa_para("abc", 8)
+    assert {faixa_para(str(i), 8) for i in range(100)} == set(range(8))
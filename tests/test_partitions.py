@@ -0,0 +1,34 @@
+from datetime import date
+
+from app.database.partitions import (
+    somar_meses,
+    planejar_futuras,
+    planejar_arquivamento,
+    sql_particionar,
+    sql_criar_futuras,
+)
+
+
+def test_somar_meses_vira_o_ano():
+    assert somar_meses(2026, 11, 3) == (2027, 2)
+    assert somar_meses(2026, 1, -1) == (2025, 12)
+
+
+def test_sql_particionar_fronteiras_mensais():
+    sql = sql_particionar((2026, 11), (2027, 1))
+    assert "PARTITION p202611 VALUES LESS THAN ('2026-12-01')" in sql
+    assert "PARTITION p202612 VALUES LESS THAN ('2027-01-01')" in sql
+    assert "PARTITION p202701 VALUES LESS THAN ('2027-02-01')" in sql
+    assert sql.rstrip().endswith("PARTITION pmax VALUES LESS THAN (MAXVALUE)\n)")
+
+
+def test_planejar_futuras_completa_ate_o_alvo():
+    existentes = ["p202609", "p202610", "p202611", "pmax"]
+    assert planejar_futuras(existentes, date(2026, 10, 19), 3) == [(2026, 12), (2027, 1)]
+    assert planejar_futuras(existentes, date(2026, 8, 1), 3) == []
+    assert "REORGANIZE PARTITION pmax" in sql_criar_futuras([(2026, 12)])
+
+
+def test_planejar_arquivamento_respeita_retencao():
+    existentes = ["p202601", "p202602", "p202603", "p202604", "pmax"]
+    assert planejar_arquivamento(existentes, date(2026, 5, 10), 2) == ["p202601", "p202602"]
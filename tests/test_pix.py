@@ -0,0 +1,212 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.database.sharding import ShardRouter
+from app.models import ContaCorrente, FilaPix, TransacaoPix
+from app.services.liquidacao import liquidar_fila_pix
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def contas_pix(client, db_session, sample_conta, token_headers):
+    """sample_conta e uma conta de destino, ambas com chave PIX"""
+    destino = ContaCorrente(
+        numero="3333333333",
+        agencia="0001",
+        saldo=0,
+        tipo_conta="corrente",
+        cliente_id=sample_conta.cliente_id,
+        limite=500.0,
+        limite_saques=3,
+        saques_realizados=0,
+        ativa=True
+    )
+    db_session.add(destino)
+    db_session.commit()
+    for chave, conta in (("origem@teste.com", sample_conta), ("destino@teste.com", destino)):
+        response = client.post(
+            "/pix/chaves",
+            json={"chave": chave, "tipo": "email", "conta_numero": conta.numero},
+            headers=token_headers
+        )
+        assert response.status_code == 200
+    return sample_conta, destino
+
+
+def _liquidar():
+    return liquidar_fila_pix(ShardRouter([TestingSessionLocal]))
+
+
+def test_pix_aceito_e_liquidado_em_segundo_plano(client, db_session, contas_pix, token_headers):
+    origem, destino = contas_pix
+
+    response = client.post(
+        f"/pix/transferencia/{origem.numero}",
+        json={"chave_destino": "destino@teste.com", "valor": 150.0},
+        headers=token_headers
+    )
+    assert response.status_code == 202
+    pix_id = response.json()["id"]
+    assert response.json()["status"] == "processando"
+    assert db_session.query(FilaPix).count() == 1
+
+    assert _liquidar() == 1
+    assert _liquidar() == 0
+
+    response = client.get(f"/pix/transferencia/{pix_id}", headers=token_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "concluida"
+    assert Decimal(response.json()["valor"]) == Decimal("150.00")
+
+    db_session.expire_all()
+    assert origem.saldo == Decimal("850.00")
+    assert destino.saldo == Decimal("150.00")
+    assert db_session.query(FilaPix).count() == 0
+
+
+def test_pix_rejeitado_sem_saldo_na_liquidacao(client, db_session, contas_pix, token_headers):
+    origem, _ = contas_pix
+
+    ids = []
+    for _ in range(2):
+        response = client.post(
+            f"/pix/transferencia/{origem.numero}",
+            json={"chave_destino": "destino@teste.com", "valor": 600.0},
+            headers=token_headers
+        )
+        assert response.status_code == 202
+        ids.append(response.json()["id"])
+
+    assert _liquidar() == 2
+
+    status_finais = [
+        client.get(f"/pix/transferencia/{pix_id}", headers=token_headers).json()["status"]
+        for pix_id in ids
+    ]
+    assert status_finais == ["concluida", "rejeitada"]
+    db_session.expire_all()
+    assert origem.saldo == Decimal("400.00")
+
+
+def test_pix_para_conta_inativa_e_rejeitado(client, db_session, contas_pix, token_headers):
+    origem, destino = contas_pix
+    response = client.post(
+        f"/pix/transferencia/{origem.numero}",
+        json={"chave_destino": "destino@teste.com", "valor": 100.0},
+        headers=token_headers
+    )
+    pix_id = response.json()["id"]
+    destino.ativa = False
+    db_session.commit()
+
+    assert _liquidar() == 1
+    assert client.get(f"/pix/transferencia/{pix_id}", headers=token_headers).json()["status"] == "rejeitada"
+    db_session.expire_all()
+    assert origem.saldo == Decimal("1000.00")
+    assert destino.saldo == Decimal("0.00")
+
+
+def test_pix_com_falha_repetida_vai_para_fila_morta(client, db_session, contas_pix, token_headers, monkeypatch):
+    origem, _ = contas_pix
+    response = client.post(
+        f"/pix/transferencia/{origem.numero}",
+        json={"chave_destino": "destino@teste.com", "valor": 100.0},
+        headers=token_headers
+    )
+    pix_id = response.json()["id"]
+
+    def falhar(*args, **kwargs):
+        raise RuntimeError("falha simulada")
+
+    monkeypatch.setattr("app.services.liquidacao.debitar", falhar)
+    monkeypatch.setattr("app.services.liquidacao.settings.pix_max_attempts", 2)
+
+    # Itens que voltam para a fila não contam como tratados
+    assert _liquidar() == 0
+    assert client.get(f"/pix/transferencia/{pix_id}", headers=token_headers).json()["status"] == "processando"
+    assert _liquidar() == 0
+    assert _liquidar() == 0
+
+    db_session.expire_all()
+    item = db_session.query(FilaPix).one()
+    assert (item.status, item.tentativas) == ("falhou", 2)
+    assert client.get(f"/pix/transferencia/{pix_id}", headers=token_headers).json()["status"] == "rejeitada"
+    assert origem.saldo == Decimal("1000.00")
+
+
+def test_consultar_pix_inexistente(client, token_headers):
+    response = client.get("/pix/transferencia/999", headers=token_headers)
+    assert response.status_code == 404
+
+
+def _pix_enviados(db_session, conta, valores, destino=None, minutos=None):
+    base = datetime(2026, 1, 1, 12, 0)
+    for indice, valor in enumerate(valores):
+        db_session.add(TransacaoPix(
+            chave_origem="origem@teste.com",
+            chave_destino="destino@teste.com",
+            valor=Decimal(valor),
+            status="concluida",
+            # Dois PIX no mesmo instante: o id desempata a ordem
+            data_transacao=base + timedelta(minutes=minutos[indice] if minutos else indice // 2),
+            conta_origem_id=conta.id,
+            conta_destino_id=destino.id if destino else None,
+        ))
+    db_session.commit()
+
+
+def test_historico_de_pix_paginado_por_cursor(client, db_session, sample_conta, token_headers):
+    _pix_enviados(db_session, sample_conta, [str(v) for v in range(1, 8)])
+    url = f"/pix/transferencias?conta_numero={sample_conta.numero}&limite=3"
+
+    valores, cursor = [], None
+    while True:
+        response = client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=token_headers)
+        assert response.status_code == 200
+        pagina = response.json()
+        valores += [Decimal(t["valor"]) for t in pagina["transferencias"]]
+        cursor = pagina["proximo_cursor"]
+        if not cursor:
+            break
+    assert valores == [Decimal(v) for v in range(7, 0, -1)]
+
+
+def test_historico_de_pix_filtra_por_valor(client, db_session, sample_conta, token_headers):
+    _pix_enviados(db_session, sample_conta, ["5.00", "50.00", "500.00"])
+    response = client.get(
+        "/pix/transferencias",
+        params={"conta_numero": sample_conta.numero, "valor_min": "10", "valor_max": "100"},
+        headers=token_headers,
+    )
+    assert [t["valor"] for t in response.json()["transferencias"]] == ["50.00"]
+
+    response = client.get(
+        "/pix/transferencias",
+        params={"conta_numero": sample_conta.numero, "cursor": "invalido"},
+        headers=token_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_historico_intercala_enviados_e_recebidos(client, db_session, contas_pix, token_headers):
+    origem, outra = contas_pix
+    _pix_enviados(db_session, origem, ["1", "3", "5"], destino=outra, minutos=[1, 3, 5])
+    _pix_enviados(db_session, outra, ["2", "4", "6", "7"], destino=origem, minutos=[2, 4, 6, 6])
+    url = f"/pix/historico/{origem.numero}?limite=2"
+
+    itens, cursor = [], None
+    while True:
+        response = client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=token_headers)
+        assert response.status_code == 200
+        pagina = response.json()
+        assert len(pagina["transferencias"]) <= 2
+        itens += [(t["valor"], t["natureza"]) for t in pagina["transferencias"]]
+        cursor = pagina["proximo_cursor"]
+        if not cursor:
+            break
+
+    assert itens == [
+        ("7.00", "credito"), ("6.00", "credito"), ("5.00", "debito"), ("4.00", "credito"),
+        ("3.00", "debito"), ("2.00", "credito"), ("1.00", "debito"),
+    ]
@@ -0,0 +1,64 @@
+import pytest
+from decimal import Decimal
+
+from app.models import ContaCorrente, Lancamento, Partida, CONTA_ABERTURA
+from app.services import abrir_lancamento, lancar, verificar_razao
+
+
+@pytest.fixture
+def contas_no_razao(db_session, sample_conta):
+    """sample_conta com lançamento de abertura e uma segunda conta zerada"""
+    abertura = abrir_lancamento(db_session, "abertura")
+    lancar(abertura, Decimal(sample_conta.saldo), conta=sample_conta)
+    lancar(abertura, -Decimal(sample_conta.saldo), conta_sistema=CONTA_ABERTURA)
+
+    outra = ContaCorrente(
+        numero="2222222222",
+        agencia="0001",
+        saldo=0,
+        tipo_conta="corrente",
+        cliente_id=sample_conta.cliente_id,
+        limite=500.0,
+        limite_saques=3,
+        saques_realizados=0,
+        ativa=True
+    )
+    db_session.add(outra)
+    db_session.commit()
+    return sample_conta, outra
+
+
+def test_movimentacoes_geram_partidas_balanceadas(client, db_session, contas_no_razao, token_headers):
+    conta, outra = contas_no_razao
+
+    response = client.post(f"/transacoes/{outra.numero}/deposito", json={"valor": 100.0}, headers=token_headers)
+    assert response.status_code == 200
+    response = client.post(
+        f"/transacoes/{outra.numero}/transferencia",
+        json={"conta_destino": conta.numero, "valor": 40.0},
+        headers=token_headers
+    )
+    assert response.status_code == 200
+
+    # A transferência é um único lançamento com débito e crédito ligados
+    transferencia = db_session.query(Lancamento).filter(Lancamento.tipo == "transferencia").one()
+    valores = sorted(p.valor for p in transferencia.partidas)
+    assert valores == [Decimal("-40.00"), Decimal("40.00")]
+    assert all(p.transacao_id for p in transferencia.partidas)
+
+    resultado = verificar_razao(db_session)
+    assert resultado == {"divergencias": [], "desbalanceados": []}
+
+
+def test_verificar_razao_corrige_saldo_em_cache(db_session, contas_no_razao):
+    conta, _ = contas_no_razao
+    conta.saldo = Decimal("1.00")
+    db_session.commit()
+
+    resultado = verificar_razao(db_session, corrigir=True)
+    assert resultado["divergencias"] == [
+        {"conta_numero": conta.numero, "saldo": Decimal("1.00"), "razao": Decimal("1000.00")}
+    ]
+    db_session.refresh(conta)
+    assert conta.saldo == Decimal("1000.00")
+    assert db_session.query(Partida).count() == 2
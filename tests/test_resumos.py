@@ -0,0 +1,126 @@
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.models import ContaCorrente, ResumoDiario, Transacao
+from app.services import configurar_faixas, creditar, debitar, totais_periodo, verificar_resumos
+
+
+def _conta_destino(db_session, sample_cliente):
+    conta = ContaCorrente(numero="9876543210", saldo=0.0, cliente_id=sample_cliente.id)
+    db_session.add(conta)
+    db_session.commit()
+    return conta
+
+
+def test_transferencia_enviada_conta_como_debito(client, db_session, sample_cliente, sample_conta, token_headers):
+    _conta_destino(db_session, sample_cliente)
+    client.post(f"/transacoes/{sample_conta.numero}/deposito", json={"valor": 50.0}, headers=token_headers)
+    response = client.post(
+        f"/transacoes/{sample_conta.numero}/transferencia",
+        json={"conta_destino": "9876543210", "valor": 300.0},
+        headers=token_headers,
+    )
+    assert response.status_code == 200
+
+    extrato = client.get(f"/transacoes/{sample_conta.numero}/extrato", headers=token_headers).json()
+    assert Decimal(str(extrato["total_saques"])) == Decimal("300.00")
+    assert Decimal(str(extrato["total_depositos"])) == Decimal("50.00")
+
+    extrato = client.get("/transacoes/9876543210/extrato", headers=token_headers).json()
+    assert Decimal(str(extrato["total_depositos"])) == Decimal("300.00")
+
+
+def test_natureza_gravada_nas_duas_pontas(client, db_session, sample_cliente, sample_conta, token_headers):
+    destino = _conta_destino(db_session, sample_cliente)
+    response = client.post(
+        f"/transacoes/{sample_conta.numero}/transferencia",
+        json={"conta_destino": destino.numero, "valor": 100.0},
+        headers=token_headers,
+    )
+    assert response.json()["natureza"] == "debito"
+
+    naturezas = {
+        conta_id: natureza
+        for conta_id, natureza in db_session.query(Transacao.conta_id, Transacao.natureza).filter(
+            Transacao.tipo == "transferencia"
+        )
+    }
+    assert naturezas == {sample_conta.id: "debito", destino.id: "credito"}
+
+
+def test_natureza_padrao_pelos_saldos(db_session, sample_conta):
+    transacao = Transacao(
+        tipo="saque",
+        valor=Decimal("10.00"),
+        saldo_anterior=Decimal("100.00"),
+        saldo_posterior=Decimal("90.00"),
+        conta_id=sample_conta.id,
+    )
+    db_session.add(transacao)
+    db_session.commit()
+    assert transacao.natureza == "debito"
+
+
+def test_totais_dos_dias_inteiros_vem_dos_resumos(db_session, sample_conta):
+    hoje = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    for dias_atras in (1, 2, 3):
+        momento = hoje - timedelta(days=dias_atras)
+        creditar(db_session, sample_conta, Decimal("10.00"), "deposito", "Depósito", created_at=momento)
+        debitar(db_session, sample_conta, Decimal("4.00"), "saque", "Saque", created_at=momento)
+    db_session.commit()
+    assert db_session.query(ResumoDiario).count() == 6
+
+    # Os dias inteiros não dependem das transações passadas
+    inicio = hoje - timedelta(days=3, hours=1)
+    assert totais_periodo(db_session, sample_conta.id, inicio, hoje, None, []) == (Decimal("8.00"), Decimal("20.00"))
+    assert totais_periodo(db_session, sample_conta.id, inicio, hoje, "saque", []) == (Decimal("8.00"), Decimal("0.00"))
+
+
+def test_creditos_em_faixas_somam_no_resumo(db_session, sample_conta):
+    configurar_faixas(db_session, sample_conta, 4)
+    for _ in range(8):
+        creditar(db_session, sample_conta, Decimal("5.00"), "pix", "PIX recebido")
+    db_session.commit()
+
+    linhas = db_session.query(ResumoDiario).filter(ResumoDiario.tipo == "pix").all()
+    assert len(linhas) > 1
+    assert sum(linha.creditos for linha in linhas) == Decimal("40.00")
+    assert sum(linha.quantidade_creditos for linha in linhas) == 8
+    assert verificar_resumos(db_session)["divergencias"] == []
+
+
+def test_verificacao_corrige_resumo_divergente(db_session, sample_conta):
+    debitar(db_session, sample_conta, Decimal("30.00"), "saque", "Saque")
+    creditar(db_session, sample_conta, Decimal("20.00"), "deposito", "Depósito")
+    db_session.commit()
+    assert verificar_resumos(db_session)["divergencias"] == []
+
+    resumo = db_session.query(ResumoDiario).filter(ResumoDiario.tipo == "saque").one()
+    resumo.debitos = Decimal("99.00")
+    db_session.commit()
+
+    divergencias = verificar_resumos(db_session, corrigir=True)["divergencias"]
+    assert [(d["tipo"], d["resumo"][0], d["transacoes"][0]) for d in divergencias] == [
+        ("saque", Decimal("99.00"), Decimal("30.00"))
+    ]
+    assert verificar_resumos(db_session)["divergencias"] == []
+
+
+def test_datas_em_utc_independente_do_fuso_local(client, db_session, sample_conta, token_headers, monkeypatch):
+    # Fuso local 12h atrás de UTC: com datetime.now() a transação cairia em outro dia
+    monkeypatch.setenv("TZ", "Etc/GMT+12")
+    time.tzset()
+    try:
+        transacao = creditar(db_session, sample_conta, Decimal("10.00"), "deposito", "Depósito")
+        db_session.commit()
+        assert abs(transacao.created_at - datetime.utcnow()) < timedelta(minutes=1)
+        resumo = db_session.query(ResumoDiario).one()
+        assert resumo.dia == transacao.created_at.date()
+
+        # O período padrão do extrato termina agora (UTC) e inclui a transação
+        extrato = client.get(f"/transacoes/{sample_conta.numero}/extrato", headers=token_headers).json()
+        assert extrato["quantidade_transacoes"] == 1
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,318 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.security import create_access_token
+from app.database import get_db, get_read_db
+from app.database.sharding import ShardRouter, replicar_cliente
+from app.main import app
+from app.models import Base, ChavePix, Cliente, Conta, ContaCorrente, FilaPix, Transacao, TransacaoPix, TransferenciaPendente
+from app.models.pix import TipoChavePix
+from app.services import (
+    iniciar_transferencia_remota,
+    concluir_transferencia_remota,
+    processar_transferencias_pendentes,
+)
+from app.services.liquidacao import liquidar_fila_pix
+
+# crc32 % 2: "00010004" fica no shard 0 e "00010001" no shard 1
+CONTA_SHARD_0 = "00010004"
+CONTA_SHARD_1 = "00010001"
+OUTRA_CONTA_SHARD_1 = "00010003"
+
+
+@pytest.fixture
+def router(tmp_path):
+    """Dois shards SQLite com o mesmo cliente replicado e uma conta em cada"""
+    fabricas = []
+    for indice in range(2):
+        engine = create_engine(f"sqlite:///{tmp_path}/shard{indice}.db")
+        Base.metadata.create_all(bind=engine)
+        fabricas.append(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    router = ShardRouter(fabricas)
+
+    primario = fabricas[0]()
+    cliente = Cliente(
+        cpf="52998224725",
+        nome="Maria Souza",
+        data_nascimento=date(1985, 5, 20),
+        endereco="Rua Teste, 456",
+        senha_hash="hash",
+        ativo=True
+    )
+    primario.add(cliente)
+    primario.commit()
+    replicar_cliente(router, primario, cliente)
+
+    for numero in (CONTA_SHARD_0, CONTA_SHARD_1):
+        with router.session_scope(numero, padrao=primario) as db:
+            db.add(ContaCorrente(
+                numero=numero,
+                agencia="0001",
+                saldo=Decimal("1000.00"),
+                tipo_conta="corrente",
+                cliente_id=cliente.id,
+                limite=Decimal("500.00"),
+                limite_saques=3,
+                saques_realizados=0,
+                ativa=True
+            ))
+            db.commit()
+    primario.close()
+    return router
+
+
+def _saldo(router, numero):
+    db = router.session_factories[router.shard_for(numero)]()
+    try:
+        return db.query(Conta).filter(Conta.numero == numero).one().saldo
+    finally:
+        db.close()
+
+
+def test_shard_for_estavel(router):
+    assert router.shard_for(CONTA_SHARD_0) == 0
+    assert router.shard_for(CONTA_SHARD_1) == 1
+    assert not router.same_shard(CONTA_SHARD_0, CONTA_SHARD_1)
+    assert ShardRouter([lambda: None]).shard_for(CONTA_SHARD_1) == 0
+
+
+def test_cliente_replicado(router):
+    db = router.session_factories[1]()
+    try:
+        assert db.query(Cliente).filter(Cliente.cpf == "52998224725").count() == 1
+    finally:
+        db.close()
+
+
+def test_transferencia_entre_shards(router):
+    db_origem = router.session_factories[0]()
+    db_destino = router.session_factories[1]()
+    try:
+        conta = db_origem.query(Conta).filter(Conta.numero == CONTA_SHARD_0).one()
+        _, pendente = iniciar_transferencia_remota(
+            db_origem, conta, CONTA_SHARD_1, Decimal("100.00"),
+            "transferencia", "Enviada", "Recebida"
+        )
+        db_origem.commit()
+        concluir_transferencia_remota(db_origem, db_destino, pendente)
+        assert pendente.status == "concluida"
+    finally:
+        db_origem.close()
+        db_destino.close()
+
+    assert _saldo(router, CONTA_SHARD_0) == Decimal("900.00")
+    assert _saldo(router, CONTA_SHARD_1) == Decimal("1100.00")
+
+
+def test_recuperacao_credita_uma_vez(router):
+    """Uma transferência interrompida após o débito é concluída uma única vez"""
+    db_origem = router.session_factories[0]()
+    try:
+        conta = db_origem.query(Conta).filter(Conta.numero == CONTA_SHARD_0).one()
+        iniciar_transferencia_remota(
+            db_origem, conta, CONTA_SHARD_1, Decimal("50.00"),
+            "transferencia", "Enviada", "Recebida"
+        )
+        db_origem.commit()
+    finally:
+        db_origem.close()
+
+    assert _saldo(router, CONTA_SHARD_1) == Decimal("1000.00")
+    assert processar_transferencias_pendentes(router) == 1
+    assert processar_transferencias_pendentes(router) == 0
+    assert _saldo(router, CONTA_SHARD_1) == Decimal("1050.00")
+
+    db_destino = router.session_factories[1]()
+    try:
+        assert db_destino.query(Transacao).count() == 1
+    finally:
+        db_destino.close()
+
+    db_origem = router.session_factories[0]()
+    try:
+        assert db_origem.query(TransferenciaPendente).filter(
+            TransferenciaPendente.status == "pendente"
+        ).count() == 0
+    finally:
+        db_origem.close()
+
+
+def test_destino_inexistente_estorna_a_origem(router):
+    """Sem a conta no shard de destino, o outbox termina em "falhou" com o débito devolvido"""
+    db_origem = router.session_factories[0]()
+    try:
+        conta = db_origem.query(Conta).filter(Conta.numero == CONTA_SHARD_0).one()
+        iniciar_transferencia_remota(
+            db_origem, conta, "00010003", Decimal("80.00"),
+            "transferencia", "Enviada", "Recebida"
+        )
+        db_origem.commit()
+    finally:
+        db_origem.close()
+
+    assert router.shard_for("00010003") == 1
+    assert _saldo(router, CONTA_SHARD_0) == Decimal("920.00")
+    processar_transferencias_pendentes(router)
+    assert _saldo(router, CONTA_SHARD_0) == Decimal("1000.00")
+    assert processar_transferencias_pendentes(router) == 0
+
+    db_origem = router.session_factories[0]()
+    try:
+        assert db_origem.query(TransferenciaPendente).one().status == "falhou"
+    finally:
+        db_origem.close()
+
+
+def test_pix_recebido_de_outro_shard_aparece_no_historico(router, client, monkeypatch):
+    db_origem = router.session_factories[0]()
+    try:
+        conta = db_origem.query(Conta).filter(Conta.numero == CONTA_SHARD_0).one()
+        transacao_pix = TransacaoPix(
+            chave_origem="origem@teste.com",
+            chave_destino="destino@teste.com",
+            valor=Decimal("25.00"),
+            status="processando",
+            conta_origem_id=conta.id,
+        )
+        db_origem.add(transacao_pix)
+        db_origem.add(FilaPix(
+            transacao_pix=transacao_pix,
+            conta_destino_numero=CONTA_SHARD_1,
+            valor=Decimal("25.00"),
+            descricao_origem="PIX enviado",
+            descricao_destino="PIX recebido",
+            status="pendente",
+        ))
+        db_origem.commit()
+    finally:
+        db_origem.close()
+
+    assert liquidar_fila_pix(router) == 1
+    assert _saldo(router, CONTA_SHARD_1) == Decimal("1025.00")
+
+    def sessao_do_shard_0():
+        db = router.session_factories[0]()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr("app.database.config.shard_router", router)
+    app.dependency_overrides[get_read_db] = sessao_do_shard_0
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': '52998224725'})}"}
+
+    historicos = {
+        numero: client.get(f"/pix/historico/{numero}", headers=headers).json()["transferencias"]
+        for numero in (CONTA_SHARD_0, CONTA_SHARD_1)
+    }
+    assert [(t["valor"], t["natureza"], t["status"]) for t in historicos[CONTA_SHARD_0]] == [
+        ("25.00", "debito", "concluida")
+    ]
+    assert [(t["valor"], t["natureza"], t["status"]) for t in historicos[CONTA_SHARD_1]] == [
+        ("25.00", "credito", "concluida")
+    ]
+
+
+@pytest.fixture
+def api_com_shards(router, client, monkeypatch):
+    """API apontando para os dois shards; a sessão do primário é a do shard 0"""
+    def sessao_do_primario():
+        db = router.session_factories[0]()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    for modulo in ("app.database.config", "app.routes.transacao", "app.routes.pix"):
+        monkeypatch.setattr(f"{modulo}.shard_router", router)
+    app.dependency_overrides[get_db] = sessao_do_primario
+    app.dependency_overrides[get_read_db] = sessao_do_primario
+
+    db = router.session_factories[1]()
+    try:
+        cliente = db.query(Cliente).one()
+        db.add(ContaCorrente(
+            numero=OUTRA_CONTA_SHARD_1,
+            agencia="0001",
+            saldo=Decimal("0.00"),
+            tipo_conta="corrente",
+            cliente_id=cliente.id,
+            limite=Decimal("500.00"),
+            limite_saques=3,
+            saques_realizados=0,
+            ativa=True
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': '52998224725'})}"}
+    return client, headers
+
+
+def _pendentes(router, shard):
+    db = router.session_factories[shard]()
+    try:
+        return db.query(TransferenciaPendente).count()
+    finally:
+        db.close()
+
+
+def test_transferencia_do_shard_1_para_o_shard_0(router, api_com_shards):
+    client, headers = api_com_shards
+    corpo = {"conta_destino": CONTA_SHARD_0, "valor": 100.0}
+
+    response = client.post(f"/transacoes/{CONTA_SHARD_1}/transferencia/validar", json=corpo, headers=headers)
+    assert response.status_code == 200
+    response = client.post(f"/transacoes/{CONTA_SHARD_1}/transferencia", json=corpo, headers=headers)
+    assert response.status_code == 200
+
+    assert _saldo(router, CONTA_SHARD_1) == Decimal("900.00")
+    assert _saldo(router, CONTA_SHARD_0) == Decimal("1100.00")
+    assert _pendentes(router, 1) == 1
+
+
+def test_transferencia_no_mesmo_shard_1_e_local(router, api_com_shards):
+    client, headers = api_com_shards
+    corpo = {"conta_destino": OUTRA_CONTA_SHARD_1, "valor": 100.0}
+
+    response = client.post(f"/transacoes/{CONTA_SHARD_1}/transferencia/validar", json=corpo, headers=headers)
+    assert response.status_code == 200
+    response = client.post(f"/transacoes/{CONTA_SHARD_1}/transferencia", json=corpo, headers=headers)
+    assert response.status_code == 200
+
+    assert _saldo(router, CONTA_SHARD_1) == Decimal("900.00")
+    assert _saldo(router, OUTRA_CONTA_SHARD_1) == Decimal("100.00")
+    # Débito e crédito na mesma transação: nada passa pelo outbox
+    assert _pendentes(router, 0) == _pendentes(router, 1) == 0
+
+
+def test_pix_do_shard_1_encontra_chaves_em_todos_os_shards(router, api_com_shards):
+    client, headers = api_com_shards
+    for numero, chave in (
+        (CONTA_SHARD_1, "origem@teste.com"),
+        (CONTA_SHARD_0, "shard0@teste.com"),
+        (OUTRA_CONTA_SHARD_1, "shard1@teste.com"),
+    ):
+        db = router.session_factories[router.shard_for(numero)]()
+        try:
+            conta = db.query(Conta).filter(Conta.numero == numero).one()
+            db.add(ChavePix(chave=chave, tipo=TipoChavePix.EMAIL, conta_id=conta.id, ativa=True))
+            db.commit()
+        finally:
+            db.close()
+
+    for chave in ("shard0@teste.com", "shard1@teste.com"):
+        corpo = {"chave_destino": chave, "valor": 10.0}
+        response = client.post(f"/pix/transferencia/{CONTA_SHARD_1}/validar", json=corpo, headers=headers)
+        assert response.status_code == 200
+        response = client.post(f"/pix/transferencia/{CONTA_SHARD_1}", json=corpo, headers=headers)
+        assert response.status_code == 202
+
+    assert liquidar_fila_pix(router) == 2
+    assert _saldo(router, CONTA_SHARD_1) == Decimal("980.00")
+    assert _saldo(router, CONTA_SHARD_0) == Decimal("1010.00")
+    assert _saldo(router, OUTRA_CONTA_SHARD_1) == Decimal("10.00")
@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+from app.database.config import ALEMBIC_INI, create_tables, schema_is_current
+
+# Limites configuráveis para máquinas de CI mais lentas
+IMPORT_LIMIT_MS = float(os.getenv("STARTUP_IMPORT_LIMIT_MS", "3000"))
+SCHEMA_CHECK_LIMIT_MS = float(os.getenv("STARTUP_SCHEMA_CHECK_LIMIT_MS", "500"))
+
+
+def medir_importacao(modulo: str):
+    """Executa `python -X importtime` e retorna (total em ms, módulos mais caros)"""
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True,
+    )
+
+    tempos = {}
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        partes = linha[len("import time:"):].split("|")
+        try:
+            proprio, acumulado = int(partes[0]), int(partes[1])
+        except ValueError:
+            continue  # Linha de cabeçalho
+        tempos[partes[2].strip()] = (proprio, acumulado)
+
+    mais_caros = sorted(tempos.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    return tempos[modulo][1] / 1000, mais_caros
+
+
+@pytest.fixture
+def engine_migrado(tmp_path):
+    """Banco SQLite em arquivo com todas as migrações aplicadas"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+    config = Config(ALEMBIC_INI)
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.slow
+def test_custo_de_importacao_da_aplicacao():
+    """Testa que importar a aplicação permanece abaixo do limite"""
+    total_ms, mais_caros = medir_importacao("app.main")
+
+    detalhes = "\n".join(f"{nome}: {proprio / 1000:.1f} ms" for nome, (proprio, _) in mais_caros)
+    assert total_ms < IMPORT_LIMIT_MS, f"Importação levou {total_ms:.0f} ms:\n{detalhes}"
+
+
+def test_create_tables_pula_schema_atualizado(engine_migrado):
+    """Testa que o startup não executa create_all quando o banco está na revisão head"""
+    inicio = time.perf_counter()
+    assert schema_is_current(engine_migrado)
+    assert create_tables(engine_migrado) is False
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+
+    assert duracao_ms < SCHEMA_CHECK_LIMIT_MS
+
+
+def test_create_tables_banco_vazio(tmp_path):
+    """Testa que um banco vazio é criado e marcado na revisão head"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'vazio.db'}")
+
+    assert not schema_is_current(engine)
+    assert create_tables(engine) is True
+    assert schema_is_current(engine)
+    assert create_tables(engine) is False
+    engine.dispose()
+
+
+def test_create_tables_aplica_migracoes_pendentes(tmp_path):
+    """Testa que um banco em revisão antiga recebe as migrações, inclusive colunas novas"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'antigo.db'}")
+    config = Config(ALEMBIC_INI)
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "0013")
+
+    assert create_tables(engine) is True
+    assert schema_is_current(engine)
+    colunas = {coluna["name"] for coluna in inspect(engine).get_columns("transferencias_pendentes")}
+    assert {"tentativas", "transacao_pix_id"} <= colunas
+    engine.dispose()
+
+
+def test_create_tables_recusa_banco_sem_versao(tmp_path):
+    """Testa que tabelas sem alembic_version não são 'completadas' com create_all"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legado.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE clientes (id INTEGER PRIMARY KEY)"))
+
+    with pytest.raises(RuntimeError):
+        create_tables(engine)
+    engine.dispose()
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.static import CACHE_IMUTAVEL, SPANavigationMiddleware, criar_frontend
+
+
+@pytest.fixture
+def cliente_spa(tmp_path):
+    (tmp_path / "index.html").write_text("<div id=root></div>")
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / "static" / "js" / "main.1a2b3c.js").write_text("console.log(1)")
+
+    app = FastAPI()
+
+    @app.get("/contas/")
+    def listar():
+        return [{"numero": "1"}]
+
+    frontend = criar_frontend(str(tmp_path))
+    app.add_middleware(SPANavigationMiddleware, spa=frontend)
+    app.mount("/", frontend, name="frontend")
+    return TestClient(app)
+
+
+def test_assets_com_hash_sao_imutaveis(cliente_spa):
+    response = cliente_spa.get("/static/js/main.1a2b3c.js")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == CACHE_IMUTAVEL
+
+    response = cliente_spa.get("/")
+    assert response.text == "<div id=root></div>"
+    assert response.headers["Cache-Control"] == "no-cache"
+
+
+def test_fallback_do_spa(cliente_spa):
+    # Rota do React recarregada no navegador
+    response = cliente_spa.get("/extrato", headers={"Accept": "text/html,*/*"})
+    assert response.status_code == 200
+    assert response.text == "<div id=root></div>"
+
+    # Mesmo caminho da API: o navegador recebe o SPA, o axios recebe JSON
+    response = cliente_spa.get("/contas/", headers={"Sec-Fetch-Mode": "navigate"})
+    assert response.text == "<div id=root></div>"
+    response = cliente_spa.get("/contas/", headers={"Accept": "application/json"})
+    assert response.json() == [{"numero": "1"}]
+
+    assert cliente_spa.get("/static/js/inexistente.js").status_code == 404
+
+
+def test_sem_build_serve_apenas_a_api(tmp_path):
+    assert criar_frontend(None) is None
+    assert criar_frontend(str(tmp_path)) is None
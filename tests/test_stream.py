@@ -0,0 +1,110 @@
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+from app.auth import revocation_list
+from app.auth.security import create_access_token, create_stream_ticket, verify_token
+from app.models import Cliente
+from app.routes.stream import eventos_sse, formatar_sse
+from app.services.eventos import broker, topico_conta
+
+
+def _dados(bloco: str) -> dict:
+    return json.loads(next(linha[6:] for linha in bloco.splitlines() if linha.startswith("data: ")))
+
+
+def test_stream_envia_saldo_e_movimentacoes():
+    async def cenario():
+        topico = topico_conta("1234567890")
+        stream = eventos_sse(topico, {"conta_numero": "1234567890", "saldo": "1000.00"}, heartbeat=0.05)
+
+        assert (await stream.__anext__()).startswith("retry:")
+        inicial = await stream.__anext__()
+        assert inicial.startswith("event: saldo")
+        assert _dados(inicial)["saldo"] == "1000.00"
+
+        # Sem movimentação: heartbeat
+        assert await stream.__anext__() == ": ping\n\n"
+
+        broker.publicar(topico, {"id": 7, "conta_numero": "1234567890", "delta": "50.00", "saldo": "1050.00"})
+        bloco = await stream.__anext__()
+        assert bloco.startswith("id: 7\nevent: transacao")
+        assert _dados(bloco)["saldo"] == "1050.00"
+
+        # Desconexão do cliente cancela a assinatura
+        await stream.aclose()
+        assert topico not in broker._assinaturas
+
+    asyncio.run(cenario())
+
+
+def test_stream_encerra_quando_a_sessao_cai():
+    async def cenario():
+        ativo = [True]
+        stream = eventos_sse(topico_conta("1234567890"), {"saldo": "1.00"}, heartbeat=0.05, ativo=lambda: ativo[0])
+        await stream.__anext__()
+        await stream.__anext__()
+        assert await stream.__anext__() == ": ping\n\n"
+
+        ativo[0] = False
+        assert (await stream.__anext__()).startswith("event: encerrado")
+        try:
+            await stream.__anext__()
+            assert False, "o stream deveria ter terminado"
+        except StopAsyncIteration:
+            pass
+
+    asyncio.run(cenario())
+
+
+def test_formatar_sse_sem_id():
+    assert formatar_sse("saldo", {"saldo": "1.00"}) == 'event: saldo\ndata: {"saldo":"1.00"}\n\n'
+
+
+def test_stream_exige_token(client, sample_conta):
+    response = client.get(f"/stream/contas/{sample_conta.numero}")
+    assert response.status_code == 403
+
+
+def test_stream_de_conta_alheia(client, db_session, sample_conta):
+    outro = Cliente(
+        cpf="52998224725",
+        nome="Maria Souza",
+        data_nascimento=date(1985, 5, 5),
+        endereco="Rua Outra, 1",
+        senha_hash="-",
+        ativo=True
+    )
+    db_session.add(outro)
+    db_session.commit()
+
+    # O ticket só é emitido para contas do próprio cliente
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': outro.cpf})}"}
+    response = client.post(f"/stream/contas/{sample_conta.numero}/ticket", headers=headers)
+    assert response.status_code == 404
+
+    sessao = verify_token(create_access_token(data={"sub": outro.cpf}))
+    ticket = create_stream_ticket(sessao, sample_conta.numero)
+    response = client.get(f"/stream/contas/{sample_conta.numero}", params={"ticket": ticket})
+    assert response.status_code == 404
+
+
+def test_ticket_de_stream(client, sample_conta, token_headers):
+    response = client.post(f"/stream/contas/{sample_conta.numero}/ticket", headers=token_headers)
+    assert response.status_code == 200
+    ticket = response.json()["ticket"]
+
+    # O token de acesso não abre o stream, e o ticket não serve como token de acesso
+    token = token_headers["Authorization"].split()[1]
+    assert client.get(f"/stream/contas/{sample_conta.numero}", params={"ticket": token}).status_code == 401
+    assert client.get("/contas/", headers={"Authorization": f"Bearer {ticket}"}).status_code == 401
+    # Ticket de outra conta
+    assert client.get("/stream/contas/0000000000", params={"ticket": ticket}).status_code == 401
+
+    # Revogar o token de acesso invalida o ticket emitido a partir dele
+    revocation_list.revoke(verify_token(token)["jti"], datetime.utcnow() + timedelta(hours=1))
+    try:
+        response = client.get(f"/stream/contas/{sample_conta.numero}", params={"ticket": ticket})
+        assert response.status_code == 401
+    finally:
+        revocation_list.clear()